@@ -1,6 +1,18 @@
 import streamlit as st 
 
+from utilities.data import warmer
+
 st.set_page_config(page_title="UseydIntel TR", layout="wide")
+
+
+@st.cache_resource(show_spinner=False)
+def cache_warmer():
+    """One warmer thread per server process, whichever session loads the app first."""
+    return warmer.start()
+
+
+cache_warmer()  # precompute the dashboards' caches in the background
+
 st.title("🍽️ Welcome to UseydIntel")
 st.markdown("""
 Use the sidebar to navigate:
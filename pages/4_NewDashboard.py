@@ -3,9 +3,11 @@ import pandas as pd
 import plotly.express as px
 import seaborn as sns
 import matplotlib.pyplot as plt
-import re
 from PIL import Image
 
+from utilities.data import cached, version
+from utilities.data.access import FULL_DIR
+
 # Load and display logo
 logo = Image.open("archive/logo.png")
 st.image(logo, width=150)
@@ -34,51 +36,28 @@ st.markdown(
 st.set_page_config(page_title="TableWise Dashboard", layout="wide")
 
 # ---- Load data ----
-@st.cache_data
-def load_data():
-    orders = pd.read_csv("data/full/orders.csv")
-    products = pd.read_csv("data/full/products.csv")
-    features = pd.read_csv("data/full/features.csv")
-    payments = pd.read_csv("data/full/payments.csv")
-
-    # Clean columns
-    for df in [orders, products, features, payments]:
-        df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-    
-    # Parse dates
-    orders["insertdate"] = pd.to_datetime(orders["insertdate"], format='mixed')
-    payments["insertdate"] = pd.to_datetime(payments["insertdate"], format='mixed')
-
-    # Use only first payment per order (or customize to sum by orderId if needed)
-    payment_map = payments.groupby("orderid")["paymentname"].first().reset_index()
-    orders = orders.merge(payment_map, left_on="id", right_on="orderid", how="left")
-    orders.drop(columns=["orderid"], inplace=True)
-
-    return orders, products, features, payments
-
-orders, products, features, payments = load_data()
+# keyed on data/full's content version: re-runs after an ingest reload, others hit the cache
+data_version = version.current(FULL_DIR)
+
+orders, products, features, payments = cached.full(data_version)
 
 # ---- Sidebar Filters ----
 st.sidebar.header("Filters")
-min_date, max_date = orders["insertdate"].min(), orders["insertdate"].max()
+min_date, max_date = orders["insert_date"].min(), orders["insert_date"].max()
 date_range = st.sidebar.date_input("Select Date Range", [min_date, max_date])
 
-branches = st.sidebar.multiselect("Select Table", orders["tablename"].dropna().unique(), default=None)
-channel_types = st.sidebar.multiselect("Select Payment Channel", orders["paymentname"].dropna().unique())
+index = cached.full_filters(data_version)  # bitmaps per filter value, per-day row ranges
+branches = st.sidebar.multiselect("Select Table", index.values("table_name"), default=None)
+channel_types = st.sidebar.multiselect("Select Payment Channel", index.values("payment_name"))
 
 # ---- Filter Data ----
-mask = (orders["insertdate"].dt.date >= date_range[0]) & (orders["insertdate"].dt.date <= date_range[1])
-if branches:
-    mask &= orders["tablename"].isin(branches)
-if channel_types:
-    mask &= orders["paymentname"].isin(channel_types)
-
-filtered_orders = orders[mask]
+rows = index.select((date_range[0], date_range[1]), table_name=branches, payment_name=channel_types)
+filtered_orders = orders.iloc[rows]
 
 # ---- KPIs ----
-total_sales = filtered_orders["ordertotal"].sum()
-total_transactions = filtered_orders["id"].nunique()
-total_customers = filtered_orders["customerid"].nunique()
+total_sales = filtered_orders["order_total"].sum()
+total_transactions = filtered_orders["order_id"].nunique()
+total_customers = filtered_orders["customer_id"].nunique()
 avg_basket = total_sales / total_transactions if total_transactions else 0
 
 # ---- Layout ----
@@ -97,21 +76,22 @@ st.markdown("---")
 pie1, pie2 = st.columns(2)
 
 with pie1:
-    by_table = filtered_orders.groupby("tablename")["ordertotal"].sum().reset_index()
-    fig = px.pie(by_table, values="ordertotal", names="tablename", title="Table Sales")
+    by_table = filtered_orders.groupby("table_name", observed=True)["order_total"].sum().reset_index()
+    fig = px.pie(by_table, values="order_total", names="table_name", title="Table Sales")
     st.plotly_chart(fig, use_container_width=True)
 
 with pie2:
-    by_payment = filtered_orders.groupby("paymentname")["ordertotal"].sum().reset_index()
-    fig = px.pie(by_payment, values="ordertotal", names="paymentname", title="Sales by Payment Channel")
+    # every payment of a split order counts toward its own channel
+    by_payment = cached.full_payments(data_version).share(rows).reset_index()
+    fig = px.pie(by_payment, values="amount", names="payment_name", title="Sales by Payment Channel")
     st.plotly_chart(fig, use_container_width=True)
 
 st.title("Menu Insights")
 st.markdown("### Product Performance Metrics")
 
-product_counts = products["productname"].nunique()
-distinct_customizations = features["featurename"].nunique()
-avg_contribution_margin = (products["totalamount"] - products["quantity"] * products["unitprice"]).mean()
+product_counts = products["product_name"].nunique()
+distinct_customizations = features["feature_name"].nunique()
+avg_contribution_margin = (products["total_amount"] - products["quantity"] * products["unit_price"]).mean()
 potential_food_cost = 0  # Placeholder unless you have cost column
 
 col1, col2, col3, col4 = st.columns(4)
@@ -124,12 +104,12 @@ col4.metric("Potential Food Cost %", f"{potential_food_cost:.2f}%")
 col5, col6 = st.columns(2)
 
 with col5:
-    order_types = filtered_orders.groupby("ordertype")["ordertotal"].sum().reset_index()
-    fig = px.pie(order_types, values="ordertotal", names="ordertype", title="Order Types")
+    order_types = filtered_orders.groupby("order_type", observed=True)["order_total"].sum().reset_index()
+    fig = px.pie(order_types, values="order_total", names="order_type", title="Order Types")
     st.plotly_chart(fig, use_container_width=True)
 
 with col6:
-    top_features = features["featurename"].value_counts().head(10).reset_index()
+    top_features = features["feature_name"].value_counts().head(10).reset_index()
     top_features.columns = ["Feature", "Count"]
     fig = px.bar(top_features, x="Feature", y="Count", title="Top Customizations")
     st.plotly_chart(fig, use_container_width=True)
@@ -137,10 +117,10 @@ with col6:
 # ---- Top Products Table ----
 st.markdown("### 🏆 Top Products")
 top_products = (
-    products.groupby("productname")
+    products.groupby("product_name", observed=True)
     .agg(
-        total_sales=("totalamount", "sum"),
-        avg_price=("unitprice", "mean"),
+        total_sales=("total_amount", "sum"),
+        avg_price=("unit_price", "mean"),
         count=("quantity", "sum")
     )
     .sort_values("total_sales", ascending=False)
@@ -152,15 +132,15 @@ st.dataframe(top_products.head(15), use_container_width=True)
 # ---- Product Cluster Analysis ----
 st.markdown("### Product Cluster Analysis")
 # Calculate estimated cost as 80% of unit price (adjust as needed)
-products["estimated_cost"] = products["unitprice"] * 0.8
+products["estimated_cost"] = products["unit_price"] * 0.8
 
 product_perf = (
-    products.groupby("productname")
+    products.groupby("product_name", observed=True)
     .agg(
         popularity=("quantity", "sum"),
-        total_revenue=("totalamount", "sum"),
+        total_revenue=("total_amount", "sum"),
         total_cost=("estimated_cost", "sum"),
-        avg_price=("unitprice", "mean")
+        avg_price=("unit_price", "mean")
     )
     .reset_index()
 )
@@ -180,8 +160,8 @@ fig = px.scatter(
     x="profitability",
     y="popularity",
     size="bubble_size",
-    color="productname",
-    hover_data=["productname", "total_revenue", "popularity", "profitability", "margin_total"],
+    color="product_name",
+    hover_data=["product_name", "total_revenue", "popularity", "profitability", "margin_total"],
     title="Product Cluster Analysis"
 )
 st.plotly_chart(fig, use_container_width=True)
@@ -189,17 +169,7 @@ st.plotly_chart(fig, use_container_width=True)
 # ---- Cohort Analysis & Retention ----
 
 # Prepare cohort dataset
-orders["order_month"] = orders["insertdate"].dt.to_period("M")
-orders["cohort_month"] = orders.groupby("customerid")["insertdate"].transform("min").dt.to_period("M")
-
-cohort_data = (
-    orders.groupby(["cohort_month", "order_month"])
-    .agg(n_customers=("customerid", "nunique"))
-    .reset_index()
-)
-
-# Calculate period number
-cohort_data["cohort_index"] = (cohort_data["order_month"] - cohort_data["cohort_month"]).apply(lambda x: x.n)
+cohort_data = cached.full_cohort(data_version)
 
 # Pivot table
 cohort_pivot = cohort_data.pivot_table(index="cohort_month", columns="cohort_index", values="n_customers")
@@ -210,31 +180,9 @@ fig, ax = plt.subplots(figsize=(15, 6))
 sns.heatmap(cohort_pivot, annot=True, fmt=".0f", cmap="YlOrBr", ax=ax)
 st.pyplot(fig)
 
-orders["insert_month"] = orders["insertdate"].dt.to_period("M")
-orders["first_order_month"] = orders.groupby("customerid")["insertdate"].transform("min").dt.to_period("M")
-
-cohort = (
-    orders.groupby(["first_order_month", "insert_month"])["customerid"]
-    .nunique()
-    .reset_index()
-    .rename(columns={"customerid": "customers"})
-)
-
 # ---- Weekday Analysis ----
 
-orders["weekday"] = orders["insertdate"].dt.day_name()
-orders["branch"] = orders["tablename"].fillna("Unknown")  # or however you identify branches
-weekday_sales = (
-    orders.groupby(["branch", "weekday"])["ordertotal"]
-    .agg(["sum", "count"])
-    .reset_index()
-    .rename(columns={"sum": "total_sales", "count": "num_orders"})
-)
-total_per_branch = weekday_sales.groupby("branch")["total_sales"].transform("sum")
-weekday_sales["pct_of_branch"] = weekday_sales["total_sales"] / total_per_branch * 100
-
-pivot = weekday_sales.pivot(index="branch", columns="weekday", values="pct_of_branch").fillna(0)
-pivot = pivot[["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]]  # Order weekdays
+pivot = cached.full_weekday(data_version)
 
 st.subheader("📆 Branch Sales Distribution by Weekday")
 
@@ -242,46 +190,8 @@ fig, ax = plt.subplots(figsize=(12, 8))
 sns.heatmap(pivot, annot=True, fmt=".1f", cmap="coolwarm", cbar_kws={"label": "% of Weekly Sales"})
 st.pyplot(fig)
 
-# ---- Profitability ----@st.cache_data
-
-def load_product_cost_data():
-    products = pd.read_csv("data/full/products.csv")
-    raw_costs = pd.read_excel("data/full/costs.xlsx", sheet_name="Costs")
-
-    # Clean function for product names
-    def clean_name(name):
-        if pd.isna(name):
-            return ''
-        name = str(name).lower().strip()
-        name = re.sub(r"\(.*?\)", "", name)
-        name = re.sub(r"\d+\s?(g|gr|ml|cl)", "", name)
-        name = re.sub(r"[^a-zçğıöşü\s]", "", name)
-        name = re.sub(r"\s+", " ", name).strip()
-        return name
-
-    # Prepare clean cost table from the finalized format
-    raw_costs.columns = raw_costs.columns.str.strip()
-    raw_costs['normalized_name'] = raw_costs['Product'].apply(clean_name)
-    costs = raw_costs.groupby('normalized_name', as_index=False).agg({'Cost': 'mean'})
-
-    products['normalized_name'] = products['productName'].apply(clean_name)
-
-    canonical_map = products.groupby('normalized_name')['productName'].agg(lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[0])
-    products['productName'] = products['normalized_name'].map(canonical_map)
-
-    df = pd.merge(products, costs, on='normalized_name', how='left')
-
-    exclude_keywords = [
-        "istemiyorum", "pişmiş", "seçimi", "not", "sıfır", "adet",
-        "ayran", "coca", "fanta", "ice tea", "şeftali", "vişne", "sos", "extra",
-        "ketçap", "mayonez", "su", "çay", "çubuk", "mozzarella", "patates", "ball", "stick", "cola"
-    ]
-    df = df[~df["productName"].str.lower().str.contains('|'.join(exclude_keywords))]
-    df = df[df["unitPrice"] > 0]
-
-    return df
-
-products_df = load_product_cost_data()
+# ---- Profitability ----
+products_df = cached.product_costs(data_version)
 
 # --- Calculate Profitability Fields ---
 commission_rate = 0.13
@@ -289,7 +199,7 @@ commission_rate = 0.13
 def calculate_profit_table(df):
     df = df.copy()
 
-    df["toplam_satis"] = df["unitPrice"] * df["quantity"]
+    df["toplam_satis"] = df["unit_price"] * df["quantity"]
     df["bugunku_komisyon"] = df["toplam_satis"] * commission_rate
     df["bugunku_urun_maliyeti"] = df["Cost"] * df["quantity"]
 
@@ -297,7 +207,7 @@ def calculate_profit_table(df):
     df["servis_maliyeti"] = 0.0
     df["paketleme_maliyeti"] = 0.0
 
-    df["komisyon_birim"] = df["unitPrice"] * commission_rate
+    df["komisyon_birim"] = df["unit_price"] * commission_rate
     df["urun_maliyet_birim"] = df["Cost"]
     df["genel_gider_birim"] = 0.0
     df["servis_birim"] = 0.0
@@ -306,20 +216,24 @@ def calculate_profit_table(df):
     df["toplam_maliyet_birim"] = df[["komisyon_birim", "urun_maliyet_birim", "genel_gider_birim", "servis_birim", "paketleme_birim"]].sum(axis=1)
     df["toplam_maliyet"] = df["toplam_maliyet_birim"] * df["quantity"]
     df["kar"] = df["toplam_satis"] - df["toplam_maliyet"]
-    df["birim_kazanc"] = df["unitPrice"] - df["toplam_maliyet_birim"]
-    df["kar_orani"] = (df["birim_kazanc"] / df["unitPrice"]).fillna(0) * 100
+    df["birim_kazanc"] = df["unit_price"] - df["toplam_maliyet_birim"]
+    # catalog price valid when the order was placed (adisyo_catalog price history)
+    df["birim_indirim"] = df["list_price"] - df["unit_price"]
+    df["kar_orani"] = (df["birim_kazanc"] / df["unit_price"]).fillna(0) * 100
 
     df_result = df[[
-        "orderId", "productName", "quantity", "unitPrice", "toplam_satis",
+        "order_id", "product_name", "quantity", "list_price", "unit_price", "birim_indirim", "toplam_satis",
         "bugunku_komisyon", "bugunku_urun_maliyeti", "komisyon_birim", "urun_maliyet_birim",
         "toplam_maliyet_birim", "toplam_maliyet", "birim_kazanc", "kar_orani"
     ]]
 
     df_result.rename(columns={
-        "orderId": "Order ID",
-        "productName": "Product",
+        "order_id": "Order ID",
+        "product_name": "Product",
         "quantity": "Qty",
-        "unitPrice": "Unit Price",
+        "list_price": "List Price",
+        "unit_price": "Unit Price",
+        "birim_indirim": "Discount/unit",
         "toplam_satis": "Total Sales",
         "bugunku_komisyon": "Commission (Total)",
         "bugunku_urun_maliyeti": "Cost (Total)",
@@ -345,7 +259,9 @@ if view_option == "Summarized (By Product)":
         profit_table.groupby("Product")
         .agg({
             "Qty": "sum",
+            "List Price": "mean",
             "Unit Price": "mean",
+            "Discount/unit": "mean",
             "Total Sales": "sum",
             "Commission (Total)": "sum",
             "Cost (Total)": "sum",
@@ -356,7 +272,9 @@ if view_option == "Summarized (By Product)":
         .reset_index()
     )
     st.dataframe(summary.style.format({
+        "List Price": "₺{:.2f}",
         "Unit Price": "₺{:.2f}",
+        "Discount/unit": "₺{:.2f}",
         "Total Sales": "₺{:.2f}",
         "Commission (Total)": "₺{:.2f}",
         "Cost (Total)": "₺{:.2f}",
@@ -366,7 +284,9 @@ if view_option == "Summarized (By Product)":
     }), use_container_width=True)
 else:
     st.dataframe(profit_table.head(50).style.format({
+        "List Price": "₺{:.2f}",
         "Unit Price": "₺{:.2f}",
+        "Discount/unit": "₺{:.2f}",
         "Total Sales": "₺{:.2f}",
         "Commission (Total)": "₺{:.2f}",
         "Cost (Total)": "₺{:.2f}",
@@ -0,0 +1,67 @@
+import os
+import time
+
+from test_ingest_pipeline import ORDERS_PER_PAGE, make_pages
+
+from utilities.api.adisyo_flatten import flatten_historical
+from utilities.api.ingest_pipeline import CsvSink, run_pipeline, sibling_files
+from utilities.api.warehouse import load_csv
+from utilities.data import access, loaders
+
+
+def historical(order, total):
+    """A ``make_pages`` order as the historical endpoint returns it: product ids and a feature."""
+    products = [dict(p, id=order["id"] * 10 + i, features=[{"featureId": 1, "featureName": "Cheese"}])
+                for i, p in enumerate(order["products"])]
+    return dict(order, orderTotal=total, products=products)
+
+
+def write_partition(folder, suffix, pages, total=10.0):
+    """``completed_orders<suffix>.csv`` and its siblings, holding ``pages`` (API page numbers)."""
+    files = sibling_files(os.path.join(folder, f"completed_orders{suffix}.csv"))
+    sink = CsvSink(files, mode="w")
+    payloads = ((page, {"orders": [historical(o, total) for o in batch["orders"]]})
+                for page, batch in make_pages(max(pages)) if page in pages)
+    run_pipeline(payloads, flatten_historical, sink)
+    return files
+
+
+def test_csv_written_after_the_warehouse_is_read_alongside_it(tmp_path):
+    folder = str(tmp_path)
+    load_csv(write_partition(folder, "_a", [1, 2]), path=os.path.join(folder, "warehouse.db"))
+    # a later sync / replay: re-fetched page 2 with new totals plus a new page 3
+    newer = write_partition(folder, "_b", [2, 3], total=20.0)
+    later = time.time() + 5
+    for path in newer.values():
+        os.utime(path, (later, later))
+
+    assert access.backend(folder) == "warehouse"
+    orders = access.orders(layout="historical", data_dir=folder)
+    totals = orders.set_index("order_id")["order_total"].sort_index()
+    assert len(orders) == orders["order_id"].nunique() == 3 * ORDERS_PER_PAGE
+    assert (totals.loc[100:104] == 10.0).all() and (totals.loc[200:] == 20.0).all()
+    assert len(access.payments(data_dir=folder)) == 3 * ORDERS_PER_PAGE
+    assert len(loaders.load_historical(data_dir=folder)[0]) == 3 * ORDERS_PER_PAGE
+
+
+def test_each_table_falls_back_when_the_warehouse_lacks_it(tmp_path):
+    folder = str(tmp_path)
+    files = write_partition(folder, "", [1])
+    load_csv({"orders": files["orders"]}, path=os.path.join(folder, "warehouse.db"))
+
+    assert access.backend(folder, "orders") == "warehouse"
+    assert access.backend(folder, "products") == "csv"
+    assert len(access.products(data_dir=folder)) == ORDERS_PER_PAGE
+
+
+def test_a_newer_csv_is_logged_once_per_process(tmp_path, caplog):
+    folder = str(tmp_path)
+    load_csv(write_partition(folder, "_a", [1]), path=os.path.join(folder, "warehouse.db"))
+    later = time.time() + 5
+    os.utime(write_partition(folder, "_b", [2])["orders"], (later, later))
+
+    for _ in range(2):  # two Streamlit reruns
+        access.orders(layout="historical", data_dir=folder)
+
+    warnings = [r.getMessage() for r in caplog.records if r.name == access.__name__]
+    assert len(warnings) == 1 and "completed_orders_b.csv newer than the warehouse store" in warnings[0]
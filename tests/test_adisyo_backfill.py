@@ -0,0 +1,96 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+from test_ingest_pipeline import ORDERS_PER_PAGE, files_in, ingest, make_pages, read_rows
+
+from utilities.api import adisyo_backfill
+
+WINDOWS = adisyo_backfill.split_windows(datetime(2025, 3, 1), datetime(2025, 3, 15), 7)
+# each window serves two make_pages pages of its own (10-11, 12-13)
+FIRST_PAGE = {w[0].strftime(adisyo_backfill.DATE_FMT): 10 + 2 * i for i, w in enumerate(WINDOWS)}
+
+
+def order(oid):
+    return {"id": oid, "orderTotal": 10.0, "insertDate": "2025-03-07T23:59:00",
+            "products": [{"productId": 7, "productName": "Burger", "quantity": 1}],
+            "payments": [{"orderId": oid, "paymentName": "Cash", "amount": 10.0}]}
+
+
+class WindowClient:
+    """One CompletedOrders page per window; order 99 sits on the edge and is returned by both."""
+
+    def iter_pages(self, endpoint, params, start_page=1, **kwargs):
+        first = params["startDate"].startswith("2025-03-01")
+        yield 1, {"orders": [order(1 if first else 2), order(99)], "pageCount": 1}
+
+
+class FakeClient:
+    """Pages 10.. of each window (two per window), optionally failing once on ``fail_at``."""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+
+    def iter_pages(self, endpoint, params, start_page=1):
+        first = FIRST_PAGE[params["startDate"]]
+        for page, batch in make_pages(first + 1, first):
+            if page == self.fail_at:
+                self.fail_at = None
+                raise KeyboardInterrupt
+            yield page - first + 1, batch
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(adisyo_backfill, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(adisyo_backfill, "SHARD_DIR", str(tmp_path / "backfill"))
+    monkeypatch.setattr(adisyo_backfill, "PROGRESS_FILE", str(tmp_path / "progress.json"))
+    return tmp_path
+
+
+def test_windows_cover_the_range_without_gaps():
+    assert [(w[0].day, w[1].day) for w in WINDOWS] == [(1, 8), (8, 15)]
+
+
+def test_merge_keeps_an_edge_order_once(data_dir):
+    for window in WINDOWS:
+        adisyo_backfill.fetch_shard(WindowClient(), window)
+
+    adisyo_backfill.merge(WINDOWS)
+
+    assert [r["id"] for r in read_rows(data_dir / "orders.csv")] == ["1", "99", "2"]
+    assert [r["orderId"] for r in read_rows(data_dir / "payments.csv")] == ["1", "99", "2"]
+    assert len(read_rows(data_dir / "products.csv")) == 3
+
+
+def test_interrupted_shard_is_refetched_from_scratch(data_dir):
+    client = FakeClient(fail_at=11)
+    with pytest.raises(KeyboardInterrupt):
+        adisyo_backfill.fetch_shard(client, WINDOWS[0])
+    adisyo_backfill.fetch_shard(client, WINDOWS[0])
+
+    shard = adisyo_backfill.shard_path(WINDOWS[0])
+    ids = [r["id"] for r in read_rows(os.path.join(shard, "orders.csv"))]
+    assert len(ids) == len(set(ids)) == 2 * ORDERS_PER_PAGE
+    assert adisyo_backfill.read_checkpoint(shard)["done"]
+
+
+def test_adisyo_full_resumes_on_top_of_a_merge(data_dir):
+    ingest(data_dir, n_pages=2)  # an earlier adisyo_full run: pages 1-2, checkpoint at page 3
+    for window in WINDOWS:
+        adisyo_backfill.fetch_shard(FakeClient(), window)
+
+    adisyo_backfill.merge(WINDOWS)
+    state = json.loads((data_dir / "progress.json").read_text())
+    assert state["page"] == 3 and "replacing" not in state
+    merged = [r["id"] for r in read_rows(files_in(data_dir)["orders"])]
+    assert len(merged) == 4 * ORDERS_PER_PAGE
+
+    ingest(data_dir, n_pages=4)  # adisyo_full resumes at page 3
+
+    orders = [r["id"] for r in read_rows(files_in(data_dir)["orders"])]
+    assert orders[:len(merged)] == merged  # nothing truncated by the rollback
+    assert len(orders) == len(set(orders)) == 6 * ORDERS_PER_PAGE
+    payments = [r["orderId"] for r in read_rows(files_in(data_dir)["payments"])]
+    assert sorted(payments) == sorted(orders)
@@ -0,0 +1,78 @@
+import pytest
+
+from utilities.api import adisyo_client
+from utilities.api.adisyo_client import AdisyoClient, AdisyoError
+
+
+class Response:
+    def __init__(self, status, payload=None):
+        self.status_code = status
+        self.payload = payload or {}
+        self.text = "error"
+        self.headers = {}
+
+    def json(self):
+        return self.payload
+
+
+def client_answering(monkeypatch, *responses):
+    """A client whose session returns ``responses`` in turn, with no real waiting."""
+    monkeypatch.setattr(adisyo_client.time, "sleep", lambda seconds: None)
+    client = AdisyoClient(api_key="key", api_secret="secret", quotas={"CompletedOrders": 0.001})
+    client.archive = None
+    answers = iter(responses)
+    client.calls = []
+
+    def get(url, params=None, timeout=None):
+        client.calls.append(params)
+        return next(answers)
+
+    client.session.get = get
+    return client
+
+
+def test_throttled_call_backs_off_and_retries(monkeypatch):
+    client = client_answering(monkeypatch, Response(601), Response(200, {"orders": [1]}))
+
+    assert client.get("CompletedOrders") == {"orders": [1]}
+    assert len(client.calls) == 2
+    assert client.bucket("CompletedOrders").interval > 0.001
+
+
+def test_other_errors_are_not_retried(monkeypatch):
+    client = client_answering(monkeypatch, Response(404))
+
+    with pytest.raises(AdisyoError):
+        client.get("CompletedOrders")
+    assert len(client.calls) == 1
+
+
+def test_iter_pages_stops_at_page_count(monkeypatch):
+    pages = [Response(200, {"orders": [n], "pageCount": 2}) for n in (1, 2)]
+    client = client_answering(monkeypatch, *pages)
+
+    assert [page for page, _ in client.iter_pages("CompletedOrders", start_page=1)] == [1, 2]
+    assert [c["page"] for c in client.calls] == [1, 2]
+
+
+def test_server_errors_are_retried(monkeypatch):
+    client = client_answering(monkeypatch, Response(503), Response(200, {"orders": [1]}))
+
+    assert client.get("CompletedOrders") == {"orders": [1]}
+    assert len(client.calls) == 2
+
+
+def test_429_backs_off_like_a_throttle(monkeypatch):
+    client = client_answering(monkeypatch, Response(429), Response(200, {"orders": [1]}))
+
+    assert client.get("CompletedOrders") == {"orders": [1]}
+    assert client.bucket("CompletedOrders").interval > 0.001
+
+
+def test_server_errors_give_up_after_max_retries(monkeypatch):
+    client = client_answering(monkeypatch, *[Response(500)] * 10)
+    client.max_retries = 2
+
+    with pytest.raises(AdisyoError):
+        client.get("CompletedOrders")
+    assert len(client.calls) == 3
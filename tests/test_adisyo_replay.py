@@ -0,0 +1,50 @@
+import csv
+import os
+
+import pytest
+from utilities.api.adisyo_replay import replay
+from utilities.api.raw_archive import RawArchive
+
+
+def order(oid, total):
+    return {"id": oid, "orderTotal": total, "insertDate": "2025-03-01T12:00:00",
+            "products": [{"productId": 7, "productName": "Burger", "quantity": 1}],
+            "payments": [{"orderId": oid, "paymentName": "Cash", "amount": total}]}
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_replay_keeps_the_latest_fetch_of_each_order(tmp_path):
+    archive = RawArchive(str(tmp_path / "raw"))
+    archive.append("CompletedOrders", {"page": 1}, {"orders": [order(1, 10.0), order(2, 10.0)]})
+    archive.append("CompletedOrders", {"page": 1}, {"orders": [order(1, 15.0)]})  # order 1 changed
+
+    n = replay("full", str(tmp_path / "out"), raw_dir=str(tmp_path / "raw"))
+
+    orders = read_rows(os.path.join(tmp_path, "out", "orders_replay.csv"))
+    assert n == 2
+    assert [(r["id"], float(r["orderTotal"])) for r in orders] == [("2", 10.0), ("1", 15.0)]
+    assert len(read_rows(os.path.join(tmp_path, "out", "payments_replay.csv"))) == 2
+
+
+def test_replay_refuses_files_tracked_by_the_ingest_checkpoint(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "progress.json").write_text('{"offsets": {"orders": 10}}')
+
+    with pytest.raises(ValueError):
+        replay("full", str(out), raw_dir=str(tmp_path / "raw"), suffix="")
+
+
+def test_columns_first_seen_in_a_later_batch_reach_the_header(tmp_path):
+    archive = RawArchive(str(tmp_path / "raw"))
+    archive.append("CompletedOrders", {"page": 1},
+                   {"orders": [order(1, 10.0), {**order(2, 10.0), "tableName": "A1"}]})
+
+    replay("full", str(tmp_path / "out"), raw_dir=str(tmp_path / "raw"), batch=1)
+
+    orders = read_rows(os.path.join(tmp_path, "out", "orders_replay.csv"))
+    assert [r["tableName"] for r in orders] == ["", "A1"]
@@ -0,0 +1,72 @@
+from test_ingest_pipeline import ORDERS_PER_PAGE, make_pages, read_rows
+
+from utilities.api import adisyo_sync
+from utilities.api.adisyo_flatten import flatten_historical
+
+
+class FakeClient:
+    """``iter_pages`` over fixed CompletedOrders pages; RecentOrders returns nothing."""
+
+    def __init__(self, orders):
+        self.orders = orders
+
+    def iter_pages(self, endpoint, params=None, start_page=1, items_key="orders"):
+        if endpoint == "CompletedOrders":
+            yield 1, {"orders": self.orders}
+
+
+def historical_orders(pages, total=10.0):
+    """``make_pages`` orders as the API returns them to the sync: product ids, one feature each."""
+    orders = []
+    for _, batch in make_pages(max(pages)):
+        for o in batch["orders"]:
+            if o["id"] // 100 not in pages:
+                continue
+            products = [dict(p, id=o["id"] * 10, features=[{"featureId": 1, "featureName": "Cheese"}])
+                        for p in o["products"]]
+            orders.append(dict(o, orderTotal=total, updateDate=o["insertDate"], products=products))
+    return orders
+
+
+def run_sync(monkeypatch, orders):
+    monkeypatch.setattr(adisyo_sync, "AdisyoClient", lambda: FakeClient(orders))
+    adisyo_sync.sync()
+
+
+def test_overlapping_syncs_do_not_duplicate_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(adisyo_sync, "OUT_DIR", tmp_path)
+    monkeypatch.setattr(adisyo_sync, "STATE_FILE", tmp_path / "sync_state.json")
+    files = {t: tmp_path / p.name for t, p in adisyo_sync.FILES.items()}
+    monkeypatch.setattr(adisyo_sync, "FILES", files)
+
+    run_sync(monkeypatch, historical_orders([1, 2]))
+    run_sync(monkeypatch, historical_orders([2, 3], total=20.0))  # page 2 changed, page 3 new
+
+    orders = read_rows(files["orders"])
+    ids = [r["id"] for r in orders]
+    assert len(ids) == len(set(ids)) == 3 * ORDERS_PER_PAGE
+    assert {r["orderTotal"] for r in orders if r["id"].startswith("2")} == {"20.0"}
+    for table, key in (("products", "order_product_id"), ("features", "order_product_id"),
+                       ("payments", "order_id")):
+        keys = [r[key] for r in read_rows(files[table])]
+        assert len(keys) == len(set(keys)) == 3 * ORDERS_PER_PAGE
+
+
+def test_marks_compare_timestamps_not_strings():
+    mark = {"updateDate": "2025-03-14T12:00:00", "id": 5}
+    orders = [{"id": 7, "updateDate": "2025-03-14 13:00:00"},  # " " sorts before "T" as text
+              {"id": 6, "updateDate": "2025-03-14T12:30:00.250"}]
+
+    assert adisyo_sync.advance(mark, orders) == {"updateDate": "2025-03-14T13:00:00", "id": 7}
+    state = {"orders": mark, "payments": {"updateDate": "2025-03-14 09:00:00.5", "id": 1}}
+    assert adisyo_sync.lowest_mark(state) == "2025-03-14T09:00:00.500000"
+    assert adisyo_sync.lowest_mark({**state, "features": {"updateDate": None, "id": None}}) is None
+
+
+def test_recent_orders_products_without_an_id_are_flattened():
+    order = {"id": 1, "products": [{"productId": 7, "features": [{"featureId": 1}]}], "payments": []}
+
+    rows = flatten_historical(order)
+
+    assert rows["products"][0]["order_product_id"] is None
+    assert rows["features"][0]["order_product_id"] is None
@@ -0,0 +1,53 @@
+import os
+import time
+
+from test_access import write_partition
+from test_ingest_pipeline import ORDERS_PER_PAGE, files_in, ingest, make_pages, read_rows
+
+from utilities.api.adisyo_flatten import flatten_full
+from utilities.api.ingest_pipeline import CsvSink, read_json, run_pipeline
+from utilities.data import compact
+
+
+def age(files, seconds):
+    stamp = time.time() - seconds
+    for path in files.values():
+        if os.path.exists(path):
+            os.utime(path, (stamp, stamp))
+
+
+def test_overlapping_partitions_compact_to_the_newest_rows_in_key_order(tmp_path):
+    folder = str(tmp_path)
+    age(write_partition(folder, "_2025", [2, 3]), 60)
+    write_partition(folder, "_full", [1, 2], total=20.0)  # newer: page 2 was re-fetched
+
+    entry = compact.compact(folder, chunk_rows=3)
+
+    orders = read_rows(os.path.join(folder, "completed_orders.csv"))
+    ids = [int(r["id"]) for r in orders]
+    assert ids == sorted(ids) and len(ids) == len(set(ids)) == 3 * ORDERS_PER_PAGE
+    totals = {int(r["id"]): float(r["orderTotal"]) for r in orders}
+    assert all(totals[i] == (10.0 if i >= 300 else 20.0) for i in ids)
+    products = [int(r["order_id"]) for r in read_rows(os.path.join(folder, "products.csv"))]
+    assert products == ids  # one product per order, from the partition the order came from
+    assert entry["tables"]["orders"]["rows_dropped"] == ORDERS_PER_PAGE
+    assert sorted(f for f in os.listdir(folder) if f.endswith(".csv")) == [
+        "completed_orders.csv", "features.csv", "payments.csv", "products.csv"]
+
+
+def test_compacting_data_full_republishes_the_ingest_offsets(tmp_path):
+    folder = str(tmp_path)
+    ingest(folder, n_pages=2)
+    age(files_in(folder), 60)
+    replay = {t: os.path.join(folder, f"{t}_replay.csv") for t in files_in(folder)}
+    run_pipeline(make_pages(3, 2), flatten_full, CsvSink(replay, mode="w"))
+
+    compact.compact(folder, layout="full")
+    state = read_json(os.path.join(folder, "progress.json"))
+    assert state["offsets"]["orders"] == os.path.getsize(files_in(folder)["orders"])
+    assert "replacing" not in state
+
+    ingest(folder, n_pages=4)  # resumes at page 3 without truncating the compacted file
+    ids = [int(r["id"]) for r in read_rows(files_in(folder)["orders"])]
+    assert ids[:3 * ORDERS_PER_PAGE] == sorted(set(ids))[:3 * ORDERS_PER_PAGE]
+    assert len(ids) == 5 * ORDERS_PER_PAGE  # page 3 again from the API, then page 4
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from utilities.data import derive, loaders, version
+from utilities.data.loaders import WEEKDAYS
+
+
+def stamps(n=400, seed=1):
+    rng = np.random.default_rng(seed)
+    minutes = rng.integers(0, 200 * 24 * 60, n)
+    return pd.Series(pd.Timestamp("2025-01-01") + pd.to_timedelta(minutes, unit="min"))
+
+
+def test_daypart_matches_the_old_hour_bins():
+    hours = pd.Series(range(24))
+    old = pd.cut(hours, bins=[-1, 5, 10, 15, 21, 24],
+                 labels=["Night-Owl", "Breakfast", "Lunch", "Dinner", "Late-Night"])
+
+    assert [derive.daypart(h) for h in hours] == old.astype(str).tolist()
+
+
+def test_ingest_and_load_time_columns_agree_with_the_old_ones():
+    when = stamps()
+    rows = [derive.derive_row({"insertDate": t.isoformat()}) for t in when]
+    orders = derive.complete(pd.DataFrame({"insert_date": when}))
+
+    for col in ("hour", "weekday", "daypart"):
+        assert orders[col].astype(object).tolist() == [r[col] for r in rows]
+    assert [WEEKDAYS[d] for d in orders["weekday"]] == when.dt.day_name().tolist()
+    assert (orders["order_month"] == when.dt.to_period("M").dt.start_time).all()
+
+
+def old_cohort(orders):
+    """pages/3_HistoricalDashboard.py before the derived columns."""
+    frame = orders.copy()
+    frame["order_month"] = frame["insert_date"].dt.to_period("M")
+    frame["cohort_month"] = frame.groupby("customer_id")["insert_date"].transform("min").dt.to_period("M")
+    cohort = frame.groupby(["cohort_month", "order_month"])["customer_id"].nunique().reset_index(name="n_customers")
+    cohort["cohort_index"] = (cohort["order_month"] - cohort["cohort_month"]).apply(lambda x: x.n)
+    return cohort
+
+
+def test_cohort_counts_match_the_old_period_arithmetic():
+    when = stamps()
+    orders = pd.DataFrame({"customer_id": np.arange(len(when)) % 37, "insert_date": when})
+
+    new = loaders.cohort_counts(orders, "customer_id", "insert_date")
+    stored = loaders.cohort_counts(derive.complete(orders.copy()), "customer_id", "insert_date")
+
+    expected = old_cohort(orders)
+    for got in (new, stored):
+        pd.testing.assert_frame_equal(got[expected.columns].reset_index(drop=True), expected,
+                                      check_dtype=False)
+
+
+def test_cohort_index_keeps_each_customers_first_month_across_partitions(tmp_path):
+    (tmp_path / "completed_orders_a.csv").write_text(
+        "id,insertDate,customer_id\n1,2025-03-05T10:00:00,7\n2,2025-04-01T10:00:00,8\n")
+    version.refresh(str(tmp_path))
+    (tmp_path / "completed_orders_b.csv").write_text(
+        "id,insertDate,customer_id\n3,2025-02-20T10:00:00,7\n4,2025-05-01T10:00:00,8\n")
+    version.refresh(str(tmp_path))  # only partition b is read
+
+    firsts = derive.first_order_months(str(tmp_path))
+    assert firsts.to_dict() == {7: pd.Timestamp("2025-02-01"), 8: pd.Timestamp("2025-04-01")}
+
+
+def test_weekday_share_is_the_same_from_stored_weekdays():
+    when = stamps()
+    orders = pd.DataFrame({"app": np.where(np.arange(len(when)) % 3, "Yemeksepeti", "Getir"),
+                           "order_total": np.arange(len(when), dtype=float), "insert_date": when})
+
+    old = loaders.weekday_share(orders, "app", "order_total", "insert_date")
+    new = loaders.weekday_share(derive.complete(orders.copy()), "app", "order_total", "insert_date")
+
+    pd.testing.assert_frame_equal(new, old)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utilities.data import districts
+from utilities.data.districts import OTHER, PolygonIndex
+
+
+def old_district(x):
+    """pages/3_HistoricalDashboard.py's substring rule, before the regex."""
+    if pd.isna(x):
+        return None
+    x = str(x).lower()
+    for d in districts.DISTRICTS:
+        if d in x:
+            return d.title()
+    return OTHER
+
+
+REGIONS = ["Caferağa Mah. Kadıköy", "kadıköy moda", "Fenerbahçe / kadıköy", "Levent, beşiktaş",
+           "Bahariye Cd.", "Zeytinburnu", "", None, "üsküdar", "ümraniye merkez", "Şişli"]
+
+# an L-shaped (concave) district and a square one with a lake cut out of it
+L_SHAPE = [[0, 0], [2, 0], [2, 1], [1, 1], [1, 2], [0, 2]]
+SQUARE, LAKE = [[3, 0], [5, 0], [5, 2], [3, 2]], [[3.5, 0.5], [4.5, 0.5], [4.5, 1.5], [3.5, 1.5]]
+GEOJSON = {"features": [
+    {"properties": {"name": "Kadıköy"}, "geometry": {"type": "Polygon", "coordinates": [L_SHAPE]}},
+    {"properties": {"name": "Beşiktaş"}, "geometry": {"type": "MultiPolygon", "coordinates": [[SQUARE, LAKE]]}},
+]}
+
+
+def inside(x, y, ring):
+    """Plain even-odd crossing test for one point."""
+    hit = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            hit = not hit
+    return hit
+
+
+@pytest.fixture
+def polygons(monkeypatch):
+    index = PolygonIndex.from_geojson(GEOJSON)
+    monkeypatch.setattr(districts, "polygon_index", lambda: index)
+    return index
+
+
+def test_region_text_resolves_like_the_old_substring_rule():
+    regions = pd.Series(REGIONS, dtype=object)
+
+    expected = [None if r == "" else old_district(r) for r in REGIONS]
+    assert districts.resolve(regions).tolist() == expected
+    assert [districts.resolve_one(r) for r in REGIONS] == expected
+
+
+def test_the_last_district_named_wins_in_turkish_casing():
+    assert districts.resolve_one("Bahçelievler Mah. Bakırköy") == "Bakırköy"
+    assert districts.resolve_one("BAĞCILAR") == "Bağcılar"  # str.lower() gives "bağcilar"
+
+
+def test_polygon_index_agrees_with_a_plain_crossing_test(polygons):
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-0.5, 5.5, 2000), rng.uniform(-0.5, 2.5, 2000)
+
+    expected = [("Kadıköy" if inside(px, py, L_SHAPE) else
+                 "Beşiktaş" if inside(px, py, SQUARE) and not inside(px, py, LAKE) else None)
+                for px, py in zip(x, y)]
+    assert polygons.locate(x, y).tolist() == expected
+
+
+def test_coordinates_fill_in_only_where_the_text_names_no_district(polygons):
+    regions = pd.Series(["Beşiktaş", "Bahariye Cd.", None, None, "Bahariye Cd."], dtype=object)
+    lat = pd.Series([0.5, 0.5, 1.5, 1.0, 9.0])
+    lon = pd.Series([0.5, 0.5, 3.2, 4.0, 9.0])  # Kadıköy, Kadıköy, Beşiktaş, the lake, nowhere
+
+    expected = ["Beşiktaş", "Kadıköy", "Beşiktaş", None, OTHER]
+    assert districts.resolve(regions, lat, lon).tolist() == expected
+    assert [districts.resolve_one(*row) for row in zip(regions, lat, lon)] == expected
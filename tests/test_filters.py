@@ -0,0 +1,85 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utilities.data.filters import FilterIndex, PaymentIndex
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    n = 600
+    when = pd.Series(pd.Timestamp("2025-03-01") + pd.to_timedelta(rng.integers(0, 30 * 24 * 60, n), unit="min"))
+    when[rng.random(n) < 0.05] = pd.NaT
+    orders = pd.DataFrame({
+        "order_id": np.arange(1000, 1000 + n),
+        "insert_date": when,
+        "app": rng.choice(np.array(["Getir", "Yemeksepeti", "Trendyol", None], dtype=object), n),
+        "district": pd.Categorical(rng.choice(["Kadıköy", "Beşiktaş", "Şişli"], n)),
+    })
+    split = rng.random(n) < 0.3  # split payments: Cash + Card
+    ids = np.r_[orders["order_id"], orders["order_id"][split]]
+    payments = pd.DataFrame({
+        "order_id": ids,
+        "payment_name": np.r_[rng.choice(["Cash", "Card", "Online"], n), ["Card"] * split.sum()],
+        "amount": rng.uniform(50, 500, len(ids)).round(2),
+    })
+    return orders, payments
+
+
+CHOICES = [
+    ((date(2025, 3, 5), date(2025, 3, 12)), {}),
+    ((date(2025, 3, 1), date(2025, 3, 30)), {"app": ["Getir"]}),
+    ((date(2025, 3, 10), date(2025, 3, 10)), {"app": ["Getir", "Trendyol"], "district": ["Şişli"]}),
+    ((date(2025, 2, 1), date(2025, 2, 20)), {"app": ["Getir"]}),  # before the first order
+    (None, {"district": ["Kadıköy", "Beşiktaş"], "payment_name": ["Online"]}),
+    ((date(2025, 3, 3), date(2025, 3, 25)), {"payment_name": ["Cash", "Card"], "app": ["Nope"]}),
+]
+
+
+def old_rows(orders, payments, dates, choices):
+    """The pages' mask before the index: date range, then ``isin`` per chosen filter."""
+    mask = pd.Series(True, index=orders.index)
+    if dates is not None:
+        mask &= orders["insert_date"].dt.date.between(*dates)
+    for name, wanted in choices.items():
+        if name == "payment_name":
+            paid = payments[payments["payment_name"].isin(wanted)]["order_id"].unique()
+            mask &= orders["order_id"].isin(paid)
+        else:
+            mask &= orders[name].isin(wanted)
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize("dates, choices", CHOICES)
+def test_select_matches_the_old_isin_masks(frames, dates, choices):
+    orders, payments = frames
+    paid = PaymentIndex(orders, payments)
+    index = FilterIndex(orders, ["app", "district"]).add("payment_name", paid.rows, paid.names())
+
+    rows = index.select(dates, **choices)
+
+    np.testing.assert_array_equal(rows, old_rows(orders, payments, dates, choices))
+    pd.testing.assert_frame_equal(orders.iloc[rows], orders[orders.index.isin(rows)])
+
+
+def test_empty_choices_do_not_filter(frames):
+    orders, _ = frames
+    index = FilterIndex(orders, ["app"])
+
+    np.testing.assert_array_equal(index.select(app=[]), np.arange(len(orders)))
+    assert set(index.values("app")) == {"Getir", "Yemeksepeti", "Trendyol"}
+
+
+@pytest.mark.parametrize("dates, choices", CHOICES)
+def test_payment_share_matches_the_old_join(frames, dates, choices):
+    orders, payments = frames
+    paid = PaymentIndex(orders, payments)
+    rows = old_rows(orders, payments, dates, choices)
+
+    old = (payments[payments["order_id"].isin(orders["order_id"].iloc[rows])]
+           .groupby("payment_name")["amount"].sum())
+
+    pd.testing.assert_series_equal(paid.share(rows), old, check_names=False)
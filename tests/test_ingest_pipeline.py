@@ -0,0 +1,130 @@
+import csv
+import os
+
+import pytest
+
+from utilities.api.adisyo_flatten import TABLES, flatten_full
+from utilities.api.ingest_pipeline import CsvSink, run_pipeline, write_json_atomic
+
+ORDERS_PER_PAGE = 5
+
+
+def make_pages(n_pages, start_page=1):
+    """API pages of ``flatten_full`` payloads: one product and one payment per order."""
+    for page in range(start_page, n_pages + 1):
+        orders = []
+        for i in range(ORDERS_PER_PAGE):
+            oid = page * 100 + i
+            orders.append({
+                "id": oid,
+                "orderTotal": 10.0,
+                "insertDate": f"2025-03-{page:02d}T12:00:00",
+                "products": [{"productId": 7, "productName": "Burger", "quantity": 1}],
+                "payments": [{"orderId": oid, "paymentName": "Cash", "amount": 10.0}],
+            })
+        yield page, {"orders": orders}
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def files_in(folder):
+    return {t: os.path.join(folder, f"{t}.csv") for t in TABLES}
+
+
+def ingest(folder, n_pages, interrupt_at=None):
+    """One ``adisyo_full``-style run: resume from the checkpoint, optionally interrupted mid-page."""
+    sink = CsvSink(files_in(folder), checkpoint=os.path.join(folder, "progress.json"))
+    start = sink.state.get("page", 1)
+
+    def checkpoint(page, n_orders):
+        # runs after the page's rows reached the sink, before its commit
+        if page == interrupt_at:
+            raise KeyboardInterrupt
+        return {"page": page + 1}
+
+    run_pipeline(make_pages(n_pages, start), flatten_full, sink, checkpoint=checkpoint)
+
+
+def test_every_page_is_written_in_order(tmp_path):
+    committed = []
+
+    n = run_pipeline(make_pages(4), flatten_full, CsvSink(files_in(tmp_path)),
+                     on_commit=lambda page, n_orders: committed.append((page, n_orders)))
+
+    assert n == 4 * ORDERS_PER_PAGE
+    assert committed == [(page, ORDERS_PER_PAGE) for page in (1, 2, 3, 4)]
+    ids = [int(r["id"]) for r in read_rows(files_in(tmp_path)["orders"])]
+    assert ids == sorted(ids) and len(ids) == 4 * ORDERS_PER_PAGE
+
+
+def test_fetch_error_surfaces_after_the_pages_before_it(tmp_path):
+    def failing_pages():
+        yield from make_pages(2)
+        raise RuntimeError("API down")
+
+    with pytest.raises(RuntimeError):
+        run_pipeline(failing_pages(), flatten_full, CsvSink(files_in(tmp_path)))
+
+    assert len(read_rows(files_in(tmp_path)["orders"])) == 2 * ORDERS_PER_PAGE
+
+
+def test_interrupted_run_resumes_without_duplicates(tmp_path):
+    with pytest.raises(KeyboardInterrupt):
+        ingest(tmp_path, n_pages=6, interrupt_at=3)
+    # only the two complete pages are on disk
+    assert len(read_rows(files_in(tmp_path)["orders"])) == 2 * ORDERS_PER_PAGE
+
+    ingest(tmp_path, n_pages=6)
+
+    files = files_in(tmp_path)
+    orders = [r["id"] for r in read_rows(files["orders"])]
+    payments = [r["orderId"] for r in read_rows(files["payments"])]
+    assert len(orders) == len(set(orders)) == 6 * ORDERS_PER_PAGE
+    assert sorted(payments) == sorted(orders)
+    assert len(read_rows(files["products"])) == 6 * ORDERS_PER_PAGE
+
+
+def test_crash_mid_write_is_rolled_back(tmp_path):
+    ingest(tmp_path, n_pages=2)
+    orders = files_in(tmp_path)["orders"]
+    with open(orders, "a", encoding="utf-8") as f:  # a page half-written when the process died
+        f.write("999,torn")
+
+    ingest(tmp_path, n_pages=3)
+
+    ids = [r["id"] for r in read_rows(orders)]
+    assert len(ids) == len(set(ids)) == 3 * ORDERS_PER_PAGE
+    assert "999" not in ids
+
+
+def test_new_columns_extend_an_existing_header(tmp_path):
+    orders = files_in(tmp_path)["orders"]
+    with open(orders, "w", newline="", encoding="utf-8") as f:  # written before the derived columns
+        f.write("id,orderTotal\n1,5.0\n")
+
+    ingest(tmp_path, n_pages=1)
+
+    rows = read_rows(orders)
+    assert {"hour", "weekday", "daypart", "district", "order_month"} <= set(rows[0])
+    assert rows[0]["id"] == "1" and rows[0]["hour"] == ""
+    assert all(r["hour"] == "12" for r in rows[1:])
+    assert len(rows) == 1 + ORDERS_PER_PAGE
+
+
+def test_interrupted_header_extension_is_finished_on_reopen(tmp_path):
+    orders = files_in(tmp_path)["orders"]
+    with open(orders, "w", encoding="utf-8") as f:
+        f.write("id\n1\n")
+    with open(orders + ".extend", "w", encoding="utf-8") as f:  # rewrite done, rename not yet
+        f.write("id,hour\n1,\n")
+    size = os.path.getsize(orders + ".extend")
+    write_json_atomic(os.path.join(tmp_path, "progress.json"),
+                      {"page": 1, "offsets": {"orders": size}, "replacing": {orders: orders + ".extend"}})
+
+    sink = CsvSink(files_in(tmp_path), checkpoint=os.path.join(tmp_path, "progress.json"))
+
+    assert read_rows(orders) == [{"id": "1", "hour": ""}]
+    assert "replacing" not in sink.state
@@ -0,0 +1,73 @@
+import os
+from datetime import date
+
+from utilities.api.parquet_sink import ParquetSink, read_parquet
+
+
+def order(oid, **extra):
+    return {"id": oid, "insertDate": "2025-03-14T12:00:00", "orderTotal": 10.0, **extra}
+
+
+def test_children_land_in_their_orders_month(tmp_path):
+    sink = ParquetSink(str(tmp_path))
+    sink.write("orders", [order(1), order(2, insertDate="2025-04-02T12:00:00")])
+    sink.write("payments", [{"order_id": 1, "amount": 10.0}, {"order_id": 2, "amount": 10.0}])
+    sink.commit()
+    sink.close()
+
+    assert sorted(os.listdir(tmp_path / "payments" / "year=2025")) == ["month=03", "month=04"]
+    april = read_parquet("orders", str(tmp_path), columns=["id"], start=date(2025, 4, 1))
+    assert list(map(int, april["id"])) == [2]
+
+
+def test_replaying_a_page_overwrites_its_files(tmp_path):
+    sink = ParquetSink(str(tmp_path))
+    for _ in range(2):
+        sink.write("orders", [order(1), order(2)])
+        sink.commit()
+    sink.close()
+
+    assert sorted(map(int, read_parquet("orders", str(tmp_path))["id"])) == [1, 2]
+
+
+def test_columns_added_by_a_later_page_are_read_back(tmp_path):
+    sink = ParquetSink(str(tmp_path))
+    sink.write("orders", [order(1)])
+    sink.commit()
+    sink.write("orders", [order(2, hour=12)])
+    sink.commit()
+    sink.close()
+
+    orders = read_parquet("orders", str(tmp_path)).set_index("id").sort_index()
+    assert orders["hour"].isna().tolist() == [True, False]
+    assert orders.loc[2, "hour"] == 12
+
+
+def test_children_of_an_earlier_run_land_in_their_orders_partition(tmp_path):
+    first = ParquetSink(str(tmp_path))
+    first.write("orders", [order(1)])
+    first.write("products", [{"order_id": 1, "order_product_id": 11, "quantity": 1}])
+    first.commit()
+    first.close()
+
+    later = ParquetSink(str(tmp_path))  # a new process: nothing in memory
+    later.write("payments", [{"order_id": 1, "amount": 10.0}])
+    later.write("features", [{"order_product_id": 11, "feature_id": 5}])
+    later.commit()
+    later.close()
+
+    for table in ("payments", "features"):
+        assert os.listdir(tmp_path / table) == ["year=2025"]
+        assert os.listdir(tmp_path / table / "year=2025") == ["month=03"]
+
+
+def test_files_are_named_by_the_tables_key(tmp_path):
+    sink = ParquetSink(str(tmp_path), source="page")
+    sink.write("orders", [order(1), order(2)])
+    sink.write("products", [{"quantity": 1, "order_id": 1, "order_product_id": 11},
+                            {"quantity": 2, "order_id": 2, "order_product_id": 12}])
+    sink.commit()
+    sink.close()
+
+    assert os.listdir(tmp_path / "orders" / "year=2025" / "month=03") == ["page-1-2.parquet"]
+    assert os.listdir(tmp_path / "products" / "year=2025" / "month=03") == ["page-11-12.parquet"]
@@ -0,0 +1,42 @@
+import os
+
+from utilities.api.raw_archive import RawArchive
+
+
+def pages(archive):
+    return [r["payload"]["page"] for r in archive.records("CompletedOrders")]
+
+
+def test_records_come_back_in_fetch_order(tmp_path):
+    archive = RawArchive(str(tmp_path))
+    for page in (1, 2, 3):
+        archive.append("CompletedOrders", {"page": page}, {"page": page})
+
+    assert pages(archive) == [1, 2, 3]
+    assert [r["params"]["page"] for r in archive.records("CompletedOrders")] == [1, 2, 3]
+    assert list(archive.records("RecentOrders")) == []
+
+
+def test_pages_after_a_torn_record_are_still_read(tmp_path):
+    archive = RawArchive(str(tmp_path))
+    archive.append("CompletedOrders", {}, {"page": 1})
+    (path,) = [os.path.join(tmp_path, "CompletedOrders", n) for n in os.listdir(tmp_path / "CompletedOrders")]
+    intact = os.path.getsize(path)
+    archive.append("CompletedOrders", {}, {"page": 2, "orders": ["x" * 200]})
+    with open(path, "r+b") as f:  # the process died halfway through writing page 2
+        f.truncate(intact + (os.path.getsize(path) - intact) // 2)
+    archive.append("CompletedOrders", {}, {"page": 3})
+
+    assert pages(archive) == [1, 3]
+
+
+def test_torn_tail_is_skipped(tmp_path):
+    archive = RawArchive(str(tmp_path))
+    for page in (1, 2):
+        archive.append("CompletedOrders", {}, {"page": page})
+    (name,) = os.listdir(tmp_path / "CompletedOrders")
+    path = tmp_path / "CompletedOrders" / name
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 5)
+
+    assert pages(archive) == [1]
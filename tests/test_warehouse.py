@@ -0,0 +1,47 @@
+from utilities.api.warehouse import WarehouseSink, load_csv, query
+
+
+def write_page(path, total=10.0):
+    """One order with a product, a feature on it and a split payment."""
+    sink = WarehouseSink(path)
+    sink.write("orders", [{"id": 1, "insertDate": "2025-03-14T12:00:00", "orderTotal": total}])
+    sink.write("products", [{"order_id": 1, "order_product_id": 11, "quantity": 2, "totalAmount": total}])
+    sink.write("features", [{"order_product_id": 11, "feature_id": 5, "additionalPrice": 1.5}])
+    sink.write("payments", [{"order_id": 1, "paymentName": "Cash", "amount": total / 2},
+                            {"order_id": 1, "paymentName": "Card", "amount": total / 2}])
+    sink.commit()
+    sink.close()
+
+
+def test_order_fact_aggregates_the_children(tmp_path):
+    path = str(tmp_path / "warehouse.db")
+    write_page(path)
+
+    fact = query("SELECT * FROM order_fact", path=path).iloc[0]
+    assert (fact["product_count"], fact["feature_extra"], fact["paid_amount"]) == (2, 1.5, 10.0)
+    assert sorted(fact["payment_methods"].split(",")) == ["Card", "Cash"]
+
+
+def test_reingesting_an_order_replaces_its_children(tmp_path):
+    path = str(tmp_path / "warehouse.db")
+    write_page(path)
+    write_page(path, total=20.0)
+
+    counts = query("SELECT (SELECT COUNT(*) FROM products) AS products, (SELECT COUNT(*) FROM features) AS features,"
+                   " (SELECT COUNT(*) FROM payments) AS payments", path=path).iloc[0].tolist()
+    assert counts == [1, 1, 2]
+    assert query("SELECT paid_amount FROM order_fact", path=path)["paid_amount"].tolist() == [20.0]
+
+
+def test_children_loaded_without_their_orders_replace_earlier_rows(tmp_path):
+    path = str(tmp_path / "warehouse.db")
+    write_page(path)
+    children = {"features": tmp_path / "features.csv", "payments": tmp_path / "payments.csv"}
+    children["features"].write_text("order_product_id,feature_id,additionalPrice\n11,5,1.5\n11,6,0.5\n")
+    children["payments"].write_text("order_id,paymentName,amount\n1,Cash,5.0\n1,Card,5.0\n")
+
+    for _ in range(2):  # the orders file is missing, then a replayed load
+        load_csv({t: str(p) for t, p in children.items()}, path=path, chunk=1)
+
+    fact = query("SELECT * FROM order_fact", path=path).iloc[0]
+    assert (fact["feature_extra"], fact["paid_amount"]) == (2.0, 10.0)
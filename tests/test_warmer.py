@@ -0,0 +1,44 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from utilities.data import cached, loaders, version, warmer
+
+
+def page():
+    """What pages/1_Dashboard.py reads on load."""
+    import streamlit as st
+
+    from utilities.data import cached, version
+
+    orders_version = version.current(st.session_state["data_dir"], ["orders"])
+    st.session_state["index"] = cached.recent_filters(orders_version)
+
+
+def test_warm_run_fills_the_cache_the_page_reads(tmp_path, monkeypatch):
+    loads = []
+
+    def load_recent():
+        loads.append(threading.current_thread().name)
+        frame = pd.DataFrame({c: ["a"] for c in
+                              ("delivery_app", "payment_method", "region", "status", "time_of_day")})
+        return frame.assign(insert_date=pd.Timestamp("2025-03-14 12:00"))
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    monkeypatch.setattr(loaders, "load_recent", load_recent)
+    monkeypatch.setattr(warmer, "TARGETS", {"recent": (str(tmp_path), ["orders"], warmer._recent)})
+
+    # like warmer.start(): a plain thread, outside any script run
+    thread = threading.Thread(target=warmer.warm_once, args=({},), name="cache-warmer")
+    thread.start()
+    thread.join()
+    app = AppTest.from_function(page)
+    app.session_state["data_dir"] = str(tmp_path)
+    app.run()
+
+    assert not app.exception
+    assert loads == ["cache-warmer"]  # the page's run was a cache hit
+    assert app.session_state["index"] is cached.recent_filters(version.current(str(tmp_path), ["orders"]))
@@ -0,0 +1,190 @@
+"""
+Time-window sharded CompletedOrders backfill.
+
+Splits ``[start, end)`` into fixed windows and fetches them with parallel
+workers that share one ``AdisyoClient`` (and therefore one rate budget).
+Each window is a shard with its own CSVs and ``checkpoint.json`` under
+``data/full/backfill/``. Re-running skips finished shards and re-fetches an
+interrupted one from its first page: pages inside a window can shift while it
+is still open, so resuming never depends on server-side page boundaries.
+
+    python -m utilities.api.adisyo_backfill 2025-01-01 2025-07-01 --window-days 7 --workers 4
+    python -m utilities.api.adisyo_backfill 2025-01-01 2025-07-01 --merge
+"""
+import os
+import csv
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from utilities.api.adisyo_client import AdisyoClient, AdisyoError
+from utilities.api.adisyo_flatten import TABLES, flatten_full
+from utilities.api.ingest_pipeline import CsvSink, read_json, run_pipeline, write_json_atomic
+from utilities.data import version
+
+DATA_DIR = "data/full"
+SHARD_DIR = os.path.join(DATA_DIR, "backfill")
+PROGRESS_FILE = os.path.join(DATA_DIR, "progress.json")  # adisyo_full's checkpoint over the merged files
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+
+Window = Tuple[datetime, datetime]
+
+
+def split_windows(start: datetime, end: datetime, days: int) -> List[Window]:
+    """Cut ``[start, end)`` into consecutive windows of ``days`` days."""
+    windows = []
+    while start < end:
+        stop = min(start + timedelta(days=days), end)
+        windows.append((start, stop))
+        start = stop
+    return windows
+
+
+def shard_path(window: Window) -> str:
+    return os.path.join(SHARD_DIR, f"{window[0]:%Y%m%d}_{window[1]:%Y%m%d}")
+
+
+def read_checkpoint(path: str) -> Dict:
+    return read_json(os.path.join(path, "checkpoint.json"))
+
+
+def fetch_shard(client: AdisyoClient, window: Window) -> int:
+    """Fetch one window into its shard directory; return orders written."""
+    path = shard_path(window)
+    os.makedirs(path, exist_ok=True)
+    if read_checkpoint(path).get("done"):
+        return 0
+
+    params = {
+        "startDate": window[0].strftime(DATE_FMT),
+        "endDate": window[1].strftime(DATE_FMT),
+        "includeCancelled": "true",
+        "orderType": "",
+    }
+    # an unfinished shard starts over from clean files and a fresh checkpoint
+    checkpoint = os.path.join(path, "checkpoint.json")
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    sink = CsvSink({t: os.path.join(path, f"{t}.csv") for t in TABLES}, mode="w", checkpoint=checkpoint)
+    total = 0
+
+    def progress(page: int, n_orders: int) -> Dict:
+        nonlocal total
+        total += n_orders
+        print(f"🔄 {window[0]:%Y-%m-%d} → {window[1]:%Y-%m-%d}  page {page} ({n_orders} orders)")
+        return {
+            "start": params["startDate"],
+            "end": params["endDate"],
+            "page": page + 1,
+            "total_order_count": total,
+        }
+
+    run_pipeline(client.iter_pages("CompletedOrders", params), flatten_full, sink, checkpoint=progress)
+    sink.commit({"done": True})
+    return total
+
+
+def backfill(windows: List[Window], workers: int) -> None:
+    client = AdisyoClient(max_retries=10, pool_size=max(workers, 1))
+    total = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_shard, client, w): w for w in windows}
+        for fut in as_completed(futures):
+            w = futures[fut]
+            try:
+                n = fut.result()
+            except AdisyoError as e:
+                print(f"❌ Shard {w[0]:%Y-%m-%d} failed: {e}")
+                continue
+            total += n
+            print(f"✅ Shard {w[0]:%Y-%m-%d} → {w[1]:%Y-%m-%d} done ({n} orders)")
+    print(f"\n✅ Backfill finished. Orders in shards completed this run: {total}")
+
+
+def _header(paths: List[str]) -> List[str]:
+    """Union of the CSV headers of ``paths``, in order of first appearance."""
+    header: Dict[str, None] = {}
+    for path in paths:
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                header.update(dict.fromkeys(next(csv.reader(f), [])))
+    return list(header)
+
+
+def merge(windows: List[Window]) -> None:
+    """
+    Concatenate finished shards (in window order) into data/full/*.csv.
+    Orders seen in an earlier shard are dropped, which covers window-edge overlap.
+
+    The merged files replace data/full/*.csv the way ``CsvSink`` extends a
+    header: written beside them, then ``progress.json`` is published with their
+    sizes and a ``replacing`` marker before the renames, so adisyo_full's next
+    rollback neither truncates nor appends into a half-replaced file.
+    """
+    missing = [w for w in windows if not read_checkpoint(shard_path(w)).get("done")]
+    if missing:
+        print(f"❌ {len(missing)} shard(s) unfinished, run the backfill again first.")
+        return
+
+    targets = {t: os.path.join(DATA_DIR, f"{t}.csv") for t in TABLES}
+    files = {t: open(f"{targets[t]}.merge", "w", newline="", encoding="utf-8") for t in TABLES}
+    writers: Dict[str, csv.DictWriter] = {}
+    for table in TABLES:
+        header = _header([os.path.join(shard_path(w), f"{table}.csv") for w in windows])
+        writers[table] = csv.DictWriter(files[table], fieldnames=header)
+        if header:
+            writers[table].writeheader()
+    seen = set()
+    for w in windows:
+        path = shard_path(w)
+        fresh = set()
+        for table in TABLES:
+            src = os.path.join(path, f"{table}.csv")
+            if not os.path.exists(src) or not os.path.getsize(src):
+                continue
+            with open(src, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    if table == "orders":
+                        if row["id"] in seen:
+                            continue
+                        fresh.add(row["id"])
+                    elif row["orderId"] not in fresh:
+                        continue
+                    writers[table].writerow(row)
+        seen |= fresh
+    for f in files.values():
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+
+    replacing = {targets[t]: files[t].name for t in TABLES}
+    state = {k: v for k, v in read_json(PROGRESS_FILE).items() if k != "replacing"}
+    state["offsets"] = {t: os.path.getsize(files[t].name) for t in TABLES}
+    write_json_atomic(PROGRESS_FILE, {**state, "replacing": replacing})
+    for target, tmp in replacing.items():
+        os.replace(tmp, target)
+    write_json_atomic(PROGRESS_FILE, state)
+    version.updated(*targets.values())
+    print(f"✅ Merged {len(windows)} shards, {len(seen)} orders into {DATA_DIR}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Sharded parallel CompletedOrders backfill")
+    ap.add_argument("start", help="inclusive start date, YYYY-MM-DD")
+    ap.add_argument("end", help="exclusive end date, YYYY-MM-DD")
+    ap.add_argument("--window-days", type=int, default=7)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--merge", action="store_true", help="merge finished shards into data/full")
+    args = ap.parse_args()
+
+    windows = split_windows(
+        datetime.strptime(args.start, "%Y-%m-%d"),
+        datetime.strptime(args.end, "%Y-%m-%d"),
+        args.window_days,
+    )
+    if args.merge:
+        merge(windows)
+    else:
+        backfill(windows, args.workers)
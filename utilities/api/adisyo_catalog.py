@@ -0,0 +1,238 @@
+"""
+Catalog sync for Products / Features / Couriers / PaymentTypes.
+
+Each run hashes the API payload and only writes when it changed:
+
+* ``data/adisyo_<name>.csv`` – the current flat table (same columns as before),
+* ``data/catalog/<endpoint>/<YYYY-MM-DD>.csv.gz`` – dated compact snapshot,
+* ``data/catalog/<history>.csv`` – slowly-changing history of product unit
+  prices and feature surcharges, one row per ``[valid_from, valid_to)`` interval.
+
+``price_at`` joins the price that was valid at each order's time.
+
+    python -m utilities.api.adisyo_catalog            # all endpoints
+    python -m utilities.api.adisyo_catalog Products
+"""
+import os
+import csv
+import gzip
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from utilities.api.adisyo_client import AdisyoClient, AdisyoError
+from utilities.api.ingest_pipeline import read_json, write_json_atomic
+
+DATA_DIR = "data"
+CATALOG_DIR = os.path.join(DATA_DIR, "catalog")
+STATE_FILE = os.path.join(CATALOG_DIR, "catalog_state.json")
+TIME_FMT = "%Y-%m-%dT%H:%M:%S"  # same shape as the API's insertDate
+
+
+# ----------------------------------------------------------------------
+# Flatteners (payload → dimension rows)
+# ----------------------------------------------------------------------
+def flatten_products(payload: Dict) -> List[Dict]:
+    rows = []
+    for cat in payload.get("data") or []:
+        for product in cat.get("products", []):
+            for unit in product.get("productUnits", []):
+                for price in unit.get("prices", []):
+                    rows.append({
+                        "Category": cat["categoryName"],
+                        "Product Name": product["productName"],
+                        "Product ID": product["productId"],
+                        "Unit": unit["unitName"],
+                        "Unit ID": unit["productUnitId"],
+                        "Is Default Unit": unit["isDefault"],
+                        "Tax Rate": product["taxRate"],
+                        "Stock Follow": product["isStockFollow"],
+                        "Price": price["price"],
+                        "Order Type": price["orderType"]
+                    })
+    return rows
+
+
+def flatten_features(payload: Dict) -> List[Dict]:
+    rows = []
+    for group in (payload.get("data") or {}).get("featureGroups", []):
+        for feature in group.get("features", []):
+            for rel in feature.get("relatedProducts") or []:
+                rows.append({
+                    "Group ID": group["featureGroupId"],
+                    "Group Name": group["featuresGroupName"],
+                    "Feature Name": feature["featureName"],
+                    "Feature ID": feature["featureId"],
+                    "Product ID": rel["productId"],
+                    "Additional Price": rel["additionalPrice"],
+                    "Header": rel["featureHeaderName"],
+                    "Mandatory": group["necessaryCount"],
+                    "Selection Type": group["featureHeaderType"]
+                })
+    return rows
+
+
+def _listing(key: str, fields: List[str]) -> Callable[[Dict], List[Dict]]:
+    return lambda payload: [{f: item.get(f) for f in fields} for item in payload.get(key) or []]
+
+
+class History(NamedTuple):
+    """Slowly-changing attribute tracked per ``key`` in ``data/catalog/<file>``."""
+    file: str
+    key: Tuple[str, ...]
+    value: str
+
+
+class Catalog(NamedTuple):
+    csv_file: str
+    flatten: Callable[[Dict], List[Dict]]
+    history: Optional[History] = None
+
+
+CATALOGS: Dict[str, Catalog] = {
+    "Products": Catalog(
+        "adisyo_products.csv", flatten_products,
+        History("product_prices.csv", ("Product ID", "Unit ID", "Order Type"), "Price"),
+    ),
+    "Features": Catalog(
+        "adisyo_features.csv", flatten_features,
+        History("feature_prices.csv", ("Feature ID", "Product ID"), "Additional Price"),
+    ),
+    "Couriers": Catalog("adisyo_couriers.csv", _listing("Couriers", ["Id", "Name", "PhoneNumber"])),
+    "PaymentTypes": Catalog("adisyo_payment_types.csv", _listing("PaymentTypes", ["Id", "Name", "IsOnline"])),
+}
+
+
+# ----------------------------------------------------------------------
+# Writers
+# ----------------------------------------------------------------------
+def payload_hash(payload: Dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _write_csv(path: str, rows: List[Dict], fieldnames: List[str], opener=open) -> None:
+    tmp = f"{path}.tmp"
+    with opener(tmp, "wt", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def update_history(history: History, rows: List[Dict], now: str) -> int:
+    """
+    Close intervals whose value changed or whose key disappeared and open new
+    ones for changed or new keys. Returns the number of changes recorded.
+    """
+    path = os.path.join(CATALOG_DIR, history.file)
+    records: List[Dict] = []
+    if os.path.exists(path):
+        with open(path, newline="", encoding="utf-8") as f:
+            records = list(csv.DictReader(f))
+
+    def key_of(row: Dict) -> Tuple[str, ...]:
+        return tuple(str(row[k]) for k in history.key)
+
+    current = {key_of(r): str(r[history.value]) for r in rows}
+    open_now = {key_of(r): r for r in records if not r["valid_to"]}
+    changes = 0
+    for key, rec in open_now.items():
+        if current.get(key) != rec[history.value]:
+            rec["valid_to"] = now
+            changes += 1
+    for key, value in current.items():
+        rec = open_now.get(key)
+        if rec is None or rec["valid_to"]:
+            records.append({**dict(zip(history.key, key)), history.value: value,
+                            "valid_from": now, "valid_to": ""})
+            changes += rec is None
+    if changes:
+        _write_csv(path, records, [*history.key, history.value, "valid_from", "valid_to"])
+    return changes
+
+
+def sync_catalog(endpoint: str, client: Optional[AdisyoClient] = None) -> None:
+    catalog = CATALOGS[endpoint]
+    client = client or AdisyoClient()
+    try:
+        payload = client.get(endpoint)
+    except AdisyoError as e:
+        print("❌ Error:", e)
+        return
+
+    rows = catalog.flatten(payload)
+    if not rows:
+        print(f"⚠️ {endpoint}: empty response, keeping the existing '{catalog.csv_file}'")
+        return
+
+    state = read_json(STATE_FILE)
+    digest = payload_hash(payload)
+    if state.get(endpoint, {}).get("hash") == digest:
+        print(f"✅ {endpoint} unchanged since {state[endpoint]['synced']}, nothing written")
+        return
+
+    now = datetime.now()
+    os.makedirs(os.path.join(CATALOG_DIR, endpoint), exist_ok=True)
+    fieldnames = list(rows[0].keys())
+    _write_csv(os.path.join(DATA_DIR, catalog.csv_file), rows, fieldnames)
+    _write_csv(os.path.join(CATALOG_DIR, endpoint, f"{now:%Y-%m-%d}.csv.gz"), rows, fieldnames, gzip.open)
+    if catalog.history:
+        n = update_history(catalog.history, rows, now.strftime(TIME_FMT))
+        print(f"🕓 {endpoint}: {n} {catalog.history.value.lower()} change(s) recorded")
+
+    state[endpoint] = {"hash": digest, "synced": now.strftime(TIME_FMT), "rows": len(rows)}
+    write_json_atomic(STATE_FILE, state)
+    print(f"✅ Saved {len(rows)} {endpoint} rows to '{catalog.csv_file}'")
+
+
+# ----------------------------------------------------------------------
+# Point-in-time lookup
+# ----------------------------------------------------------------------
+def price_at(facts, history: str, on: Dict[str, str], time_col: str, value: str):
+    """
+    Attach the ``value`` valid at ``facts[time_col]`` from ``data/catalog/<history>``.
+    ``on`` maps fact columns to history key columns; ``facts`` needs the order
+    time, so join product lines to their orders first, e.g.
+    ``price_at(products.merge(orders[["order_id", "insert_date"]], on="order_id"),
+    "product_prices.csv", {"product_id": "Product ID"}, "insert_date", "Price")``.
+    Keys without a matching interval get NaN; history keys left out of ``on``
+    (e.g. unit or order type) resolve to the latest interval opened for the rest.
+    """
+    import pandas as pd
+
+    hist = pd.read_csv(os.path.join(CATALOG_DIR, history))
+    hist = hist.rename(columns={v: k for k, v in on.items()})
+    hist["valid_from"] = pd.to_datetime(hist["valid_from"])
+    hist["valid_to"] = pd.to_datetime(hist["valid_to"])
+
+    out = facts.copy()
+    out["_t"] = pd.to_datetime(out[time_col], errors="coerce", format="mixed")
+    out["_row"] = range(len(out))
+    left = out[["_row", "_t", *on]].dropna()
+    right = hist[[*on, value, "valid_from", "valid_to"]].dropna(subset=[*on, "valid_from"])
+    for col in on:
+        # merge_asof wants identical key dtypes: nullable Int64 ids vs the history's int64 / float64
+        numeric = pd.api.types.is_numeric_dtype(left[col]) and pd.api.types.is_numeric_dtype(right[col])
+        left[col] = left[col].astype("float64" if numeric else str)
+        right[col] = right[col].astype("float64" if numeric else str)
+    matched = pd.merge_asof(
+        left.sort_values("_t"), right.sort_values("valid_from"),
+        left_on="_t", right_on="valid_from", by=list(on), direction="backward",
+    )
+    expired = matched["valid_to"].notna() & (matched["_t"] >= matched["valid_to"])
+    matched.loc[expired, value] = float("nan")
+    out = out.merge(matched[["_row", value]], on="_row", how="left")
+    return out.drop(columns=["_t", "_row"])
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Sync the Adisyo catalog endpoints")
+    ap.add_argument("endpoints", nargs="*", help=f"any of {', '.join(CATALOGS)} (default: all)")
+    args = ap.parse_args()
+    unknown = set(args.endpoints) - set(CATALOGS)
+    if unknown:
+        ap.error(f"unknown endpoint(s): {', '.join(sorted(unknown))}")
+    client = AdisyoClient()
+    for endpoint in args.endpoints or CATALOGS:
+        sync_catalog(endpoint, client)
@@ -0,0 +1,233 @@
+"""
+Shared Adisyo API client.
+
+Every ingestion script goes through one pooled keep-alive ``requests.Session``
+with gzip negotiation, and a token-bucket limiter per endpoint, so a script
+only waits as long as the Adisyo quota actually requires instead of a fixed
+45/50/61 second sleep after every page.
+
+Run ingestion scripts as modules from the repository root, e.g.
+``python -m utilities.api.adisyo_full``.
+"""
+import os
+import time
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from utilities.api.raw_archive import RAW_DIR, RawArchive
+
+BASE_URL = "https://ext.adisyo.com/api/External/v2"
+THROTTLE_STATUS = 601  # Adisyo's "too many requests" code
+
+# Minimum seconds between two calls to the same endpoint.
+# CompletedOrders / RecentOrders answer 601 when called faster than ~40 sec.
+QUOTAS: Dict[str, float] = {
+    "CompletedOrders": 40.0,
+    "RecentOrders": 40.0,
+}
+DEFAULT_INTERVAL = 1.0
+MAX_INTERVAL = 1800.0  # never back off longer than 30 minutes
+
+
+def env_quotas(value: Optional[str] = None) -> Dict[str, float]:
+    """
+    ``adisyo_quotas`` overrides: ``"CompletedOrders=2,RecentOrders=2"``, or one
+    number for every endpoint in ``QUOTAS``.
+    """
+    value = (os.getenv("adisyo_quotas", "") if value is None else value).strip()
+    if not value:
+        return {}
+    if "=" not in value:
+        return dict.fromkeys(QUOTAS, float(value))
+    pairs = (item.split("=", 1) for item in value.split(",") if item.strip())
+    return {endpoint.strip(): float(seconds) for endpoint, seconds in pairs}
+
+
+class AdisyoError(RuntimeError):
+    """Non-recoverable API failure (bad status, too many retries, no credentials)."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message if status is None else f"{status}: {message}")
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at one token per ``interval`` seconds.
+
+    A 601 doubles the interval and blocks the bucket for one interval; every
+    success shrinks it back towards the configured quota.
+    """
+
+    def __init__(self, interval: float, capacity: int = 1):
+        self.base_interval = interval
+        self.interval = interval
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Block until a token is available; return the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                if wait <= 0:
+                    wait = (1 - self.tokens) * self.interval
+            time.sleep(wait)
+            waited += wait
+
+    def throttled(self, retry_after: Optional[float] = None) -> float:
+        """Register a 601: slow down and return how long the bucket is blocked."""
+        with self.lock:
+            self.interval = min(self.interval * 2, MAX_INTERVAL)
+            self.tokens = 0.0
+            pause = retry_after if retry_after else self.interval
+            self.blocked_until = time.monotonic() + pause
+            return pause
+
+    def succeeded(self) -> None:
+        """Recover towards the configured quota after a successful call."""
+        with self.lock:
+            if self.interval > self.base_interval:
+                self.interval = max(self.base_interval, self.interval * 0.75)
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+class AdisyoClient:
+    """Pooled, rate-limited access to the Adisyo External v2 API."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        consumer: Optional[str] = None,
+        base_url: Optional[str] = None,
+        quotas: Optional[Dict[str, float]] = None,
+        max_retries: int = 5,
+        timeout: float = 60,
+        pool_size: int = 8,
+        archive_dir: Optional[str] = RAW_DIR,
+    ):
+        load_dotenv()
+        api_key = api_key or os.getenv("adisyo_web_siparis")
+        api_secret = api_secret or os.getenv("adisyo_api")
+        consumer = consumer or os.getenv("adisyo_id", "burgerator")
+        if not (api_key and api_secret):
+            raise AdisyoError("Set ADISYO credentials in .env")
+
+        # adisyo_base_url points every script at a stand-in, e.g. utilities/other/mock_adisyo_server.py
+        self.base_url = (base_url or os.getenv("adisyo_base_url") or BASE_URL).rstrip("/")
+        # a stand-in has no 40 s quota (601s still teach the buckets its pace);
+        # adisyo_quotas, then ``quotas``, override per endpoint
+        live = QUOTAS if self.base_url == BASE_URL else {}
+        self.quotas = {**live, **env_quotas(), **(quotas or {})}
+        self.max_retries = max_retries
+        self.timeout = timeout
+        # every successful page is kept raw so schemas can be rebuilt offline
+        self.archive = RawArchive(archive_dir) if archive_dir else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "x-api-key": api_key,
+            "x-api-secret": api_secret,
+            "x-api-consumer": consumer,
+            "accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        """Rate budget shared by every caller of ``endpoint`` in this process."""
+        with self._buckets_lock:
+            if endpoint not in self._buckets:
+                interval = self.quotas.get(endpoint, DEFAULT_INTERVAL)
+                self._buckets[endpoint] = TokenBucket(interval)
+            return self._buckets[endpoint]
+
+    def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        """GET one endpoint, waiting for quota and backing off on 601 / 429 / 5xx."""
+        bucket = self.bucket(endpoint)
+        url = f"{self.base_url}/{endpoint}"
+        retries = 0
+        while True:
+            bucket.acquire()
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                retries += 1
+                if retries > self.max_retries:
+                    raise AdisyoError(str(e)) from e
+                time.sleep(min(2 ** retries, 60))
+                continue
+
+            if r.status_code in (THROTTLE_STATUS, 429):  # 429: a proxy's or the live API's own throttle
+                retries += 1
+                if retries > self.max_retries:
+                    raise AdisyoError("Too many retries", r.status_code)
+                pause = bucket.throttled(_retry_after(r))
+                print(f"⏳ {endpoint} rate limit hit. Backing off {pause:.0f} sec...")
+                continue
+
+            if r.status_code >= 500:  # transient server error: back off like a dropped connection
+                retries += 1
+                if retries > self.max_retries:
+                    raise AdisyoError(r.text, r.status_code)
+                pause = min(2 ** retries, 60)
+                print(f"⚠️  {endpoint} answered {r.status_code}. Retrying in {pause} sec...")
+                time.sleep(pause)
+                continue
+
+            if r.status_code != 200:
+                raise AdisyoError(r.text, r.status_code)
+
+            bucket.succeeded()
+            payload = r.json()
+            if self.archive:
+                self.archive.append(endpoint, params, payload)
+            return payload
+
+    def iter_pages(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        start_page: int = 1,
+        items_key: str = "orders",
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Yield ``(page, payload)`` until an empty page or ``pageCount`` is reached."""
+        page = start_page
+        while True:
+            payload = self.get(endpoint, {**(params or {}), "page": page})
+            if not payload.get(items_key):
+                return
+            yield page, payload
+            if page >= payload.get("pageCount", page):
+                return
+            page += 1
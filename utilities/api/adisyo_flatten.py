@@ -0,0 +1,177 @@
+"""
+Flatteners turning one Adisyo order payload into entity-table rows.
+
+Every flattener returns ``{"orders": [...], "products": [...], "features": [...],
+"payments": [...]}`` so writers can stay schema-agnostic.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List
+
+from utilities.data.derive import derive_rows
+from utilities.data.schema import normalize_timestamps
+
+TABLES = ("orders", "products", "features", "payments")
+
+Rows = Dict[str, List[Dict]]
+Flattener = Callable[[Dict], Rows]
+
+
+def flatten_full(order: Dict) -> Rows:
+    """data/full schema (camelCase, ``orderId`` foreign keys)."""
+    rows: Rows = {t: [] for t in TABLES}
+
+    rows["orders"].append({
+        "id": order.get("id"),
+        "tableName": order.get("tableName"),
+        "waiterName": order.get("waiterName"),
+        "orderTotal": order.get("orderTotal"),
+        "taxAmount": order.get("taxAmount"),
+        "currency": order.get("currency"),
+        "insertDate": order.get("insertDate"),
+        "updateDate": order.get("updateDate"),
+        "orderType": order.get("orderType"),
+        "status": order.get("status"),
+        "salesChannelName": order.get("salesChannelName"),
+        "paymentMethodName": order.get("paymentMethodName"),
+        "customerId": order.get("customerId"),
+        "orderNumber": order.get("orderNumber")
+    })
+
+    for p in order.get("products", []):
+        rows["products"].append({
+            "orderId": order.get("id"),
+            "productName": p.get("productName"),
+            "quantity": p.get("quantity"),
+            "unitPrice": p.get("unitPrice"),
+            "totalAmount": p.get("totalAmount"),
+            "description": p.get("description"),
+            "cancelReason": p.get("cancelReason"),
+            "productId": p.get("productId"),
+            "productCode": p.get("productCode"),
+            "groupName": p.get("groupName"),
+            "groupId": p.get("groupId")
+        })
+
+        for f in p.get("features", []):
+            rows["features"].append({
+                "orderId": order.get("id"),
+                "productId": p.get("productId"),
+                "featureName": f.get("featureName"),
+                "featureId": f.get("featureId"),
+                "additionalPrice": f.get("additionalPrice")
+            })
+
+    for payment in order.get("payments", []):
+        rows["payments"].append({
+            "orderId": payment.get("orderId"),
+            "paymentTypeId": payment.get("paymentTypeId"),
+            "paymentName": payment.get("paymentName"),
+            "amount": payment.get("amount"),
+            "currency": payment.get("currency"),
+            "exchangeRate": payment.get("exchangeRate"),
+            "insertDate": payment.get("insertDate"),
+            "customerId": payment.get("customerId"),
+            "customerName": payment.get("customerName"),
+            "customerSurname": payment.get("customerSurname"),
+            "isDebit": payment.get("isDebit")
+        })
+
+    return rows
+
+
+def flatten_historical(order: Dict) -> Rows:
+    """
+    data/historical schema: every scalar order field plus ``customer_*``,
+    and snake-case ``order_id`` / ``order_product_id`` keys on child tables.
+    """
+    rows: Rows = {t: [] for t in TABLES}
+
+    order_row = OrderedDict(
+        (k, v) for k, v in order.items()
+        if not isinstance(v, (dict, list)) and k != "customer"
+    )
+    customer = order.get("customer")
+    if customer and isinstance(customer, dict):
+        for k, v in customer.items():
+            order_row[f"customer_{k}"] = v
+    rows["orders"].append(order_row)
+
+    for p in order.get("products", []):
+        rows["products"].append({
+            "order_id": order["id"],
+            "order_product_id": p.get("id"),  # RecentOrders products may come without one
+            "product_id": p.get("productId"),
+            "productName": p.get("productName"),
+            "quantity": p.get("quantity"),
+            "unitPrice": p.get("unitPrice"),
+            "totalAmount": p.get("totalAmount"),
+            "category": p.get("categoryName"),
+            "isMenu": p.get("isMenu"),
+            "parentId": p.get("parentId"),
+            "discount": p.get("discountAmount")
+        })
+
+        for f in p.get("features", []):
+            rows["features"].append({
+                "order_product_id": p.get("id"),  # RecentOrders products may come without one
+                "feature_id": f.get("featureId"),
+                "featureName": f.get("featureName"),
+                "additionalPrice": f.get("additionalPrice")
+            })
+
+    for pay in order.get("payments", []):
+        rows["payments"].append({
+            "order_id": order["id"],
+            "paymentTypeId": pay.get("paymentTypeId"),
+            "paymentName": pay.get("paymentName"),
+            "amount": pay.get("amount"),
+            "currency": pay.get("currency"),
+            "insertDate": pay.get("insertDate")
+        })
+
+    return rows
+
+
+def flatten_compact(order: Dict) -> Rows:
+    """adisyo_historical.py schema: a fixed order subset keyed ``order_id``."""
+    rows = flatten_historical(order)
+    rows["orders"] = [{
+        "order_id" : order["id"],
+        "insertDate": order.get("insertDate"),
+        "updateDate": order.get("updateDate"),
+        "closedDate": order.get("closedDate"),
+        "orderTotal": order.get("orderTotal"),
+        "taxAmount" : order.get("taxAmount"),
+        "currency"  : order.get("currency"),
+        "orderType" : order.get("orderType"),
+        "status"    : order.get("status"),
+        "salesChannel": order.get("salesChannelName"),
+        "tableName" : order.get("tableName"),
+        "orderNumber": order.get("orderNumber"),
+        "customerId": order.get("customerId"),
+    }]
+    return rows
+
+
+# Target schemas a raw page archive can be replayed into
+SCHEMAS: Dict[str, Flattener] = {
+    "full": flatten_full,
+    "historical": flatten_historical,
+    "compact": flatten_compact,
+}
+
+
+def flatten_page(orders: Iterable[Dict], flatten: Flattener) -> Rows:
+    """
+    Flatten every order of one API page into a single batch per table, with
+    timestamps normalised to UTC epoch milliseconds (see ``schema.to_epoch_ms``)
+    and the derived order columns added (see ``derive``).
+    """
+    batch: Rows = {t: [] for t in TABLES}
+    for order in orders:
+        for table, rows in flatten(order).items():
+            batch.setdefault(table, []).extend(rows)
+    for table, rows in batch.items():
+        normalize_timestamps(table, rows)
+        derive_rows(table, rows)
+    return batch
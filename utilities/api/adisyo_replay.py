@@ -0,0 +1,79 @@
+"""
+Re-flatten the raw page archive into any target schema, offline.
+
+Orders are de-duplicated by ``id`` across the whole archive (the most
+recently fetched version wins), then written in pages of ``--batch`` orders
+through a ``CsvSink``, so columns first seen in a later page extend the header.
+
+Output files follow the target layout's table stems with ``--suffix``
+(``completed_orders_replay.csv``, ``products_replay.csv``, … for the historical
+and compact schemas, ``orders_replay.csv``, … for full) in that layout's data
+directory by default, where the loaders pick them up as one more partition.
+Files tracked by an ingest checkpoint (``data/full/progress.json``) are never
+overwritten.
+
+    python -m utilities.api.adisyo_replay --schema full
+    python -m utilities.api.adisyo_replay --schema historical --endpoint RecentOrders --out /tmp/recent
+"""
+import os
+import sys
+import argparse
+from typing import Dict, Optional
+
+from utilities.api.adisyo_flatten import SCHEMAS, TABLES
+from utilities.api.ingest_pipeline import CsvSink, read_json, run_pipeline
+from utilities.api.raw_archive import RAW_DIR, RawArchive
+from utilities.data.access import LAYOUTS
+
+ITEMS_KEY = {"CompletedOrders": "orders", "RecentOrders": "data"}
+# data layout each schema's tables belong to
+LAYOUT_OF = {"full": "full", "historical": "historical", "compact": "historical"}
+
+
+def latest_orders(archive: RawArchive, endpoint: str) -> Dict[int, Dict]:
+    orders: Dict[int, Dict] = {}
+    for record in archive.records(endpoint):
+        for o in record["payload"].get(ITEMS_KEY[endpoint]) or []:
+            orders.pop(o["id"], None)  # re-insert so output follows the latest fetch order
+            orders[o["id"]] = o
+    return orders
+
+
+def output_files(schema: str, out_dir: str, suffix: str) -> Dict[str, str]:
+    stems = LAYOUTS[LAYOUT_OF[schema]].stems
+    return {t: os.path.join(out_dir, f"{stems[t]}{suffix}.csv") for t in TABLES}
+
+
+def replay(schema: str, out_dir: Optional[str] = None, endpoint: str = "CompletedOrders",
+           raw_dir: str = RAW_DIR, batch: int = 1000, suffix: str = "_replay") -> int:
+    flatten = SCHEMAS[schema]
+    out_dir = out_dir or LAYOUTS[LAYOUT_OF[schema]].data_dir
+    files = output_files(schema, out_dir, suffix)
+
+    # adisyo_full's rollback would truncate files rewritten under its checkpoint
+    offsets = read_json(os.path.join(out_dir, "progress.json")).get("offsets") or {}
+    tracked = [p for p in files.values() if os.path.basename(p) in {f"{t}.csv" for t in offsets}]
+    if tracked:
+        raise ValueError(f"{', '.join(tracked)} tracked by {os.path.join(out_dir, 'progress.json')}: "
+                         f"replay with another --suffix or --out")
+
+    orders = list(latest_orders(RawArchive(raw_dir), endpoint).values())
+    os.makedirs(out_dir, exist_ok=True)
+    pages = ((i // batch + 1, {"orders": orders[i:i + batch]}) for i in range(0, len(orders), batch))
+    return run_pipeline(pages, flatten, CsvSink(files, mode="w"))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Rebuild CSV tables from the raw page archive")
+    ap.add_argument("--schema", choices=sorted(SCHEMAS), required=True)
+    ap.add_argument("--out", help="output directory (default: the schema's data directory)")
+    ap.add_argument("--suffix", default="_replay", help="appended to each table's file stem")
+    ap.add_argument("--endpoint", choices=sorted(ITEMS_KEY), default="CompletedOrders")
+    ap.add_argument("--raw-dir", default=RAW_DIR)
+    args = ap.parse_args()
+
+    try:
+        n = replay(args.schema, args.out, args.endpoint, args.raw_dir, suffix=args.suffix)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    print(f"✅ Replayed {n} orders from {args.raw_dir} ({args.schema} schema)")
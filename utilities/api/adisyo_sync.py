@@ -0,0 +1,201 @@
+"""
+Incremental high-water-mark sync for the data/historical tables.
+
+Instead of re-pulling everything from a hard-coded ``start_iso``, each table
+keeps a high-water mark (max ``updateDate`` / ``id``) in ``sync_state.json``.
+A run only fetches orders changed since the lowest mark:
+
+* RecentOrders ``minimumUpdateDate`` for the tail (last ~day),
+* CompletedOrders ``startDate`` if the mark is older than RecentOrders covers.
+
+Changed orders are upserted by ``order_id`` (and their products' features by
+``order_product_id``), so overlapping runs never duplicate rows.
+
+    python -m utilities.api.adisyo_sync
+"""
+import os
+import csv
+import json
+import pathlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from utilities.api.adisyo_client import AdisyoClient, AdisyoError
+from utilities.api.adisyo_flatten import TABLES, Rows, flatten_historical, flatten_page
+from utilities.data import version
+from utilities.data.schema import from_epoch_ms, to_epoch_ms
+
+OUT_DIR = pathlib.Path("data/historical")
+FILES = {
+    "orders"   : OUT_DIR / "completed_orders_2025.csv",
+    "products" : OUT_DIR / "products_2025.csv",
+    "features" : OUT_DIR / "features_2025.csv",
+    "payments" : OUT_DIR / "payments_2025.csv",
+}
+STATE_FILE = OUT_DIR / "sync_state.json"
+DEFAULT_START = "2025-01-01 00:00:00"
+API_FMT = "%Y-%m-%d %H:%M:%S"
+
+# RecentOrders only looks back ~24h; leave slack for the server's local clock
+RECENT_WINDOW = timedelta(hours=20)
+
+
+# ----------------------------------------------------------------------
+# High-water marks
+# ----------------------------------------------------------------------
+def load_state() -> Dict[str, Dict]:
+    if STATE_FILE.exists():
+        return json.loads(STATE_FILE.read_text())
+    mark = mark_from_file()
+    return {t: dict(mark) for t in TABLES}
+
+
+def save_state(state: Dict[str, Dict]) -> None:
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, STATE_FILE)
+
+
+def mark_from_file() -> Dict:
+    """Bootstrap a mark from the newest order already on disk (child tables share it)."""
+    mark = {"updateDate": None, "id": None}
+    path = FILES["orders"]
+    if not path.exists():
+        return mark
+    newest = None
+    with path.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            # epoch ms since ingest normalises timestamps; older rows hold ISO strings
+            stamp = to_epoch_ms(row.get("updateDate"))
+            if stamp is not None and stamp > (newest or 0):
+                newest = stamp
+            if row.get("id") and int(row["id"]) > (mark["id"] or 0):
+                mark["id"] = int(row["id"])
+    if newest is not None:
+        mark["updateDate"] = from_epoch_ms(newest).isoformat()
+    return mark
+
+
+def advance(mark: Dict, orders: List[Dict]) -> Dict:
+    # compared as epoch ms: the API mixes "T" / " " separators and fractional seconds
+    newest = to_epoch_ms(mark["updateDate"])
+    for o in orders:
+        stamp = to_epoch_ms(o.get("updateDate"))
+        if stamp is not None and stamp > (newest or 0):
+            newest = stamp
+        if o.get("id") and o["id"] > (mark["id"] or 0):
+            mark["id"] = o["id"]
+    if newest is not None:
+        mark["updateDate"] = from_epoch_ms(newest).isoformat()
+    return mark
+
+
+def lowest_mark(state: Dict[str, Dict]) -> Optional[str]:
+    """The oldest table mark, or None while any table has none."""
+    stamps = [to_epoch_ms(m["updateDate"]) for m in state.values()]
+    if not stamps or None in stamps:
+        return None
+    return from_epoch_ms(min(stamps)).isoformat()
+
+
+def to_api_date(iso: Optional[str]) -> str:
+    return iso[:19].replace("T", " ") if iso else DEFAULT_START
+
+
+# ----------------------------------------------------------------------
+# Fetch
+# ----------------------------------------------------------------------
+def fetch_changes(client: AdisyoClient, since: str) -> Dict[int, Dict]:
+    """All orders touched since ``since``, last version wins."""
+    changed: Dict[int, Dict] = {}
+    if datetime.now() - datetime.strptime(since, API_FMT) > RECENT_WINDOW:
+        params = {"startDate": since, "includeCancelled": "true", "orderType": ""}
+        for page, data in client.iter_pages("CompletedOrders", params):
+            print(f"📄 CompletedOrders page {page}")
+            changed.update((o["id"], o) for o in data["orders"])
+
+    for page, data in client.iter_pages("RecentOrders", {"minimumUpdateDate": since}, items_key="data"):
+        print(f"📄 RecentOrders page {page}")
+        changed.update((o["id"], o) for o in data["data"])
+    return changed
+
+
+# ----------------------------------------------------------------------
+# Upsert
+# ----------------------------------------------------------------------
+def upsert(table: str, key: str, stale: Set[str], rows: List[Dict]) -> Set[str]:
+    """
+    Rewrite ``table`` without rows whose ``key`` is in ``stale``, then append
+    ``rows``. Returns the ``order_product_id`` of every dropped product row.
+    """
+    path = FILES[table]
+    dropped: Set[str] = set()
+    fieldnames = list(rows[0].keys()) if rows else []
+    tmp = path.with_suffix(".csv.tmp")
+
+    with tmp.open("w", newline="", encoding="utf-8") as out:
+        if path.exists():
+            with path.open(newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                existing = reader.fieldnames or []
+                fieldnames = existing + [c for c in fieldnames if c not in existing]
+                writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction="ignore")
+                writer.writeheader()
+                for row in reader:
+                    if row[key] in stale:
+                        if table == "products":
+                            dropped.add(row["order_product_id"])
+                        continue
+                    writer.writerow(row)
+        elif fieldnames:
+            writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+        if fieldnames:
+            writer.writerows(rows)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, path)
+    return dropped
+
+
+def sync() -> None:
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    state = load_state()
+    since = to_api_date(lowest_mark(state))
+    print(f"🔄 Syncing orders changed since {since}")
+
+    try:
+        changed = fetch_changes(AdisyoClient(), since)
+    except AdisyoError as e:
+        print("❌ Error:", e)
+        return
+    if not changed:
+        print("✅ Already up to date.")
+        return
+
+    orders = list(changed.values())
+    batch: Rows = flatten_page(orders, flatten_historical)
+    order_ids = {str(i) for i in changed}
+
+    def commit(table: str) -> None:
+        # a crash before the last table leaves its mark behind, so it is re-fetched next run
+        state[table] = advance(state.get(table) or {"updateDate": None, "id": None}, orders)
+        save_state(state)
+
+    # products first: the features of every replaced product must go too
+    dropped = upsert("products", "order_id", order_ids, batch["products"])
+    commit("products")
+    product_ids = dropped | {str(p["order_product_id"]) for p in batch["products"]
+                             if p["order_product_id"] is not None}
+    upsert("features", "order_product_id", product_ids, batch["features"])
+    commit("features")
+    upsert("payments", "order_id", order_ids, batch["payments"])
+    commit("payments")
+    upsert("orders", "id", order_ids, batch["orders"])
+    commit("orders")
+    version.updated(*map(str, FILES.values()))
+    print(f"✅ Upserted {len(orders)} orders. High-water mark: {state['orders']['updateDate']}")
+
+
+if __name__ == "__main__":
+    sync()
@@ -0,0 +1,303 @@
+"""
+Staged producer/consumer ingest pipeline.
+
+    fetch thread ──q──▶ flatten thread ──q──▶ writer (caller thread)
+
+The fetcher only ever waits on the API quota, never on disk: flattening and
+CSV encoding happen downstream behind bounded queues. The writer buffers each
+page's rows per table and, once the page is complete, appends them as one
+batch into large buffered files and commits with a real ``flush`` + ``fsync``
+before reporting it done.
+
+Commit protocol: a page is committed when the sink's checkpoint JSON, holding
+the byte length of every table file, is atomically replaced. A page that fails
+or is interrupted before that is discarded, never flushed, and anything past
+the offsets (a crash mid-write) is truncated when the sink is reopened, so
+every page is written exactly once.
+"""
+import csv
+import json
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional, Tuple
+
+from utilities.api.adisyo_flatten import Flattener, flatten_page
+from utilities.data import version
+
+BUFFER_SIZE = 1 << 20  # 1 MiB write buffer per table file
+_DONE = object()
+
+
+def read_json(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    """Write ``data`` so readers see either the old or the new file, never half of one."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:  # directories can't be fsync'ed on every platform
+        pass
+
+
+def sibling_files(orders_csv: str) -> Dict[str, str]:
+    """``.../completed_orders<suffix>.csv`` → the four table CSVs sharing that suffix."""
+    folder, name = os.path.split(orders_csv)
+    suffix = name[len("completed_orders"):]
+    return {
+        "orders": orders_csv,
+        "products": os.path.join(folder, f"products{suffix}"),
+        "features": os.path.join(folder, f"features{suffix}"),
+        "payments": os.path.join(folder, f"payments{suffix}"),
+    }
+
+
+class CsvSink:
+    """
+    One CSV per table, appended to (``mode="w"`` truncates them first). Rows
+    are buffered per page and only written by ``commit``; ``discard`` drops a
+    page that did not complete. Files are opened lazily: an empty file gets a
+    header, an existing one keeps its own, extended (file rewritten) when a page
+    brings columns it lacks, e.g. the derived order columns on an older file.
+    Tables without a configured file are ignored.
+
+    With a ``checkpoint`` path the sink is transactional: ``state`` holds the
+    last committed checkpoint and reopening rolls every file back to it.
+    """
+
+    def __init__(self, files: Dict[str, str], mode: str = "a", checkpoint: Optional[str] = None):
+        self.files = files
+        self.checkpoint = checkpoint
+        self.state: Dict[str, Any] = read_json(checkpoint) if checkpoint else {}
+        if mode == "w":
+            # truncate every table up front so tables without rows this run don't keep stale data
+            for path in files.values():
+                open(path, "w").close()
+        else:
+            self._rollback()
+        self.pending: Dict[str, List[Dict]] = {}
+        self.handles: Dict[str, IO] = {}
+        self.writers: Dict[str, csv.DictWriter] = {}
+
+    def _publish(self, state: Dict[str, Any]) -> None:
+        self.state = state
+        write_json_atomic(self.checkpoint, state)
+
+    def _offsets(self) -> Dict[str, int]:
+        return {table: os.path.getsize(path) if os.path.exists(path) else 0
+                for table, path in self.files.items()}
+
+    def _rollback(self) -> None:
+        # a header extension whose checkpoint was published is finished first (its offsets count)
+        replacing = self.state.get("replacing") or {}
+        for path, tmp in replacing.items():
+            if os.path.exists(tmp):
+                os.replace(tmp, path)
+        if replacing:
+            self._publish({k: v for k, v in self.state.items() if k != "replacing"})
+        offsets = self.state.get("offsets")
+        if offsets is None:  # no commit protocol yet (legacy progress file): trust the files
+            return
+        for table, path in self.files.items():
+            committed = offsets.get(table, 0)
+            if os.path.exists(path) and os.path.getsize(path) > committed:
+                print(f"↩️  Rolling {path} back to last committed page ({committed} bytes)")
+                with open(path, "r+b") as f:
+                    f.truncate(committed)
+
+    def _extend(self, table: str, header: List[str], extra: List[str]) -> None:
+        """
+        Rewrite ``table``'s file with ``extra`` columns appended to its header
+        (empty on older rows). Runs before any row of the page is written, so the
+        file holds committed rows only; the checkpoint is published with the new
+        size before the rename and ``_rollback`` finishes an interrupted one.
+        """
+        path = self.files[table]
+        tmp = f"{path}.extend"
+        fieldnames = header + extra
+        with open(path, newline="", encoding="utf-8") as src, \
+                open(tmp, "w", newline="", encoding="utf-8") as out:
+            reader, writer = csv.reader(src), csv.writer(out)
+            next(reader, None)
+            writer.writerow(fieldnames)
+            for row in reader:
+                writer.writerow(row + [""] * (len(fieldnames) - len(row)))
+            out.flush()
+            os.fsync(out.fileno())
+        if self.checkpoint:
+            offsets = {**self._offsets(), table: os.path.getsize(tmp)}
+            self._publish({**self.state, "offsets": offsets, "replacing": {path: tmp}})
+        os.replace(tmp, path)
+        if self.checkpoint:
+            self._publish({k: v for k, v in self.state.items() if k != "replacing"})
+        print(f"➕ {path}: + {', '.join(extra)}")
+
+    def _writer(self, table: str, fieldnames: List[str]) -> csv.DictWriter:
+        path = self.files[table]
+        writer = self.writers.get(table)
+        header = list(writer.fieldnames) if writer else None
+        if header is None and os.path.exists(path) and os.path.getsize(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), None)
+        extra = [c for c in fieldnames if header and c not in header]
+        if writer and not extra:
+            return writer
+        if table in self.handles:
+            self.handles.pop(table).close()
+        if extra:
+            self._extend(table, header, extra)
+            header += extra
+        f = open(path, "a", newline="", encoding="utf-8", buffering=BUFFER_SIZE)
+        writer = csv.DictWriter(f, fieldnames=header or fieldnames, extrasaction="ignore")
+        if not header:
+            writer.writeheader()
+        self.handles[table], self.writers[table] = f, writer
+        return writer
+
+    def write(self, table: str, rows: List[Dict]) -> None:
+        if rows and table in self.files:
+            self.pending.setdefault(table, []).extend(rows)
+
+    def discard(self) -> None:
+        """Drop the rows of a page that did not complete."""
+        self.pending.clear()
+
+    def commit(self, state: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write the buffered page to every table, flush + fsync, then (transactional
+        sinks only) publish ``state`` together with the new file offsets.
+        """
+        # headers first: a file is only rewritten while it holds committed rows alone
+        writers = {table: self._writer(table, list(dict.fromkeys(k for r in rows for k in r)))
+                   for table, rows in self.pending.items()}
+        for table, rows in self.pending.items():
+            writers[table].writerows(rows)
+        self.pending.clear()
+        for f in self.handles.values():
+            f.flush()
+            os.fsync(f.fileno())
+        if self.checkpoint:
+            self._publish({**self.state, **(state or {}), "offsets": self._offsets()})
+
+    def close(self) -> None:
+        """Close the files; rows not committed are dropped (and rolled back on reopen)."""
+        for f in self.handles.values():
+            f.close()
+        self.handles.clear()
+        self.writers.clear()
+        self.pending.clear()
+        version.updated(*self.files.values())
+
+
+class MultiSink:
+    """Fan one pipeline out to several sinks; ``state`` is the first sink's."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+        self.state = sinks[0].state if sinks else {}
+
+    def write(self, table: str, rows: List[Dict]) -> None:
+        for sink in self.sinks:
+            sink.write(table, rows)
+
+    def discard(self) -> None:
+        for sink in self.sinks:
+            sink.discard()
+
+    def commit(self, state: Optional[Dict[str, Any]] = None) -> None:
+        for sink in self.sinks:
+            sink.commit(state)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+def _pump(source: Iterable, out: queue.Queue, stop: threading.Event,
+          transform: Callable = lambda item: item) -> None:
+    """Move items from ``source`` to ``out``; forward exceptions, end with ``_DONE``."""
+    try:
+        for item in source:
+            if stop.is_set():
+                return
+            out.put(transform(item))
+    except BaseException as e:  # re-raised in the writer thread
+        out.put(e)
+    out.put(_DONE)
+
+
+def _drain(q: queue.Queue):
+    while True:
+        item = q.get()
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def run_pipeline(
+    pages: Iterable[Tuple[int, Dict]],
+    flatten: Flattener,
+    sink: CsvSink,
+    items_key: str = "orders",
+    checkpoint: Optional[Callable[[int, int], Dict[str, Any]]] = None,
+    on_commit: Optional[Callable[[int, int], None]] = None,
+    queue_size: int = 8,
+) -> int:
+    """
+    Drive ``pages`` (e.g. ``client.iter_pages(...)``) through flatten → write.
+    ``checkpoint(page, orders_in_page)`` returns the resume state committed
+    atomically with the page's rows; ``on_commit(page, orders_in_page)`` runs
+    once the page is durable.
+    Returns the number of orders written. API errors surface here after every
+    page fetched before them has been committed.
+    """
+    raw: queue.Queue = queue.Queue(maxsize=queue_size)
+    flat: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def flatten_item(item):
+        page, payload = item
+        return page, flatten_page(payload.get(items_key) or [], flatten)
+
+    threads = [
+        threading.Thread(target=_pump, args=(pages, raw, stop), daemon=True),
+        threading.Thread(target=_pump, args=(_drain(raw), flat, stop, flatten_item), daemon=True),
+    ]
+    for t in threads:
+        t.start()
+
+    total = 0
+    try:
+        for page, batch in _drain(flat):
+            for table, rows in batch.items():
+                sink.write(table, rows)
+            # only a complete page is committed, with the state that resumes after it
+            sink.commit(checkpoint(page, len(batch["orders"])) if checkpoint else None)
+            total += len(batch["orders"])
+            if on_commit:
+                on_commit(page, len(batch["orders"]))
+    except BaseException:
+        # error / Ctrl-C mid-page: its rows are neither written nor checkpointed
+        sink.discard()
+        raise
+    finally:
+        stop.set()
+        sink.close()
+    return total
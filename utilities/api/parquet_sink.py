@@ -0,0 +1,239 @@
+"""
+Zstd Parquet sink partitioned by order year/month:
+``<root>/<table>/year=YYYY/month=MM/<source>-<first key>-<last key>.parquet``.
+
+    python -m utilities.api.parquet_sink data/historical/completed_orders_2025_2.csv ...
+"""
+import os
+import sys
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from utilities.api.ingest_pipeline import read_json, sibling_files, write_json_atomic
+from utilities.data import version
+from utilities.data.schema import DATE, csv_rows, dtype_of, from_epoch_ms, to_epoch_ms
+
+PARQUET_DIR = "data/historical/parquet"
+COMPRESSION = "zstd"
+
+TIMESTAMP = pa.timestamp("ms", tz="UTC")  # ingest stores UTC epoch ms
+
+# pandas dtypes of the schema manifest → Arrow storage types; unlisted columns are strings
+ARROW_TYPES: Dict[str, pa.DataType] = {
+    "Int64": pa.int64(),
+    "Int32": pa.int32(),
+    "Int16": pa.int16(),
+    "Int8": pa.int8(),
+    "float64": pa.float64(),
+    "boolean": pa.bool_(),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+    DATE: TIMESTAMP,
+}
+PARTITION_SCHEMA = pa.schema([("year", pa.int16()), ("month", pa.int8())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+# column whose first / last value in a page names the page's file; other tables use the order key
+FILE_KEYS = {"products": "order_product_id", "features": "order_product_id"}
+
+# file footer schemas by (path, size, mtime), so unifying them only opens new files
+_schemas: Dict[Tuple[str, int, float], pa.Schema] = {}
+
+
+def _coerce(value: Any, dtype: pa.DataType) -> Any:
+    if value is None or value == "":
+        return None
+    if pa.types.is_integer(dtype):
+        return int(float(value))
+    if pa.types.is_floating(dtype):
+        return float(value)
+    if pa.types.is_boolean(dtype):
+        return value in (True, "True", "true", "1")
+    if dtype == TIMESTAMP:
+        return to_epoch_ms(value)
+    return str(value)
+
+
+def arrow_type(table: str, column: str) -> pa.DataType:
+    return ARROW_TYPES.get(dtype_of(table, column), pa.string())
+
+
+def to_arrow(table: str, rows: List[Dict]) -> pa.Table:
+    columns = list(dict.fromkeys(k for r in rows for k in r))
+    arrays, fields = [], []
+    for col in columns:
+        dtype = arrow_type(table, col)
+        arrays.append(pa.array([_coerce(r.get(col), dtype) for r in rows], type=dtype))
+        fields.append(pa.field(col, dtype))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _order_key(row: Dict) -> Any:
+    for col in ("order_id", "orderId", "id"):
+        if row.get(col) not in (None, ""):
+            return str(row[col])
+    return None
+
+
+def _file_key(table: str, row: Dict) -> Any:
+    col = FILE_KEYS.get(table)
+    return str(row[col]) if col and row.get(col) not in (None, "") else _order_key(row)
+
+
+def _schema(path: str) -> pa.Schema:
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime)
+    if key not in _schemas:
+        _schemas[key] = pq.read_schema(path)
+    return _schemas[key]
+
+
+def dataset(table: str, root: str = PARQUET_DIR) -> ds.Dataset:
+    """``table``'s files as one dataset over the union of their schemas (``ds.dataset`` takes the first)."""
+    files = ds.dataset(os.path.join(root, table), format="parquet", partitioning=PARTITIONING).files
+    unified = pa.unify_schemas([*(_schema(f) for f in files), PARTITION_SCHEMA])
+    return ds.dataset(os.path.join(root, table), schema=unified, format="parquet", partitioning=PARTITIONING)
+
+
+class ParquetSink:
+    """Drop-in for ``CsvSink``: rows are buffered per page and written on ``commit``."""
+
+    def __init__(self, root: str = PARQUET_DIR, source: str = "ingest", checkpoint: Optional[str] = None):
+        self.root = root
+        self.source = source
+        self.checkpoint = checkpoint
+        self.state: Dict[str, Any] = read_json(checkpoint) if checkpoint else {}
+        self.pending: Dict[str, List[Dict]] = {}
+        # order → (year, month) and product → order, remembered across pages
+        self.partition_of: Dict[str, Tuple[int, int]] = {}
+        self.order_of_product: Dict[str, str] = {}
+        # order_product_id → (year, month) of products written by an earlier run
+        self.partition_of_product: Dict[str, Tuple[int, int]] = {}
+
+    def write(self, table: str, rows: List[Dict]) -> None:
+        if rows:
+            self.pending.setdefault(table, []).extend(rows)
+
+    def _partition(self, table: str, row: Dict) -> Tuple[int, int]:
+        if table == "orders":
+            when = from_epoch_ms(to_epoch_ms(row.get("insertDate")))
+            key = (when.year, when.month) if when else (0, 0)
+            self.partition_of[_order_key(row)] = key
+            return key
+        order = _order_key(row)
+        if order is None and table == "features":
+            order = self.order_of_product.get(str(row.get("order_product_id")))
+        if table == "products" and row.get("order_product_id") is not None:
+            self.order_of_product[str(row["order_product_id"])] = order
+        if order is None and table == "features":
+            return self.partition_of_product.get(str(row.get("order_product_id")), (0, 0))
+        return self.partition_of.get(order, (0, 0))
+
+    def _on_disk(self, table: str, key: str, values: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+        """(year, month) of the ``table`` rows already written whose ``key`` is one of ``values``."""
+        values = sorted(set(values))
+        if not values or not os.path.isdir(os.path.join(self.root, table)):
+            return {}
+        data = dataset(table, self.root)
+        if key not in data.schema.names:
+            return {}
+        dtype = data.schema.field(key).type
+        wanted = pa.array([_coerce(v, dtype) for v in values], type=dtype)
+        found = data.to_table(columns=[key, "year", "month"], filter=ds.field(key).isin(wanted))
+        keys, years, months = (found[c].to_pylist() for c in (key, "year", "month"))
+        return {str(k): (y, m) for k, y, m in zip(keys, years, months)}
+
+    def _recall(self, table: str, rows: List[Dict]) -> None:
+        """Place children of orders committed by an earlier run (or process) from the store on disk."""
+        missing = {_order_key(r) for r in rows} - {None} - set(self.partition_of)
+        for key in ("order_id", "id"):  # compact orders are keyed order_id, historical ones id
+            found = self._on_disk("orders", key, missing)
+            self.partition_of.update(found)
+            missing -= set(found)
+        if table == "features":
+            products = {str(r["order_product_id"]) for r in rows
+                        if _order_key(r) is None and r.get("order_product_id") not in (None, "")}
+            products -= set(self.order_of_product) | set(self.partition_of_product)
+            self.partition_of_product.update(self._on_disk("products", "order_product_id", products))
+
+    def _write_partition(self, table: str, part: Tuple[int, int], rows: List[Dict]) -> None:
+        folder = os.path.join(self.root, table, f"year={part[0]:04d}", f"month={part[1]:02d}")
+        os.makedirs(folder, exist_ok=True)
+        first, last = _file_key(table, rows[0]), _file_key(table, rows[-1])
+        # named by the page's own keys: a replayed page overwrites its file
+        path = os.path.join(folder, f"{self.source}-{first}-{last}.parquet")
+        pq.write_table(to_arrow(table, rows), f"{path}.tmp", compression=COMPRESSION,
+                       row_group_size=len(rows))
+        os.replace(f"{path}.tmp", path)
+
+    def commit(self, state: Optional[Dict[str, Any]] = None) -> None:
+        # orders first so their children can be placed in the same partition
+        for table in sorted(self.pending, key=lambda t: (t != "orders", t != "products")):
+            if table != "orders":
+                self._recall(table, self.pending[table])
+            by_part: Dict[Tuple[int, int], List[Dict]] = {}
+            for row in self.pending[table]:
+                by_part.setdefault(self._partition(table, row), []).append(row)
+            for part, rows in by_part.items():
+                self._write_partition(table, part, rows)
+        self.pending.clear()
+        if self.checkpoint:
+            self.state = {**self.state, **(state or {})}
+            write_json_atomic(self.checkpoint, self.state)
+
+    def discard(self) -> None:
+        self.pending.clear()
+
+    def close(self) -> None:
+        self.pending.clear()  # rows of a page that never committed
+        version.updated(self.root)  # the manifest lives next to parquet/
+
+
+def read_parquet(
+    table: str,
+    root: str = PARQUET_DIR,
+    columns: Optional[List[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    filter: Optional[ds.Expression] = None,
+):
+    """``table`` as a DataFrame, reading only ``columns`` and the months in [start, end]."""
+    month = ds.field("year").cast(pa.int32()) * 100 + ds.field("month").cast(pa.int32())
+    expr = filter
+    if start is not None:
+        lower = month >= start.year * 100 + start.month
+        expr = lower if expr is None else expr & lower
+    if end is not None:
+        upper = month <= end.year * 100 + end.month
+        expr = upper if expr is None else expr & upper
+    return dataset(table, root).to_table(columns=columns, filter=expr).to_pandas()
+
+
+def convert_csv(files: Dict[str, str], root: str = PARQUET_DIR, chunk: int = 5000) -> None:
+    """Load existing historical CSVs (orders first) into the Parquet store."""
+    sink = ParquetSink(root, source=os.path.splitext(os.path.basename(files["orders"]))[0])
+    for table in ("orders", "products", "features", "payments"):
+        if not os.path.exists(files.get(table, "")):
+            continue
+        with open(files[table], newline="", encoding="utf-8") as f:
+            batch: List[Dict] = []
+            for row in csv_rows(f):
+                batch.append(row)
+                if len(batch) >= chunk:
+                    sink.write(table, batch)
+                    sink.commit()
+                    batch = []
+            sink.write(table, batch)
+            sink.commit()
+        print(f"✅ {files[table]} → {root}/{table}")
+    sink.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m utilities.api.parquet_sink data/historical/completed_orders_<suffix>.csv ...")
+    for orders_csv in sys.argv[1:]:
+        convert_csv(sibling_files(orders_csv))
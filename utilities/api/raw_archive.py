@@ -0,0 +1,87 @@
+"""
+Append-only archive of raw Adisyo API pages.
+
+Every successful response is appended as one JSON line to
+``data/raw/<endpoint>/<YYYY-MM-DD>.jsonl.gz`` (one gzip member per page, in a
+single write), so any target CSV schema can be rebuilt offline with
+``adisyo_replay`` instead of another multi-hour API crawl. A member torn by a
+crash is skipped on read and the pages appended after it are still returned.
+The archive is local data: ``data/raw/`` is git-ignored.
+"""
+import gzip
+import json
+import os
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+RAW_DIR = "data/raw"
+GZIP_MAGIC = b"\x1f\x8b\x08"  # start of every gzip member (deflate)
+
+
+def _members(data: bytes) -> Iterator[Optional[bytes]]:
+    """Decompressed gzip members of ``data``; None for a torn one, skipped up to the next member header."""
+    view, pos = memoryview(data), 0
+    while pos < len(data):
+        inflate = zlib.decompressobj(wbits=31)
+        try:
+            out = inflate.decompress(view[pos:])
+        except zlib.error:
+            out = None
+        if out is None or not inflate.eof:
+            yield None
+            pos = data.find(GZIP_MAGIC, pos + 1)
+            if pos < 0:
+                return
+            continue
+        yield out
+        pos = len(data) - len(inflate.unused_data)
+
+
+def _decode(member: Optional[bytes]) -> Optional[List[Dict]]:
+    if member is None:
+        return None
+    try:
+        return [json.loads(line) for line in member.decode("utf-8").splitlines()]
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+
+
+class RawArchive:
+    def __init__(self, root: str = RAW_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+
+    def append(self, endpoint: str, params: Optional[Dict], payload: Dict) -> None:
+        now = datetime.now(timezone.utc)
+        record = {
+            "fetched_at": now.isoformat(timespec="seconds"),
+            "endpoint": endpoint,
+            "params": params or {},
+            "payload": payload,
+        }
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        folder = os.path.join(self.root, endpoint)
+        with self.lock:
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"{now:%Y-%m-%d}.jsonl.gz"), "ab") as f:
+                f.write(gzip.compress(line.encode("utf-8")))
+
+    def records(self, endpoint: str) -> Iterator[Dict]:
+        """Yield archived records of ``endpoint`` in fetch order."""
+        folder = os.path.join(self.root, endpoint)
+        if not os.path.isdir(folder):
+            return
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith(".jsonl.gz"):
+                continue
+            with open(os.path.join(folder, name), "rb") as f:
+                data = f.read()
+            for member in _members(data):
+                records = _decode(member)
+                if records is None:
+                    # a crash mid-append tears one member; the ones around it are intact
+                    print(f"⚠️  Torn archive record in {name}, skipped.")
+                    continue
+                yield from records
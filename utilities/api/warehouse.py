@@ -0,0 +1,221 @@
+"""
+Embedded SQLite warehouse (data/historical/warehouse.db) with ``order_fact`` / ``product_fact`` views.
+
+    python -m utilities.api.warehouse data/historical/completed_orders_2025_2.csv ...
+"""
+import os
+import sys
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from utilities.api.ingest_pipeline import sibling_files
+from utilities.data import version
+from utilities.data.schema import DATE, canonical, csv_rows, dtype_of, to_epoch_ms
+
+WAREHOUSE_PATH = "data/historical/warehouse.db"
+
+# child tables without a key of their own: rows are replaced per parent key
+CHILD_KEYS = {"features": "order_product_id", "payments": "order_id"}
+
+# Key and fact columns every table is created with; any other column the
+# flatteners emit is added on first sight.
+DDL = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id     INTEGER PRIMARY KEY,
+    insert_date  INTEGER,  -- UTC epoch ms
+    order_total  REAL
+);
+CREATE TABLE IF NOT EXISTS products (
+    order_product_id INTEGER PRIMARY KEY,
+    order_id         INTEGER NOT NULL,
+    quantity         REAL,
+    total_amount     REAL
+);
+CREATE TABLE IF NOT EXISTS features (
+    order_product_id INTEGER NOT NULL,
+    feature_id       INTEGER,
+    additional_price REAL
+);
+CREATE TABLE IF NOT EXISTS payments (
+    order_id     INTEGER NOT NULL,
+    payment_name TEXT,
+    amount       REAL
+);
+CREATE TABLE IF NOT EXISTS ingest_state (
+    source TEXT PRIMARY KEY,
+    state  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_orders_insert_date     ON orders (insert_date);
+CREATE INDEX IF NOT EXISTS ix_products_order_id      ON products (order_id);
+CREATE INDEX IF NOT EXISTS ix_features_order_product ON features (order_product_id);
+CREATE INDEX IF NOT EXISTS ix_payments_order_id      ON payments (order_id);
+
+CREATE VIEW IF NOT EXISTS order_fact AS
+SELECT o.*,
+       COALESCE((SELECT SUM(p.quantity) FROM products p WHERE p.order_id = o.order_id), 0) AS product_count,
+       (SELECT SUM(p.total_amount) FROM products p WHERE p.order_id = o.order_id) AS item_total,
+       COALESCE((SELECT SUM(f.additional_price) FROM products p
+                 JOIN features f ON f.order_product_id = p.order_product_id
+                 WHERE p.order_id = o.order_id), 0) AS feature_extra,
+       (SELECT SUM(y.amount) FROM payments y WHERE y.order_id = o.order_id) AS paid_amount,
+       (SELECT GROUP_CONCAT(DISTINCT y.payment_name) FROM payments y WHERE y.order_id = o.order_id) AS payment_methods
+FROM orders o;
+
+CREATE VIEW IF NOT EXISTS product_fact AS
+SELECT p.*, o.insert_date,
+       COALESCE((SELECT SUM(f.additional_price) FROM features f
+                 WHERE f.order_product_id = p.order_product_id), 0) AS feature_extra
+FROM products p
+JOIN orders o ON o.order_id = p.order_id;
+"""
+
+
+def _value(table: str, column: str, value: Any) -> Any:
+    if value == "":
+        return None
+    if dtype_of(table, column) == DATE:
+        return to_epoch_ms(value)
+    if isinstance(value, str) and dtype_of(table, column) == "boolean":
+        return int(value.lower() in ("true", "1"))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _affinity(table: str, column: str) -> str:
+    dtype = dtype_of(table, column) or ""
+    if dtype.startswith("Int") or dtype in ("boolean", DATE):
+        return "INTEGER"
+    return "REAL" if dtype.startswith("float") else "TEXT"
+
+
+def connect(path: str = WAREHOUSE_PATH) -> sqlite3.Connection:
+    """Open (and create, if needed) the warehouse."""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    con = sqlite3.connect(path, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.executescript(DDL)
+    return con
+
+
+def query(sql: str, params: Sequence = (), path: str = WAREHOUSE_PATH):
+    """Run ``sql`` against the warehouse and return a DataFrame."""
+    import pandas as pd
+
+    con = connect(path)
+    try:
+        return pd.read_sql_query(sql, con, params=params)
+    finally:
+        con.close()
+
+
+class WarehouseSink:
+    """``run_pipeline`` sink: each page and its resume state (under ``source``) are one transaction."""
+
+    def __init__(self, path: str = WAREHOUSE_PATH, source: Optional[str] = None):
+        self.con = connect(path)
+        self.path = path
+        self.source = source
+        self.columns: Dict[str, List[str]] = {}
+        self.cleared: Dict[str, set] = {t: set() for t in CHILD_KEYS}  # parent keys replaced this transaction
+        self.state: Dict[str, Any] = {}
+        if source:
+            row = self.con.execute("SELECT state FROM ingest_state WHERE source = ?", (source,)).fetchone()
+            self.state = json.loads(row[0]) if row else {}
+
+    def _table_columns(self, table: str) -> List[str]:
+        if table not in self.columns:
+            self.columns[table] = [r[1] for r in self.con.execute(f"PRAGMA table_info({table})")]
+        return self.columns[table]
+
+    def _ensure_columns(self, table: str, names: Iterable[str]) -> None:
+        known = self._table_columns(table)
+        for name in names:
+            if name not in known:
+                self.con.execute(f'ALTER TABLE {table} ADD COLUMN "{name}" {_affinity(table, name)}')
+                known.append(name)
+
+    def _replace_orders(self, order_ids: List[Any]) -> None:
+        """Drop earlier versions of these orders' child rows before re-inserting them."""
+        for i in range(0, len(order_ids), 500):
+            ids = order_ids[i:i + 500]
+            marks = ",".join("?" * len(ids))
+            self.con.execute(
+                f"DELETE FROM features WHERE order_product_id IN "
+                f"(SELECT order_product_id FROM products WHERE order_id IN ({marks}))", ids)
+            self.con.execute(f"DELETE FROM products WHERE order_id IN ({marks})", ids)
+            self.con.execute(f"DELETE FROM payments WHERE order_id IN ({marks})", ids)
+
+    def _replace_children(self, table: str, rows: List[Dict]) -> None:
+        """Drop stored rows of the parents in ``rows``, once per transaction (chunks may split a parent)."""
+        key = CHILD_KEYS[table]
+        keys = [k for k in dict.fromkeys(r.get(key) for r in rows) if k not in self.cleared[table]]
+        self.cleared[table].update(keys)
+        for i in range(0, len(keys), 500):
+            ids = keys[i:i + 500]
+            self.con.execute(f"DELETE FROM {table} WHERE {key} IN ({','.join('?' * len(ids))})", ids)
+
+    def write(self, table: str, rows: List[Dict]) -> None:
+        if not rows:
+            return
+        rows = [{canonical(table, k): v for k, v in r.items()} for r in rows]
+        columns = list(dict.fromkeys(c for r in rows for c in r))
+        self._ensure_columns(table, columns)
+        records = [tuple(_value(table, c, r.get(c)) for c in columns) for r in rows]
+        if table == "orders":
+            self._replace_orders([r["order_id"] for r in rows])
+        elif table in CHILD_KEYS:
+            self._replace_children(table, rows)
+        quoted = ",".join(f'"{c}"' for c in columns)
+        verb = "INSERT OR REPLACE" if table in ("orders", "products") else "INSERT"
+        self.con.executemany(
+            f"{verb} INTO {table} ({quoted}) VALUES ({','.join('?' * len(columns))})", records)
+
+    def commit(self, state: Optional[Dict[str, Any]] = None) -> None:
+        if self.source:
+            self.state = {**self.state, **(state or {})}
+            self.con.execute("INSERT OR REPLACE INTO ingest_state VALUES (?, ?)",
+                             (self.source, json.dumps(self.state)))
+        self.con.commit()
+        self.cleared = {t: set() for t in CHILD_KEYS}
+
+    def discard(self) -> None:
+        self.con.rollback()
+        self.cleared = {t: set() for t in CHILD_KEYS}
+
+    def close(self) -> None:
+        self.con.close()  # an open (uncommitted) page transaction is rolled back
+        version.updated(self.path)
+
+
+def load_csv(files: Dict[str, str], path: str = WAREHOUSE_PATH, chunk: int = 5000) -> int:
+    """Bulk-load one set of historical CSVs (orders first); return the order count."""
+    sink = WarehouseSink(path)
+    n_orders = 0
+    for table in ("orders", "products", "features", "payments"):
+        if not os.path.exists(files.get(table, "")):
+            continue
+        with open(files[table], newline="", encoding="utf-8") as f:
+            batch: List[Dict] = []
+            for row in csv_rows(f):
+                batch.append(row)
+                n_orders += table == "orders"
+                if len(batch) >= chunk:
+                    sink.write(table, batch)
+                    batch = []
+            sink.write(table, batch)
+        sink.commit()
+        print(f"✅ {files[table]} → {path}:{table}")
+    sink.close()
+    return n_orders
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m utilities.api.warehouse data/historical/completed_orders_<suffix>.csv ...")
+    for orders_csv in sys.argv[1:]:
+        load_csv(sibling_files(orders_csv))
@@ -0,0 +1,415 @@
+"""
+One data-access layer for every dashboard.
+
+    orders(start, end, columns=["order_id", "order_total"], filters={"external_app_name": ["Trendyol"]})
+
+returns canonical, typed frames (see ``schema``) from whichever store holds
+the table in a directory, preferring the SQLite warehouse (if the table has
+rows there), then the Parquet store (if ``parquet/<table>`` exists), then plain
+CSV. Only ``adisyo_burgerator`` fills the first two; sync, replay, compaction
+and the other fetchers write CSV. CSV partitions written after the preferred
+store are therefore read alongside it, newest version of an order winning as
+between CSV partitions, and a warning names them once (load them into the
+store to make it whole again). Projections and date predicates are pushed down:
+
+* warehouse – only the requested columns are selected, with a ``WHERE`` on the
+  indexed ``insert_date`` and ``IN`` lists for ``filters``;
+* Parquet – month partitions outside the range are skipped, a row filter on
+  ``insertDate`` / ``filters`` runs inside the scan and only the requested
+  column chunks are decoded;
+* CSV – only the requested columns are parsed (``usecols``), rows are
+  filtered right after.
+
+CSV tables may be split over several files: every ``<stem>.csv`` and
+``<stem>_*.csv`` in the directory (``completed_orders_2025_2.csv``,
+``payments_full.csv`` …) is a partition. They are discovered on each read,
+parsed in parallel (the C parser releases the GIL while tokenising) and
+stitched with overlaps removed: an order present in several files is taken from the most
+recently written one, together with its products / payments / features.
+
+``start`` / ``end`` are local dates or datetimes; a date ``end`` includes that
+whole day. Child tables (products, features, payments) have no timestamp of
+their own: a date range selects the children of the orders placed in it.
+Callers that already hold those orders pass their keys as
+``filters={"order_id": ...}`` to skip the semi-join.
+"""
+import os
+import glob
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utilities.data import schema
+
+HISTORICAL_DIR = "data/historical"
+FULL_DIR = "data/full"
+
+DateLike = Union[date, datetime, str, None]
+Filters = Optional[Dict[str, Any]]
+
+
+class Layout(NamedTuple):
+    data_dir: str
+    stems: Dict[str, str]  # table → CSV file stem inside data_dir
+
+
+LAYOUTS: Dict[str, Layout] = {
+    "historical": Layout(HISTORICAL_DIR, {
+        "orders": "completed_orders",
+        "products": "products",
+        "features": "features",
+        "payments": "payments",
+    }),
+    "full": Layout(FULL_DIR, {
+        "orders": "orders",
+        "products": "products",
+        "features": "features",
+        "payments": "payments",
+    }),
+    "recent": Layout("data", {"orders": "adisyo_recent_orders"}),
+}
+
+# column identifying the same order across overlapping CSV partitions
+PARTITION_KEYS = {
+    "orders": "order_id",
+    "products": "order_id",
+    "payments": "order_id",
+    "features": "order_product_id",
+}
+WORKERS = os.cpu_count() or 1
+
+# parsed CSV partitions by (path, size, mtime, table, columns): after an ingest
+# only the files that changed are parsed again
+PARTITION_CACHE_SIZE = 32
+_parsed: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_parsed_lock = threading.Lock()
+
+# warehouse views and the manifest table their columns follow
+VIEWS = {"order_fact": "orders", "product_fact": "products"}
+
+_warned: set = set()  # CSV partitions already reported as newer than their store
+log = logging.getLogger(__name__)
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+def _as_datetime(value: DateLike) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def _bounds(start: DateLike, end: DateLike) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Local ``[lo, hi)`` bounds; a plain-date ``end`` covers its whole day."""
+    hi = _as_datetime(end)
+    if hi is not None and not isinstance(end, datetime) and hi.time() == time():
+        hi += timedelta(days=1)
+    return _as_datetime(start), hi
+
+
+def _values(value: Any) -> List[Any]:
+    values = list(value) if pd.api.types.is_list_like(value) else [value]
+    return [v.item() if hasattr(v, "item") else v for v in values]
+
+
+def _warehouse_has(path: str, table: str) -> bool:
+    from utilities.api.warehouse import query
+
+    return not query(f"SELECT 1 FROM {VIEWS.get(table, table)} LIMIT 1", path=path).empty
+
+
+def backend(data_dir: str, table: str = "orders") -> str:
+    """``warehouse``, ``parquet`` or ``csv``: the preferred store holding ``table`` in ``data_dir``."""
+    db = os.path.join(data_dir, "warehouse.db")
+    if os.path.exists(db) and _warehouse_has(db, table):
+        return "warehouse"
+    if os.path.isdir(os.path.join(data_dir, "parquet", table)):
+        return "parquet"
+    return "csv"
+
+
+def _store_mtime(data_dir: str, kind: str, table: str) -> float:
+    """When the warehouse / ``table``'s Parquet files were last written."""
+    if kind == "warehouse":
+        db = os.path.join(data_dir, "warehouse.db")
+        return max(os.path.getmtime(p) for p in (db, f"{db}-wal") if os.path.exists(p))
+    files = glob.glob(os.path.join(data_dir, "parquet", table, "**", "*.parquet"), recursive=True)
+    return max(map(os.path.getmtime, files), default=0.0)
+
+
+def newer_partitions(table: str, layout: str = "historical", data_dir: Optional[str] = None) -> List[str]:
+    """CSV partitions of ``table`` written after its preferred store (none when that is CSV)."""
+    data_dir = data_dir or LAYOUTS[layout].data_dir
+    kind = backend(data_dir, table)
+    if kind == "csv" or table not in LAYOUTS[layout].stems:
+        return []
+    try:
+        paths = partitions(table, layout, data_dir)
+    except FileNotFoundError:
+        return []
+    since = _store_mtime(data_dir, kind, table)
+    newer = [p for p in paths if os.path.getmtime(p) > since]
+    report = [p for p in newer if (p, kind) not in _warned]
+    if report:
+        _warned.update((p, kind) for p in report)
+        # once per file and process, not on every Streamlit rerun
+        log.warning("%s newer than the %s store in %s: read alongside it until loaded "
+                    "(python -m utilities.api.%s ...)", ", ".join(map(os.path.basename, report)), kind,
+                    data_dir, "warehouse" if kind == "warehouse" else "parquet_sink")
+    return newer
+
+
+def _order_keys(table: str, start: DateLike, end: DateLike, layout: str, data_dir: str) -> Tuple[str, List[Any]]:
+    """Child-table key column and the keys whose order falls in ``[start, end]``."""
+    order_ids = read("orders", start, end, columns=["order_id"], layout=layout, data_dir=data_dir)["order_id"]
+    if table != "features" or "order_id" in _columns(table, layout, data_dir):
+        return "order_id", _values(order_ids.dropna().unique())
+    products = read("products", columns=["order_id", "order_product_id"],
+                    filters={"order_id": order_ids.dropna().unique()}, layout=layout, data_dir=data_dir)
+    return "order_product_id", _values(products["order_product_id"].dropna().unique())
+
+
+def _columns(table: str, layout: str, data_dir: str) -> List[str]:
+    """Canonical column names of a Parquet or CSV ``table``."""
+    if backend(data_dir, table) == "parquet":
+        return list(_parquet_names(os.path.join(data_dir, "parquet"), table))
+    path = partitions(table, layout, data_dir)[0]
+    return [schema.canonical(table, c) for c in pd.read_csv(path, nrows=0).columns]
+
+
+def partitions(table: str, layout: str = "historical", data_dir: Optional[str] = None) -> List[str]:
+    """CSV files holding ``table``, most recently written first."""
+    data_dir = data_dir or LAYOUTS[layout].data_dir
+    stem = LAYOUTS[layout].stems[table]
+    paths = glob.glob(os.path.join(data_dir, f"{stem}.csv")) + glob.glob(os.path.join(data_dir, f"{stem}_*.csv"))
+    if not paths:
+        raise FileNotFoundError(f"no {stem}*.csv in {data_dir}")
+    return sorted(paths, key=lambda p: (os.path.getmtime(p), p), reverse=True)
+
+
+# ----------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------
+def _read_warehouse(path: str, table: str, columns: Optional[List[str]],
+                    lo: Optional[datetime], hi: Optional[datetime], filters: Dict[str, List]) -> pd.DataFrame:
+    from utilities.api.warehouse import query
+
+    where: List[str] = []
+    params: List[Any] = []
+    span = []
+    if lo is not None:
+        span.append("insert_date >= ?")
+        params.append(schema.to_epoch_ms(lo))
+    if hi is not None:
+        span.append("insert_date < ?")
+        params.append(schema.to_epoch_ms(hi))
+    if span:
+        in_range = " AND ".join(span)
+        if VIEWS.get(table, table) == "orders":
+            where.append(in_range)
+        elif table == "features":
+            where.append("order_product_id IN (SELECT order_product_id FROM products WHERE order_id IN "
+                         f"(SELECT order_id FROM orders WHERE {in_range}))")
+        else:
+            where.append(f"order_id IN (SELECT order_id FROM orders WHERE {in_range})")
+    for col, values in filters.items():
+        where.append(f'"{col}" IN ({",".join("?" * len(values))})')
+        params.extend(values)
+    if columns:
+        # like the other backends, skip columns the store does not have (yet): SQLite
+        # would otherwise read an unknown "name" as a string literal
+        stored = set(query(f"PRAGMA table_info({table})", path=path)["name"])
+        columns = [c for c in columns if c in stored]
+    selected = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+    sql = f"SELECT {selected} FROM {table}" + (f" WHERE {' AND '.join(where)}" if where else "")
+    return schema.conform(query(sql, params, path=path), VIEWS.get(table, table))
+
+
+def _parquet_names(root: str, table: str) -> Dict[str, str]:
+    """Canonical → stored (camelCase) column names of a Parquet table."""
+    from utilities.api.parquet_sink import dataset
+
+    names = dataset(table, root).schema.names
+    return {schema.canonical(table, n): n for n in names if n not in ("year", "month")}
+
+
+def _read_parquet(root: str, table: str, columns: Optional[List[str]],
+                  lo: Optional[datetime], hi: Optional[datetime], filters: Dict[str, List]) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from utilities.api.parquet_sink import read_parquet
+
+    names = _parquet_names(root, table)
+    expr = None
+    if table == "orders":
+        stamp = ds.field(names["insert_date"]).cast(pa.int64())
+        if lo is not None:
+            expr = stamp >= schema.to_epoch_ms(lo)
+        if hi is not None:
+            upper = stamp < schema.to_epoch_ms(hi)
+            expr = upper if expr is None else expr & upper
+    for col, values in filters.items():
+        # dictionary-encoded labels compare as plain strings
+        field = ds.field(names[col])
+        if schema.dtype_of(table, col) == schema.LABEL:
+            field = field.cast(pa.string())
+        match = field.isin(values)
+        expr = match if expr is None else expr & match
+    stored = [names[c] for c in columns if c in names] if columns else list(names.values())
+    last = hi - timedelta(milliseconds=1) if hi is not None else None
+    df = read_parquet(table, root, stored, lo, last, expr)
+    return schema.conform(df, table)
+
+
+def _parse(path: str, table: str, usecols: Optional[set]) -> pd.DataFrame:
+    st = os.stat(path)
+    key = (path, st.st_size, st.st_mtime_ns, table, frozenset(usecols) if usecols else None)
+    with _parsed_lock:
+        if key in _parsed:
+            _parsed.move_to_end(key)
+            return _parsed[key]
+    df = schema.read_csv(path, table, usecols=usecols)
+    with _parsed_lock:
+        for old in [k for k in _parsed if k[0] == path and k[1:3] != key[1:3]]:
+            del _parsed[old]  # superseded version of this file
+        _parsed[key] = df
+        while len(_parsed) > PARTITION_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    return df
+
+
+def _read_partition(path: str, table: str, usecols: Optional[set],
+                    lo: Optional[datetime], hi: Optional[datetime], filters: Dict[str, List]) -> pd.DataFrame:
+    df = _parse(path, table, usecols)
+    mask = pd.Series(True, index=df.index)
+    if table == "orders":
+        if lo is not None:
+            mask &= df["insert_date"] >= lo
+        if hi is not None:
+            mask &= df["insert_date"] < hi
+    for col, values in filters.items():
+        mask &= df[col].isin(values)
+    # callers add columns to what they get back; never hand out the cached frame itself
+    return df[mask] if not mask.all() else df.copy(deep=False)
+
+
+def _stitch(frames: List[pd.DataFrame], table: str) -> pd.DataFrame:
+    """Concatenate partitions (preferred first), dropping orders an earlier one already holds."""
+    key = PARTITION_KEYS.get(table)
+    kept: List[pd.DataFrame] = []
+    seen: List[np.ndarray] = []
+    for df in frames:
+        if key in df.columns:
+            # blank rows left by old writers have no key
+            drop = df[key].isna() | df[key].isin(np.concatenate(seen)) if seen else df[key].isna()
+            if table == "orders":
+                drop |= df[key].duplicated()
+            if drop.any():
+                df = df[~drop]
+            seen.append(df[key].dropna().unique().to_numpy(dtype="int64"))
+        if len(df) or not kept:
+            kept.append(df)
+    if len(kept) == 1:
+        return kept[0]
+    # categories differ per file: concat falls back to object, conform re-encodes
+    return schema.conform(pd.concat(kept, ignore_index=True), table)
+
+
+def _read_csv(paths: List[str], table: str, columns: Optional[List[str]],
+              lo: Optional[datetime], hi: Optional[datetime], filters: Dict[str, List]) -> pd.DataFrame:
+    usecols = None
+    if columns:
+        usecols = set(columns) | set(filters) | {PARTITION_KEYS.get(table)}
+        if table == "orders" and (lo or hi):
+            usecols.add("insert_date")
+    def read_one(path: str) -> pd.DataFrame:
+        return _read_partition(path, table, usecols, lo, hi, filters)
+
+    workers = min(len(paths), WORKERS)
+    if workers == 1:  # worker threads get their own malloc arenas: don't pay for a pool that can't help
+        frames = [read_one(p) for p in paths]
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            frames = list(pool.map(read_one, paths))
+    df = _stitch(frames, table)
+    return df[[c for c in columns if c in df.columns]] if columns else df
+
+
+# ----------------------------------------------------------------------
+# Public API
+# ----------------------------------------------------------------------
+def read(
+    table: str,
+    start: DateLike = None,
+    end: DateLike = None,
+    columns: Optional[Iterable[str]] = None,
+    filters: Filters = None,
+    layout: str = "historical",
+    data_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    ``table`` (orders, products, features, payments; warehouse views too)
+    restricted to orders placed in ``[start, end]``, to ``columns`` and to rows
+    where every ``filters`` column equals the value / one of the values given.
+    """
+    data_dir = data_dir or LAYOUTS[layout].data_dir
+    columns = list(columns) if columns else None
+    filters = {col: _values(v) for col, v in (filters or {}).items()}
+    lo, hi = _bounds(start, end)
+    kind = backend(data_dir, table)
+    newer = newer_partitions(table, layout, data_dir)
+
+    keyed = {"order_id", "order_product_id"} & set(filters)
+    file_filters = filters
+    if table != "orders" and (lo is not None or hi is not None) and not keyed and (kind != "warehouse" or newer):
+        # semi-join on the orders in range (SQL does its own); lo/hi still prune Parquet month partitions
+        key, keys = _order_keys(table, start, end, layout, data_dir)
+        file_filters = {**filters, key: keys}
+
+    if kind == "warehouse":
+        df = _read_warehouse(os.path.join(data_dir, "warehouse.db"), table, columns, lo, hi, filters)
+    elif kind == "parquet":
+        df = _read_parquet(os.path.join(data_dir, "parquet"), table, columns, lo, hi, file_filters)
+    else:
+        return _read_csv(partitions(table, layout, data_dir), table, columns, lo, hi, file_filters)
+    if not newer:
+        return df
+    df = _stitch([_read_csv(newer, table, columns, lo, hi, file_filters), df], table)
+    return df[[c for c in columns if c in df.columns]] if columns else df
+
+
+def orders(start: DateLike = None, end: DateLike = None, columns: Optional[Iterable[str]] = None,
+           filters: Filters = None, layout: str = "historical", data_dir: Optional[str] = None) -> pd.DataFrame:
+    return read("orders", start, end, columns, filters, layout, data_dir)
+
+
+def products(start: DateLike = None, end: DateLike = None, columns: Optional[Iterable[str]] = None,
+             filters: Filters = None, layout: str = "historical", data_dir: Optional[str] = None) -> pd.DataFrame:
+    return read("products", start, end, columns, filters, layout, data_dir)
+
+
+def features(start: DateLike = None, end: DateLike = None, columns: Optional[Iterable[str]] = None,
+             filters: Filters = None, layout: str = "historical", data_dir: Optional[str] = None) -> pd.DataFrame:
+    return read("features", start, end, columns, filters, layout, data_dir)
+
+
+def payments(start: DateLike = None, end: DateLike = None, columns: Optional[Iterable[str]] = None,
+             filters: Filters = None, layout: str = "historical", data_dir: Optional[str] = None) -> pd.DataFrame:
+    return read("payments", start, end, columns, filters, layout, data_dir)
+
+
+def date_bounds(layout: str = "historical", data_dir: Optional[str] = None) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """First and last ``insert_date`` on disk, reading that one column only."""
+    stamps = orders(columns=["insert_date"], layout=layout, data_dir=data_dir)["insert_date"]
+    return stamps.min(), stamps.max()
@@ -0,0 +1,115 @@
+"""
+``st.cache_data`` entry points shared by the pages and the background warmer.
+
+Each function takes the content version of the data it reads
+(``version.current``) as an argument, so a new ingest recomputes only what
+depends on it. Pages and ``utilities.data.warmer`` call the same functions with
+the same arguments, so whatever the warmer computed is a cache hit for the
+next visitor.
+
+The filter and payment indexes (``utilities.data.filters``) are ``st.cache_resource``:
+read-only once built, so every session shares one instance instead of
+unpickling a copy per rerun.
+"""
+from typing import Tuple
+
+import pandas as pd
+import streamlit as st
+
+from utilities.data import access, loaders
+from utilities.data.filters import FilterIndex, PaymentIndex
+from utilities.data.access import FULL_DIR, HISTORICAL_DIR
+
+RECENT_DIR = access.LAYOUTS["recent"].data_dir
+
+
+# ---------------  data/adisyo_recent_orders.csv (pages/1_Dashboard.py)  ---------------- #
+@st.cache_data(show_spinner=False)
+def recent_orders(orders_version: str) -> pd.DataFrame:
+    return loaders.load_recent()
+
+
+@st.cache_resource(show_spinner=False)
+def recent_filters(orders_version: str) -> FilterIndex:
+    return FilterIndex(recent_orders(orders_version),
+                       ["delivery_app", "payment_method", "region", "status", "time_of_day"])
+
+
+# ---------------  data/historical (pages/3_HistoricalDashboard.py)  ---------------- #
+@st.cache_data(show_spinner=False)
+def historical_bounds(orders_version: str) -> Tuple:
+    """First and last order day, as ``date``s (what ``st.date_input`` returns)."""
+    lo, hi = access.date_bounds(data_dir=HISTORICAL_DIR)
+    return lo.date(), hi.date()
+
+
+@st.cache_data(show_spinner=False)
+def historical(start, end, data_version: str) -> loaders.Frames:
+    # only the selected range is read (date predicate pushed into the store)
+    return loaders.load_historical(HISTORICAL_DIR, start, end)
+
+
+@st.cache_resource(show_spinner=False)
+def historical_payments(start, end, data_version: str) -> PaymentIndex:
+    orders, _, payments, _ = historical(start, end, data_version)
+    return PaymentIndex(orders, payments)
+
+
+@st.cache_resource(show_spinner=False)
+def historical_filters(start, end, data_version: str) -> FilterIndex:
+    index = FilterIndex(historical(start, end, data_version)[0], ["external_app_name", "district"])
+    paid = historical_payments(start, end, data_version)
+    return index.add("payment_name", paid.rows, paid.names())  # every method an order was paid with
+
+
+@st.cache_data(show_spinner=False)
+def history(orders_version: str) -> pd.DataFrame:
+    """Full-history projection for the cohort / weekday sections."""
+    return loaders.load_history(HISTORICAL_DIR)
+
+
+@st.cache_data(show_spinner=False)
+def history_cohort(orders_version: str) -> pd.DataFrame:
+    return loaders.cohort_counts(history(orders_version), "customer_id", "insert_date")
+
+
+@st.cache_data(show_spinner=False)
+def history_weekday(orders_version: str) -> pd.DataFrame:
+    return loaders.weekday_share(history(orders_version), "external_app_name", "order_total", "insert_date")
+
+
+# ---------------  data/full (pages/4_NewDashboard.py)  ---------------- #
+@st.cache_data(show_spinner=False)
+def full(data_version: str) -> loaders.Frames:
+    return loaders.load_full(FULL_DIR)
+
+
+@st.cache_resource(show_spinner=False)
+def full_payments(data_version: str) -> PaymentIndex:
+    orders, _, _, payments = full(data_version)
+    return PaymentIndex(orders, payments)
+
+
+@st.cache_resource(show_spinner=False)
+def full_filters(data_version: str) -> FilterIndex:
+    index = FilterIndex(full(data_version)[0], ["table_name"])
+    paid = full_payments(data_version)
+    return index.add("payment_name", paid.rows, paid.names())
+
+
+@st.cache_data(show_spinner=False)
+def product_costs(data_version: str) -> pd.DataFrame:
+    return loaders.load_product_cost_data(FULL_DIR)
+
+
+@st.cache_data(show_spinner=False)
+def full_cohort(data_version: str) -> pd.DataFrame:
+    orders = full(data_version)[0]
+    return loaders.cohort_counts(orders, "customer_id", "insert_date")
+
+
+@st.cache_data(show_spinner=False)
+def full_weekday(data_version: str) -> pd.DataFrame:
+    orders = full(data_version)[0]
+    branch_orders = orders.assign(branch=orders["table_name"].astype(object).fillna("Unknown"))  # or however you identify branches
+    return loaders.weekday_share(branch_orders, "branch", "order_total", "insert_date")
@@ -0,0 +1,245 @@
+"""
+Compact overlapping CSV partitions into one deduplicated, key-sorted file per table (external merge sort).
+
+    python -m utilities.data.compact
+    python -m utilities.data.compact data/historical --chunk-rows 500000 --dry-run
+"""
+import os
+import csv
+import json
+import heapq
+import shutil
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utilities.api.ingest_pipeline import read_json, write_json_atomic
+from utilities.data import schema, version
+from utilities.data.access import HISTORICAL_DIR, LAYOUTS, PARTITION_KEYS, partitions
+
+MANIFEST = "compaction_manifest.json"
+CHECKPOINT = "progress.json"  # adisyo_full's offsets over data/full/*.csv
+ARCHIVE_DIR = "compacted"
+CHUNK_ROWS = 50_000
+FAN_IN = 64  # runs open at once per merge pass: memory is one chunk plus one row per run
+
+# merge key: (key, rank of the source partition)
+SortKey = Tuple[int, int]
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+def _key(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))  # ids written by pandas as "123.0"
+
+
+def _sort_key(row: List[str]) -> SortKey:
+    # run rows are [rank, key, *columns]
+    return _key(row[1]), int(row[0])
+
+
+def _header(path: str) -> List[str]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _union_header(paths: List[str]) -> List[str]:
+    columns: List[str] = []
+    for path in paths:
+        columns += [c for c in _header(path) if c not in columns]
+    return columns
+
+
+def _key_column(table: str, columns: List[str]) -> str:
+    key = PARTITION_KEYS[table]
+    for c in columns:
+        if schema.canonical(table, c) == key:
+            return c
+    raise ValueError(f"{table}: no {key} column in {columns}")
+
+
+# ----------------------------------------------------------------------
+# Phase 1: sorted runs
+# ----------------------------------------------------------------------
+def _write_run(rows: List[List[str]], tmp: str, n: int) -> str:
+    rows.sort(key=_sort_key)
+    path = os.path.join(tmp, f"run_{n:05d}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+
+def make_runs(paths: List[str], columns: List[str], key_col: str, tmp: str,
+              chunk_rows: int, stats: List[Dict]) -> List[str]:
+    """Spill every partition as sorted runs of ``[rank, key, *columns]`` rows."""
+    runs: List[str] = []
+    for rank, path in enumerate(paths):
+        rows: List[List[str]] = []
+        count = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in schema.csv_rows(f):
+                count += 1
+                if not record.get(key_col):  # keyless rows: the loaders drop them too
+                    continue
+                rows.append([str(rank), record[key_col]] + [record.get(c) or "" for c in columns])
+                if len(rows) >= chunk_rows:
+                    runs.append(_write_run(rows, tmp, len(runs)))
+                    rows = []
+        if rows:
+            runs.append(_write_run(rows, tmp, len(runs)))
+        stats.append({"file": os.path.basename(path), "rows": count, "bytes": os.path.getsize(path)})
+    return runs
+
+
+# ----------------------------------------------------------------------
+# Phase 2: k-way merge with dedupe
+# ----------------------------------------------------------------------
+def _read_run(path: str) -> Iterator[List[str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.reader(f)
+
+
+def _merge(runs: List[str]) -> Iterator[List[str]]:
+    # heapq.merge is stable across its inputs, so equal keys keep run (= file, chunk) order
+    return heapq.merge(*(_read_run(r) for r in runs), key=_sort_key)
+
+
+def reduce_runs(runs: List[str], tmp: str) -> List[str]:
+    """Merge consecutive groups of runs until at most ``FAN_IN`` are left."""
+    n = len(runs)
+    while len(runs) > FAN_IN:
+        merged = []
+        for i in range(0, len(runs), FAN_IN):
+            path = os.path.join(tmp, f"run_{n:05d}.csv")
+            n += 1
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(_merge(runs[i:i + FAN_IN]))
+            for r in runs[i:i + FAN_IN]:
+                os.remove(r)
+            merged.append(path)
+        runs = merged
+    return runs
+
+
+def dedupe(rows: Iterator[List[str]], one_per_key: bool) -> Iterator[List[str]]:
+    """Keep each key's rows from its most preferred partition only (its first row with ``one_per_key``)."""
+    current, owner = None, None
+    for row in rows:
+        rank, key = row[0], _key(row[1])
+        if key != current:
+            current, owner = key, rank
+            yield row
+        elif rank == owner and not one_per_key:
+            yield row
+
+
+# ----------------------------------------------------------------------
+# Job
+# ----------------------------------------------------------------------
+def _replace(target: str, out_path: str, paths: List[str], stats: List[Dict], archive: str,
+             data_dir: str) -> None:
+    """Archive the fragments and move the compacted file in, republishing adisyo_full's offsets."""
+    checkpoint = os.path.join(data_dir, CHECKPOINT)
+    state = {k: v for k, v in read_json(checkpoint).items() if k != "replacing"}
+    table = os.path.basename(target)[:-len(".csv")]
+    tracked = table in (state.get("offsets") or {})
+    if tracked:  # as CsvSink._extend: a rollback finishes the rename instead of truncating
+        state["offsets"] = {**state["offsets"], table: os.path.getsize(out_path)}
+        write_json_atomic(checkpoint, {**state, "replacing": {target: out_path}})
+    os.makedirs(archive, exist_ok=True)
+    for path, s in zip(paths, stats):
+        s["moved_to"] = os.path.relpath(shutil.move(path, archive), data_dir)
+    os.replace(out_path, target)
+    if tracked:
+        write_json_atomic(checkpoint, state)
+
+
+def compact_table(table: str, data_dir: str, layout: str, chunk_rows: int, dry_run: bool,
+                  archive: str) -> Optional[Dict]:
+    # the fragments overlap instead of splitting the data by period: one output per table
+    try:
+        paths = partitions(table, layout, data_dir)
+    except FileNotFoundError:
+        return None
+    stem = LAYOUTS[layout].stems[table]
+    target = os.path.join(data_dir, f"{stem}.csv")
+    if paths == [target]:
+        print(f"👌 {table}: already compact")
+        return None
+    columns = _union_header(paths)
+    if not columns:  # only empty files, e.g. data/full/features.csv before any feature
+        print(f"👌 {table}: nothing to compact")
+        return None
+    key_col = _key_column(table, columns)
+    stats: List[Dict] = []
+    rows_out, first, last = 0, None, None
+
+    with tempfile.TemporaryDirectory(prefix=f".compact_{table}_", dir=data_dir) as tmp:
+        runs = reduce_runs(make_runs(paths, columns, key_col, tmp, chunk_rows, stats), tmp)
+        # beside the target, not in tmp: an interrupted replace is finished from it
+        out_path = os.path.join(tmp, "out.csv") if dry_run else f"{target}.compact"
+        with open(out_path, "w", newline="", encoding="utf-8") as out:
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for row in dedupe(_merge(runs), one_per_key=table == "orders"):
+                writer.writerow(row[2:])
+                rows_out += 1
+                first = _key(row[1]) if first is None else first
+                last = row[1]
+            out.flush()
+            os.fsync(out.fileno())
+        if not dry_run:
+            _replace(target, out_path, paths, stats, archive, data_dir)
+
+    rows_in = sum(s["rows"] for s in stats)
+    print(f"{'🔎' if dry_run else '✅'} {table}: {len(paths)} files, {rows_in:,} rows → "
+          f"{os.path.basename(target)} {rows_out:,} rows ({rows_in - rows_out:,} duplicate or blank)")
+    return {
+        "output": os.path.basename(target),
+        "key": PARTITION_KEYS[table],
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "rows_dropped": rows_in - rows_out,
+        "min_key": first,
+        "max_key": _key(last) if last is not None else None,
+        "sources": stats,
+    }
+
+
+def compact(data_dir: str = HISTORICAL_DIR, layout: str = "historical", chunk_rows: int = CHUNK_ROWS,
+            dry_run: bool = False) -> Dict:
+    """Compact every table of ``data_dir``; returns (and, unless dry, records) the manifest entry."""
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    archive = os.path.join(data_dir, ARCHIVE_DIR, stamp)
+    entry = {"compacted_at": stamp, "dry_run": dry_run, "chunk_rows": chunk_rows, "tables": {}}
+    for table in LAYOUTS[layout].stems:
+        result = compact_table(table, data_dir, layout, chunk_rows, dry_run, archive)
+        if result:
+            entry["tables"][table] = result
+    if not dry_run:
+        path = os.path.join(data_dir, MANIFEST)
+        history = []
+        if os.path.exists(path):
+            with open(path) as f:
+                history = json.load(f)
+        with open(path + ".tmp", "w") as f:
+            json.dump(history + [entry], f, indent=2)
+        os.replace(path + ".tmp", path)
+        version.refresh(data_dir)
+        print(f"🗂️  sources archived in {archive}, manifest → {path}")
+    return entry
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Merge overlapping CSV partitions into one deduplicated file per table")
+    ap.add_argument("data_dir", nargs="?", default=HISTORICAL_DIR)
+    ap.add_argument("--layout", choices=list(LAYOUTS), default="historical")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows sorted in memory per run")
+    ap.add_argument("--dry-run", action="store_true", help="report what would be merged, change nothing")
+    args = ap.parse_args()
+    compact(args.data_dir, args.layout, args.chunk_rows, args.dry_run)
@@ -0,0 +1,213 @@
+"""
+Derived order columns (hour, weekday, daypart, district, order_month) and the customer cohort index.
+
+    python -m utilities.data.derive [data_dir]   # backfill legacy CSV partitions, rebuild the index
+"""
+import os
+import csv
+import json
+import bisect
+import argparse
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utilities.data import districts, schema
+from utilities.data.access import HISTORICAL_DIR
+
+# added to every order row by flatten_page; filled by complete() for rows stored before
+DERIVED = ("hour", "weekday", "daypart", "district", "order_month")
+# customer_id → first-order month; not a row column, it depends on every order seen so far
+COHORTS = "customer_cohorts.json"
+
+DAYPARTS = ["Night-Owl", "Breakfast", "Lunch", "Dinner", "Late-Night"]
+DAYPART_STARTS = [0, 6, 11, 16, 22]  # first hour of each daypart
+
+REGION_COLUMNS = ("customer_region", "region")  # historical / recent layouts
+COORDINATES = (("customer_latitude", "customerLatitude"), ("customer_longitude", "customerLongitude"))
+
+
+# ----------------------------------------------------------------------
+# Scalar rules (ingest)
+# ----------------------------------------------------------------------
+def daypart(hour: int) -> str:
+    return DAYPARTS[bisect.bisect_right(DAYPART_STARTS, hour) - 1]
+
+
+def derive_row(row: Dict) -> Dict:
+    """Add the derived columns to one flattened order row."""
+    when = schema.from_epoch_ms(schema.to_epoch_ms(row.get("insertDate", row.get("insert_date"))))
+    row["hour"] = when.hour if when else None
+    row["weekday"] = when.weekday() if when else None
+    row["daypart"] = daypart(when.hour) if when else None
+    region = next((row[c] for c in REGION_COLUMNS if c in row), None)
+    lat, lon = (next((row[c] for c in names if c in row), None) for names in COORDINATES)
+    row["district"] = districts.resolve_one(region, lat, lon)
+    month = when.replace(day=1, hour=0, minute=0, second=0, microsecond=0) if when else None
+    row["order_month"] = schema.to_epoch_ms(month)
+    return row
+
+
+def derive_rows(table: str, rows: List[Dict]) -> List[Dict]:
+    if table == "orders":
+        for row in rows:
+            derive_row(row)
+    return rows
+
+
+# ----------------------------------------------------------------------
+# Vectorised rules (legacy rows at load time)
+# ----------------------------------------------------------------------
+def month_start(stamps: pd.Series) -> pd.Series:
+    return pd.Series(stamps.to_numpy().astype("datetime64[M]").astype(schema.DATE), index=stamps.index)
+
+
+def month_number(months: pd.Series) -> pd.Series:
+    """Months since year 0, for month differences without Periods."""
+    return months.dt.year * 12 + months.dt.month - 1
+
+
+_VECTORISED = {
+    "hour": lambda s: s.dt.hour,
+    "weekday": lambda s: s.dt.weekday,
+    "daypart": lambda s: pd.Series(np.asarray(DAYPARTS, dtype=object)[
+        np.searchsorted(DAYPART_STARTS, s.dt.hour.to_numpy(), side="right") - 1], index=s.index),
+    "order_month": month_start,
+}
+
+
+def complete(orders: pd.DataFrame, columns: Iterable[str] = DERIVED) -> pd.DataFrame:
+    """Fill derived ``columns`` of rows stored before they were materialised; a no-op otherwise."""
+    if "insert_date" not in orders.columns:
+        return orders
+    region = next((orders[c] for c in REGION_COLUMNS if c in orders.columns), None)
+    lat, lon = (orders[names[0]] if names[0] in orders.columns else None for names in COORDINATES)
+    for col in columns:
+        dtype = schema.SCHEMA["orders"][col]
+        if col not in orders.columns:
+            orders[col] = pd.Series(None, index=orders.index, dtype=object).astype(dtype)
+        if col == "district":
+            known = [s.notna() for s in (region, lat) if s is not None]
+            if not known:
+                continue
+            todo = orders[col].isna() & np.logical_or.reduce(known)
+        else:
+            todo = orders[col].isna() & orders["insert_date"].notna()
+        if not todo.any():
+            continue
+        filled = orders[col].astype(object)
+        if col == "district":
+            filled[todo] = districts.resolve(*(s[todo] if s is not None else None for s in (region, lat, lon)))
+        else:
+            filled[todo] = _VECTORISED[col](orders["insert_date"][todo]).astype(object)
+        orders[col] = filled.astype(dtype)
+    return orders
+
+
+# ----------------------------------------------------------------------
+# Customer cohorts
+# ----------------------------------------------------------------------
+def _read_cohorts(data_dir: str) -> Dict:
+    try:
+        with open(os.path.join(data_dir, COHORTS)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"partitions": {}, "customers": {}}
+
+
+def _partition_firsts(data_dir: str, name: str, fmt: str) -> pd.Series:
+    """Earliest order month (``YYYY-MM``) per customer_id in one orders partition."""
+    path = os.path.join(data_dir, name)
+    wanted = ["customer_id", "insert_date"]
+    if fmt == "csv":
+        df = schema.read_csv(path, "orders", usecols=wanted)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        names = [n for n in pq.ParquetFile(path).schema_arrow.names if schema.canonical("orders", n) in wanted]
+        df = schema.conform(pq.read_table(path, columns=names).to_pandas(), "orders")
+    else:
+        from utilities.api.warehouse import query
+
+        try:
+            df = query("SELECT customer_id, MIN(insert_date) AS insert_date FROM orders GROUP BY customer_id",
+                       path=path)
+        except pd.errors.DatabaseError:  # no customer_id column until an ingest adds one
+            return pd.Series(dtype=object)
+        df = schema.conform(df, "orders")
+    if not set(wanted) <= set(df.columns):
+        return pd.Series(dtype=object)
+    df = df.dropna(subset=wanted)
+    firsts = df.groupby(df["customer_id"].astype("int64"))["insert_date"].min()
+    return firsts.dt.strftime("%Y-%m")
+
+
+def update_cohorts(data_dir: str, manifest: Dict, rebuild: bool = False) -> Dict:
+    """Min-merge customers' first-order months from the orders partitions whose hash changed."""
+    state = {"partitions": {}, "customers": {}} if rebuild else _read_cohorts(data_dir)
+    parts = {n: e for n, e in manifest["partitions"].items() if e["table"] in ("orders", "*")}
+    changed = [(n, e) for n, e in sorted(parts.items()) if state["partitions"].get(n) != e["sha256"]]
+    if not changed and set(parts) == set(state["partitions"]):
+        return state
+    firsts = [pd.Series(state["customers"], dtype=object)]
+    for name, entry in changed:
+        firsts.append(_partition_firsts(data_dir, name, entry["format"]).rename(index=str))
+    merged = pd.concat(firsts).groupby(level=0).min()
+    # removed partitions (compaction) only held duplicates of surviving orders: keep their minima
+    state = {"partitions": {n: e["sha256"] for n, e in parts.items()},
+             "customers": merged.to_dict(),
+             "updated_at": datetime.now().isoformat(timespec="seconds")}
+    path = os.path.join(data_dir, COHORTS)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+    return state
+
+
+def first_order_months(data_dir: str = HISTORICAL_DIR) -> pd.Series:
+    """customer_id → first day of the customer's first-order month."""
+    customers = _read_cohorts(data_dir)["customers"]
+    if not customers:
+        return pd.Series(dtype=schema.DATE)
+    firsts = pd.Series(customers)
+    firsts.index = firsts.index.astype("int64")
+    return pd.to_datetime(firsts, format="%Y-%m").astype(schema.DATE)
+
+
+# ----------------------------------------------------------------------
+# Backfill
+# ----------------------------------------------------------------------
+def backfill_csv(path: str) -> bool:
+    """Append the derived columns to a legacy orders CSV (rewritten atomically); False if present."""
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    if not header or all(c in header for c in DERIVED):
+        return False
+    with open(path, newline="", encoding="utf-8") as src, \
+            open(path + ".tmp", "w", newline="", encoding="utf-8") as out:
+        writer = csv.DictWriter(out, fieldnames=header + [c for c in DERIVED if c not in header],
+                                extrasaction="ignore")
+        writer.writeheader()
+        for row in schema.csv_rows(src):
+            writer.writerow(derive_row(row))
+    os.replace(path + ".tmp", path)
+    return True
+
+
+def backfill(data_dir: str = HISTORICAL_DIR) -> None:
+    from utilities.data import version
+
+    for name, table, fmt in version._files(data_dir):
+        if table == "orders" and fmt == "csv" and backfill_csv(os.path.join(data_dir, name)):
+            print(f"✅ {name}: + {', '.join(DERIVED)}")
+    state = update_cohorts(data_dir, version.refresh(data_dir), rebuild=True)
+    print(f"👥 {len(state['customers']):,} customers → {os.path.join(data_dir, COHORTS)}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Materialise derived order columns and the customer cohort index")
+    ap.add_argument("data_dir", nargs="?", default=HISTORICAL_DIR)
+    backfill(ap.parse_args().data_dir)
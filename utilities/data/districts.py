@@ -0,0 +1,174 @@
+"""
+District resolution for order addresses, vectorised.
+
+``resolve(regions, latitudes, longitudes)`` works in two passes:
+
+1. text – one compiled regex over the 39 district names runs once per
+   *distinct* region string (memoised; a feed repeats a few hundred region
+   texts). Regions read ``<neighbourhood> <district>``, so the last district
+   named wins ("Bahçelievler Mah. Bakırköy" → Bakırköy).
+2. coordinates – rows whose text names no district but carry
+   ``customer_latitude`` / ``customer_longitude`` are located in the bundled
+   polygons (``geo.load_index``) with a crossing-number test. Polygon edges are
+   bucketed in horizontal bands, so each point is tested only against the few
+   edges its band crosses, for all points of a band at once.
+
+Text that names no district and cannot be located resolves to ``Diğer``; rows
+with neither text nor coordinates to None.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utilities.data import geo
+
+DISTRICTS = [
+    "adalar","arnavutköy","ataşehir","avcılar","bağcılar","bahçelievler",
+    "bakırköy","başakşehir","bayrampaşa","beşiktaş","beykoz","beylikdüzü",
+    "beyoğlu","büyükçekmece","çatalca","çekmeköy","esenler","esenyurt",
+    "eyüpsultan","fatih","gaziosmanpaşa","güngören","kadıköy","kağıthane",
+    "kartal","küçükçekmece","maltepe","pendik","sancaktepe","sarıyer",
+    "silivri","sultanbeyli","sultangazi","şile","şişli","tuzla","üsküdar",
+    "ümraniye","zeytinburnu",
+]
+OTHER = "Diğer"
+
+_PATTERN = re.compile("|".join(sorted(map(re.escape, DISTRICTS), key=len, reverse=True)))
+BANDS = 1024
+
+
+# ----------------------------------------------------------------------
+# Text
+# ----------------------------------------------------------------------
+def _lower(text: str) -> str:
+    # Turkish casing: "BAĞCILAR".lower() would give "bağcilar"
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+@lru_cache(maxsize=1 << 16)
+def match_text(region: str) -> Optional[str]:
+    """District named in ``region`` (the last one if several), else None."""
+    found = _PATTERN.findall(_lower(region))
+    return found[-1].title() if found else None
+
+
+def _text(regions: pd.Series) -> np.ndarray:
+    """Per row: the matched district, ``OTHER`` if the text names none, None if there is no text."""
+    codes, uniques = pd.factorize(regions.astype(object), use_na_sentinel=True)
+    resolved = np.array([None if not str(u).strip() else (match_text(str(u)) or OTHER) for u in uniques]
+                        + [None], dtype=object)
+    return resolved[codes]  # code -1 (missing) picks the trailing None
+
+
+# ----------------------------------------------------------------------
+# Coordinates
+# ----------------------------------------------------------------------
+class PolygonIndex:
+    """Even-odd point-in-polygon over many (multi)polygons; edges bucketed in horizontal bands."""
+
+    def __init__(self, names: List[str], rings: List[List[np.ndarray]], bands: int = BANDS):
+        self.names = np.array(names, dtype=object)
+        segments, owners = [], []
+        for i, polygon_rings in enumerate(rings):
+            for ring in polygon_rings:
+                segments.append(np.hstack([ring, np.roll(ring, -1, axis=0)]))  # x1 y1 x2 y2
+                owners.append(np.full(len(ring), i))
+        edges, owner = np.vstack(segments), np.concatenate(owners)
+        keep = edges[:, 1] != edges[:, 3]  # horizontal edges never cross a horizontal ray
+        edges, owner = edges[keep], owner[keep]
+
+        self.x0, self.x1 = edges[:, [0, 2]].min(), edges[:, [0, 2]].max()
+        self.y0, y1 = edges[:, [1, 3]].min(), edges[:, [1, 3]].max()
+        self.height = (y1 - self.y0) / bands or 1.0
+        self.bands = bands
+        lo = self._band(np.minimum(edges[:, 1], edges[:, 3]))
+        hi = self._band(np.maximum(edges[:, 1], edges[:, 3]))
+        # one entry per (edge, band it spans), grouped by band
+        span = hi - lo + 1
+        edge_ids = np.repeat(np.arange(len(edges)), span)
+        band_ids = np.repeat(lo, span) + (np.arange(span.sum()) - np.repeat(np.cumsum(span) - span, span))
+        order = np.argsort(band_ids, kind="stable")
+        self.edges, self.owner = edges[edge_ids[order]], owner[edge_ids[order]]
+        self.offsets = np.searchsorted(band_ids[order], np.arange(bands + 1))
+
+    @classmethod
+    def from_geojson(cls, collection: Dict) -> "PolygonIndex":
+        names, rings = [], []
+        for feature in collection["features"]:
+            geometry = feature["geometry"]
+            polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+            names.append(feature["properties"]["name"])
+            rings.append([np.asarray(r, dtype=float)[:, :2] for p in polygons for r in p])
+        return cls(names, rings)
+
+    def _band(self, y: np.ndarray) -> np.ndarray:
+        return np.clip(((y - self.y0) / self.height).astype(np.int64), 0, self.bands - 1)
+
+    def locate(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Polygon name containing each point (lon ``x``, lat ``y``), None outside all."""
+        found = np.full(len(x), -1)
+        inside = (x >= self.x0) & (x <= self.x1) & (y >= self.y0) & (y <= self.y0 + self.height * self.bands)
+        points = np.flatnonzero(inside)
+        bands = self._band(y[points])
+        order = np.argsort(bands, kind="stable")
+        points, bands = points[order], bands[order]
+        starts = np.flatnonzero(np.r_[True, bands[1:] != bands[:-1]]) if len(points) else points
+        n_polygons = len(self.names)
+        for start, stop in zip(starts, np.r_[starts[1:], len(points)]):
+            band = bands[start]
+            e = slice(self.offsets[band], self.offsets[band + 1])
+            if e.start == e.stop:
+                continue
+            pts = points[start:stop]
+            px, py = x[pts, None], y[pts, None]
+            x1, y1, x2, y2 = self.edges[e].T
+            crosses = ((y1 > py) != (y2 > py)) & (px < x1 + (py - y1) * (x2 - x1) / (y2 - y1))
+            row, col = np.nonzero(crosses)
+            parity = np.bincount(row * n_polygons + self.owner[e][col], minlength=len(pts) * n_polygons)
+            odd = (parity.reshape(len(pts), n_polygons) & 1).astype(bool)
+            hit = odd.any(axis=1)
+            found[pts[hit]] = odd[hit].argmax(axis=1)
+        names = np.append(self.names, None)
+        return names[found]  # -1 picks the trailing None
+
+
+@lru_cache(maxsize=None)
+def polygon_index() -> Optional[PolygonIndex]:
+    collection = geo.load_index()
+    return PolygonIndex.from_geojson(collection) if collection else None
+
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+def resolve(regions: Optional[pd.Series], latitudes: Optional[pd.Series] = None,
+            longitudes: Optional[pd.Series] = None) -> pd.Series:
+    """District per row from region text, falling back to coordinates (see module docstring)."""
+    index = (regions if regions is not None else latitudes).index
+    result = _text(regions) if regions is not None else np.full(len(index), None, dtype=object)
+    if latitudes is not None and longitudes is not None and polygon_index() is not None:
+        lat = pd.to_numeric(latitudes, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        lon = pd.to_numeric(longitudes, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        todo = np.flatnonzero(((result == None) | (result == OTHER)) & ~np.isnan(lat) & ~np.isnan(lon))  # noqa: E711
+        if len(todo):
+            # customers repeat: locate each distinct point once
+            points, inverse = np.unique(np.column_stack([lon[todo], lat[todo]]), axis=0, return_inverse=True)
+            located = polygon_index().locate(points[:, 0], points[:, 1])[inverse.ravel()]
+            result[todo] = np.where(located == None, result[todo], located)  # noqa: E711
+    return pd.Series(result, index=index, dtype=object)
+
+
+def resolve_one(region=None, latitude=None, longitude=None) -> Optional[str]:
+    """Scalar ``resolve`` for ingest, one flattened row at a time."""
+    text = None if pd.isna(region) or not str(region).strip() else (match_text(str(region)) or OTHER)
+    if text in (None, OTHER) and polygon_index() is not None:
+        try:
+            lat, lon = float(latitude), float(longitude)
+        except (TypeError, ValueError):  # missing or "" coordinates
+            return text
+        if lat == lat and lon == lon:
+            return polygon_index().locate(np.array([lon]), np.array([lat]))[0] or text
+    return text
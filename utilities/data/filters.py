@@ -0,0 +1,140 @@
+"""
+Bitmap filter index for the dashboards' sidebar filters.
+
+``FilterIndex(orders, columns)`` orders the rows by ``insert_date`` once and keeps
+
+* one bitmap per value of every filter column (``np.packbits``: one bit per row),
+* the first row of every day in that order,
+
+so ``select(dates, **choices)`` is a byte slice for the date range, an OR of the
+chosen values' bitmaps within a filter and an AND across filters – n/8 bytes per
+chosen value, no per-row dates and no ``isin``. Filters whose rows carry several
+values (the payment methods of a split-payment order) are added with ``add``.
+
+``PaymentIndex(orders, payments)`` maps each order row to its payment methods
+and split amounts, once per data version: it feeds the payment filter and
+serves payment-share aggregates (``share(rows)``) without joining ``payments``
+against the selection.
+
+``utilities.data.cached`` builds one index per cached frame and data version;
+pages take ``frame.iloc[index.select(...)]`` and list a filter's options from
+``index.values(name)``.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+Dates = Optional[Tuple]
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+class FilterIndex:
+    """Per-value row bitmaps over ``frame`` sorted by ``date_column``, plus per-day row ranges."""
+
+    def __init__(self, frame: pd.DataFrame, columns: Iterable[str] = (), date_column: str = "insert_date"):
+        self.n = len(frame)
+        stamps = frame[date_column].to_numpy(dtype="datetime64[ns]")
+        self.order = np.argsort(stamps, kind="stable")  # NaT sorts last
+        self.rank = np.empty(self.n, dtype=np.int64)
+        self.rank[self.order] = np.arange(self.n)
+        days = stamps[self.order].astype("datetime64[D]")
+        self.dated = int((~np.isnat(days)).sum())
+        self.days, starts = np.unique(days[:self.dated], return_index=True)
+        self.starts = np.append(starts, self.dated)  # day i = sorted rows starts[i]:starts[i + 1]
+        self.bitmaps: Dict[str, Dict] = {}
+        for col in columns:
+            self.add(col, np.arange(self.n), frame[col])
+
+    def add(self, name: str, rows: Sequence[int], values: Sequence) -> "FilterIndex":
+        """Index filter ``name``: frame row (position) ``rows[i]`` has value ``values[i]``; a row may repeat."""
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))  # first-appearance order
+        keep = codes >= 0
+        codes, rows = codes[keep], self.rank[np.asarray(rows)[keep]]
+        by_value = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[by_value], np.arange(len(uniques) + 1))
+        bitmaps = {}
+        for k, value in enumerate(uniques):
+            bits = np.zeros(self.n, dtype=bool)
+            bits[rows[by_value[bounds[k]:bounds[k + 1]]]] = True
+            bitmaps[value] = np.packbits(bits)
+        self.bitmaps[name] = bitmaps
+        return self
+
+    def values(self, name: str) -> List:
+        """The values of filter ``name`` (multiselect options), in order of first appearance."""
+        return list(self.bitmaps[name])
+
+    def _range(self, dates: Dates) -> Tuple[int, int]:
+        if dates is None:
+            return 0, self.n
+        first, last = dates
+        lo = self.starts[np.searchsorted(self.days, _day(first), side="left")]
+        hi = self.starts[np.searchsorted(self.days, _day(last), side="right")]
+        return int(lo), int(max(lo, hi))
+
+    def select(self, dates: Dates = None, **choices: Optional[Iterable]) -> np.ndarray:
+        """
+        Frame row positions (ascending) ordered on a day in ``dates`` = (first, last),
+        inclusive, that match every non-empty choice (any of its values).
+        """
+        lo, hi = self._range(dates)
+        b0, b1 = lo // 8, -(-hi // 8)
+        selected = None
+        for name, wanted in choices.items():
+            if wanted is None or len(wanted) == 0:
+                continue
+            bitmaps = self.bitmaps[name]
+            any_of = np.zeros(b1 - b0, dtype=np.uint8)
+            for value in wanted:
+                bitmap = bitmaps.get(value)
+                if bitmap is not None:
+                    any_of |= bitmap[b0:b1]
+            selected = any_of if selected is None else selected & any_of
+        if selected is None:
+            rows = np.arange(lo, hi)
+        else:
+            rows = np.flatnonzero(np.unpackbits(selected)) + b0 * 8
+            rows = rows[(rows >= lo) & (rows < hi)]
+        return np.sort(self.order[rows])
+
+
+class PaymentIndex:
+    """(order row, payment method) → amount, sorted by order row; repeated pairs summed."""
+
+    def __init__(self, orders: pd.DataFrame, payments: pd.DataFrame,
+                 method_column: str = "payment_name", amount_column: str = "amount"):
+        self.n = len(orders)
+        paid = (pd.DataFrame({"order_id": orders["order_id"], "row": np.arange(self.n)})
+                .merge(payments[["order_id", method_column, amount_column]], on="order_id"))
+        codes, methods = pd.factorize(paid[method_column].astype(object), sort=True)
+        self.methods = np.asarray(methods, dtype=object)
+        keep = codes >= 0
+        m = max(len(self.methods), 1)
+        pairs, inverse = np.unique(paid["row"].to_numpy(np.int64)[keep] * m + codes[keep], return_inverse=True)
+        amounts = pd.to_numeric(paid[amount_column], errors="coerce").fillna(0).to_numpy(float)[keep]
+        self.rows, self.codes = pairs // m, pairs % m
+        self.amounts = np.bincount(inverse.ravel(), weights=amounts, minlength=len(pairs))
+
+    def names(self) -> np.ndarray:
+        """Method name per (order row, method) pair – ``FilterIndex.add(name, index.rows, index.names())``."""
+        return self.methods[self.codes]
+
+    def share(self, rows: Optional[np.ndarray] = None) -> pd.Series:
+        """
+        Amount paid per method by the order ``rows`` (positions; all orders if
+        None), each part of a split payment under its own method.
+        """
+        codes, amounts = self.codes, self.amounts
+        if rows is not None:
+            selected = np.zeros(self.n, dtype=bool)
+            selected[rows] = True
+            keep = selected[self.rows]
+            codes, amounts = codes[keep], amounts[keep]
+        # float even for an empty selection (bincount returns int64 for empty weights)
+        totals = np.bincount(codes, weights=amounts, minlength=len(self.methods)).astype(float)
+        used = np.bincount(codes, minlength=len(self.methods)) > 0
+        return pd.Series(totals[used], index=pd.Index(self.methods[used], name="payment_name"), name="amount")
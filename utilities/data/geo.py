@@ -0,0 +1,166 @@
+"""
+Istanbul district geometry bundled with the app (``data/geo``).
+
+* ``istanbul_districts.geojson`` – the 39 districts simplified to
+  ``INDEX_TOLERANCE`` degrees (~10 m) for point-in-polygon lookups
+  (``utilities.data.districts``),
+* ``istanbul_districts_z<zoom>.geojson`` – one display variant per map zoom in
+  ``ZOOMS``, simplified to about one screen pixel at that zoom (shared borders
+  simplified once, so neighbours stay gap-free) for the choropleths.
+
+Every feature carries ``name`` (spelled like the ``district`` column), ``pcode``
+and ``key`` = ``fold(name)``; pages match ``keys(district column)`` against
+``properties.key``. ``display(zoom)`` reads a variant once per process.
+
+The files are built once, offline, from the OCHA/HDX Türkiye ADM2 boundaries
+(``tur_polbna_adm2``, also shipped in the MIT-licensed ``turkiye`` wheel on
+PyPI) or from any GeoJSON with a ``name`` per district:
+
+    python -m utilities.data.geo path/to/tur_polbna_adm2.shp
+    python -m utilities.data.geo path/to/istanbul-districts.json
+
+Building needs ``shapely`` (and ``pyshp`` for shapefiles); reading does not.
+"""
+import os
+import json
+import argparse
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+GEO_DIR = "data/geo"
+INDEX_PATH = os.path.join(GEO_DIR, "istanbul_districts.geojson")
+INDEX_TOLERANCE = 0.0001  # degrees
+PRECISION = 5             # decimals kept in coordinates (~1 m)
+ISTANBUL = "TUR034"       # ADM1 pcode
+ZOOMS = (9, 10, 11)       # plotly mapbox zoom levels with a display variant
+
+_FOLD = str.maketrans("ğüşıöçâîû", "gusiocaiu")
+
+
+def fold(text) -> str:
+    """Turkish-aware lower-case ASCII key: ``BAĞCILAR``, ``Bağcılar``, ``bagcilar`` → ``bagcilar``."""
+    if text is None or text != text:
+        return ""
+    text = str(text).replace("I", "ı").replace("İ", "i").lower().replace("\u0307", "")
+    return text.translate(_FOLD).strip()
+
+
+# ----------------------------------------------------------------------
+# Build
+# ----------------------------------------------------------------------
+def _from_shapefile(path: str) -> Iterator[Tuple[str, Optional[str], Dict]]:
+    import shapefile  # pyshp
+
+    for item in shapefile.Reader(path).iterShapeRecords():
+        record = item.record.as_dict()
+        if record.get("adm1") == ISTANBUL:
+            yield record["adm2_tr"], record.get("pcode"), item.shape.__geo_interface__
+
+
+def _from_geojson(path: str) -> Iterator[Tuple[str, Optional[str], Dict]]:
+    with open(path, encoding="utf-8") as f:
+        for feature in json.load(f)["features"]:
+            props = feature["properties"]
+            yield props["name"], props.get("pcode"), feature["geometry"]
+
+
+def _rounded(coords):
+    if isinstance(coords[0], (int, float)):
+        return [round(c, PRECISION) for c in coords]
+    return [_rounded(c) for c in coords]
+
+
+def path_for(zoom: int) -> str:
+    return os.path.join(GEO_DIR, f"istanbul_districts_z{zoom}.geojson")
+
+
+def tolerance_for(zoom: int) -> float:
+    """Degrees of longitude per 256-px tile pixel at ``zoom``."""
+    return 360 / (256 * 2 ** zoom)
+
+
+def simplified_features(source: str, tolerance: float, coverage: bool = False) -> List[Dict]:
+    """
+    Istanbul district features of ``source``, simplified and rounded. ``coverage``
+    simplifies shared borders once for the whole set (display); otherwise each
+    polygon is simplified on its own, topology-preserving (lookups).
+    """
+    import shapely
+    from shapely.geometry import mapping, shape
+
+    from utilities.data.districts import DISTRICTS
+
+    names = {fold(d): d.title() for d in DISTRICTS}
+    read = _from_shapefile if source.lower().endswith(".shp") else _from_geojson
+    rows = [(names.get(fold(raw).replace(" ", ""), raw.title()), pcode, shape(geometry))
+            for raw, pcode, geometry in read(source)]
+    missing = set(names.values()) - {name for name, _, _ in rows}
+    if missing:
+        raise ValueError(f"{source}: no geometry for {sorted(missing)}")
+    geoms = [g for _, _, g in rows]
+    if coverage:
+        geoms = shapely.coverage_simplify(geoms, tolerance)
+    else:
+        geoms = [g.simplify(tolerance, preserve_topology=True) for g in geoms]
+    features = []
+    for (name, pcode, _), g in zip(rows, geoms):
+        geom = mapping(g)
+        features.append({
+            "type": "Feature",
+            "properties": {"name": name, "pcode": pcode, "key": fold(name)},
+            "geometry": {"type": geom["type"], "coordinates": _rounded(geom["coordinates"])},
+        })
+    return sorted(features, key=lambda f: f["properties"]["name"])
+
+
+def write_collection(features: List[Dict], path: str, source: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    collection = {"type": "FeatureCollection", "source": os.path.basename(source), "features": features}
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(collection, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+    print(f"✅ {len(features)} districts → {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+
+def build(source: str) -> None:
+    write_collection(simplified_features(source, INDEX_TOLERANCE), INDEX_PATH, source)
+    for zoom in ZOOMS:
+        write_collection(simplified_features(source, tolerance_for(zoom), coverage=True), path_for(zoom), source)
+
+
+# ----------------------------------------------------------------------
+# Read
+# ----------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def load_index(path: str = INDEX_PATH) -> Optional[Dict]:
+    """A bundled FeatureCollection (read once per process); None if not built."""
+    if not os.path.exists(path):
+        print(f"⚠️  {path} missing: run `python -m utilities.data.geo <source>`")
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def display(zoom: int = ZOOMS[0]) -> Optional[Dict]:
+    """
+    The choropleth variant for a map at ``zoom`` (the coarsest one fine enough),
+    read once per process; None if not built. Treat it as read-only: plotly
+    serialises it as is.
+    """
+    fine_enough = [z for z in ZOOMS if z >= zoom]
+    return load_index(path_for(fine_enough[0] if fine_enough else ZOOMS[-1]))
+
+
+def keys(names: pd.Series) -> pd.Series:
+    """``fold`` per row (each distinct name folded once), to match ``properties.key``."""
+    codes, uniques = pd.factorize(names.astype(object))
+    return pd.Series(np.append([fold(u) for u in uniques], "")[codes], index=names.index)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build the bundled Istanbul district polygons and display variants")
+    ap.add_argument("source", help="tur_polbna_adm2.shp or a district GeoJSON with a 'name' property")
+    build(ap.parse_args().source)
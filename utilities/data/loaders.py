@@ -0,0 +1,237 @@
+"""
+Dashboard data loaders and shared aggregations, free of Streamlit.
+
+The pages wrap these in ``st.cache_data``; the benchmark harness
+(``utilities/other/benchmark.py``) calls the very same functions headlessly.
+"""
+import os
+import re
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from utilities.data import access, derive, districts
+from utilities.data.access import FULL_DIR, HISTORICAL_DIR
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+RECENT_DISTRICTS = ["Bağcılar", "Bahçelievler", "Bakırköy", "Zeytinburnu", "Fatih", "Esenler", "Bayrampaşa"]
+HISTORY_COLUMNS = ("customer_id", "external_app_name", "order_total", "insert_date")
+
+Frames = Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]
+
+
+# ---------------  data/adisyo_recent_orders.csv (pages/1_Dashboard.py)  ---------------- #
+def load_recent() -> pd.DataFrame:
+    """Recent orders with hour, time_of_day and a coarse district."""
+    df = derive.complete(access.orders(layout="recent"))
+    # this page folds the night dayparts and districts outside the restaurant's area
+    df["time_of_day"] = df["daypart"].astype(object).replace({"Night-Owl": "Late Night", "Late-Night": "Late Night"})
+    df["district"] = df["district"].astype(object)
+    df.loc[df["district"].notna() & ~df["district"].isin(RECENT_DISTRICTS), "district"] = districts.OTHER
+    return df
+
+
+# ---------------  data/full (pages/4_NewDashboard.py)  ---------------- #
+def load_full(data_dir: str = FULL_DIR, start=None, end=None) -> Frames:
+    """orders, products, features, payments (canonical schema); payment methods per order: ``filters.PaymentIndex``."""
+    kw = dict(start=start, end=end, layout="full", data_dir=data_dir)
+    orders = with_first_orders(derive.complete(access.orders(**kw)), data_dir)
+    products = access.products(**kw)
+    features = access.features(**kw)
+    payments = access.payments(**kw)
+    return orders, products, features, payments
+
+
+def clean_name(name):
+    """Product name key shared by the menu and the costs sheet."""
+    if pd.isna(name):
+        return ''
+    name = str(name).lower().strip()
+    name = re.sub(r"\(.*?\)", "", name)
+    name = re.sub(r"\d+\s?(g|gr|ml|cl)", "", name)
+    name = re.sub(r"[^a-zçğıöşü\s]", "", name)
+    name = re.sub(r"\s+", " ", name).strip()
+    return name
+
+
+def list_prices(products: pd.DataFrame, data_dir: str = FULL_DIR) -> pd.Series:
+    """
+    Catalog price of each product line when its order was placed (NaN where the
+    price history has no interval for it, or before ``adisyo_catalog`` first ran).
+    """
+    from utilities.api.adisyo_catalog import CATALOG_DIR, price_at
+
+    if not os.path.exists(os.path.join(CATALOG_DIR, "product_prices.csv")):
+        return pd.Series(np.nan, index=products.index, name="list_price")
+    placed = access.orders(layout="full", data_dir=data_dir, columns=["order_id", "insert_date"])
+    lines = products[["order_id", "product_id"]].merge(placed, on="order_id", how="left")
+    priced = price_at(lines, "product_prices.csv", {"product_id": "Product ID"}, "insert_date", "Price")
+    return pd.Series(priced["Price"].to_numpy(float), index=products.index, name="list_price")
+
+
+def load_product_cost_data(data_dir: str = FULL_DIR) -> pd.DataFrame:
+    """
+    Product lines joined with costs.xlsx on the cleaned name and with their
+    ``list_price`` at order time; drinks, sauces and extras dropped.
+    """
+    products = access.products(layout="full", data_dir=data_dir)
+    products["list_price"] = list_prices(products, data_dir)
+    raw_costs = pd.read_excel(os.path.join(data_dir, "costs.xlsx"), sheet_name="Costs")
+
+    # Prepare clean cost table from the finalized format
+    raw_costs.columns = raw_costs.columns.str.strip()
+    raw_costs['normalized_name'] = raw_costs['Product'].apply(clean_name)
+    costs = raw_costs.groupby('normalized_name', as_index=False).agg({'Cost': 'mean'})
+
+    products['normalized_name'] = products['product_name'].map(clean_name).astype(object)
+
+    canonical_map = products.groupby('normalized_name')['product_name'].agg(lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[0])
+    products['product_name'] = products['normalized_name'].map(canonical_map)
+
+    df = pd.merge(products, costs, on='normalized_name', how='left')
+
+    exclude_keywords = [
+        "istemiyorum", "pişmiş", "seçimi", "not", "sıfır", "adet",
+        "ayran", "coca", "fanta", "ice tea", "şeftali", "vişne", "sos", "extra",
+        "ketçap", "mayonez", "su", "çay", "çubuk", "mozzarella", "patates", "ball", "stick", "cola"
+    ]
+    df = df[~df["product_name"].str.lower().str.contains('|'.join(exclude_keywords))]
+    df = df[df["unit_price"] > 0]
+
+    return df
+
+
+# ---------------  data/historical (pages/3_HistoricalDashboard.py)  ---------------- #
+def payment_methods(payments: pd.DataFrame) -> pd.Series:
+    """Per order_id: its distinct payment names, sorted and comma-joined."""
+    names = payments["payment_name"].astype("category")
+    categories = list(names.cat.categories)
+    if len(categories) > 62:  # does not fit a bitmask, join per order
+        return (payments.dropna(subset=["payment_name"])
+                .groupby("order_id")["payment_name"]
+                .agg(lambda x: ", ".join(sorted(set(map(str, x))))))
+    # one bit per payment name, OR-ed per order; each distinct combination is decoded once
+    pairs = pd.DataFrame({"order_id": payments["order_id"], "code": names.cat.codes})
+    pairs = pairs[pairs["code"] >= 0].drop_duplicates()
+    masks = np.left_shift(1, pairs["code"].to_numpy(np.int64))
+    masks = pd.Series(masks, index=pairs.index).groupby(pairs["order_id"]).sum()
+    labels = {m: ", ".join(sorted(str(c) for i, c in enumerate(categories) if m >> i & 1))
+              for m in masks.unique()}
+    return masks.map(labels)
+
+
+def load_historical(data_dir: str = HISTORICAL_DIR, start=None, end=None) -> Frames:
+    """
+    orders placed in ``[start, end]`` (enriched with product/feature/payment
+    facts) and their products, payments, features.
+    """
+    kw = dict(start=start, end=end, data_dir=data_dir)
+    # the SQL view only covers the warehouse: CSV partitions written after it need the pandas path
+    from_warehouse = (access.backend(data_dir) == "warehouse"
+                      and not any(access.newer_partitions(t, data_dir=data_dir) for t in access.PARTITION_KEYS))
+    if from_warehouse:
+        # joins and per-order aggregates run inside SQLite (see order_fact view)
+        orders = access.read("order_fact", **kw)
+        orders["payment_methods"] = orders["payment_methods"].map(
+            lambda x: ", ".join(sorted(x.split(","))) if isinstance(x, str) else x)
+    else:
+        orders = access.orders(**kw)
+    # children of exactly these orders: one semi-join instead of one per table
+    keys = {"order_id": orders["order_id"].dropna().unique()} if start or end else None
+    products = access.products(filters=keys, **kw)
+    payments = access.payments(filters=keys, **kw)
+    if keys and "order_product_id" in products.columns:
+        keys = {"order_product_id": products["order_product_id"].dropna().unique()}
+    features = access.features(filters=keys, **kw)
+
+    # hour / daypart / district / … are stored at ingest; only legacy rows are derived here
+    derive.complete(orders)
+    if from_warehouse:
+        return orders, products, payments, features
+
+    # enrich orders with product & feature facts
+    prod_sum = (products.groupby("order_id")
+                .agg(product_count=("quantity","sum"),
+                     item_total=("total_amount","sum"))
+                .reset_index())
+    orders = orders.merge(prod_sum, how="left", on="order_id")
+
+    feat_sum = (features.merge(products[["order_product_id","order_id"]],
+                               on="order_product_id")
+                .groupby("order_id")
+                .agg(feature_extra=("additional_price","sum"))
+                .reset_index())
+    orders = orders.merge(feat_sum, how="left", on="order_id")
+
+    pay_sum = (payments.groupby("order_id")
+               .agg(paid_amount=("amount","sum"))
+               .assign(payment_methods=payment_methods(payments))
+               .reset_index())
+    orders = orders.merge(pay_sum, how="left", on="order_id")
+
+    # default zeros
+    orders[["feature_extra","product_count"]] = orders[["feature_extra","product_count"]].fillna(0)
+
+    return orders, products, payments, features
+
+
+def load_history(data_dir: str = HISTORICAL_DIR, columns=HISTORY_COLUMNS) -> pd.DataFrame:
+    """Full-history projection for the cohort / weekday sections, with the derived month columns."""
+    orders = access.orders(columns=[*columns, "order_month", "weekday"], data_dir=data_dir)
+    return with_first_orders(derive.complete(orders, ["order_month", "weekday"]), data_dir)
+
+
+# ---------------  shared sections  ---------------- #
+def with_first_orders(orders: pd.DataFrame, data_dir: str) -> pd.DataFrame:
+    """Attach ``first_order_month`` from ``data_dir``'s customer cohort index, if it has one."""
+    firsts = derive.first_order_months(data_dir)
+    if len(firsts) and "customer_id" in orders.columns:
+        orders["first_order_month"] = orders["customer_id"].map(firsts)
+    return orders
+
+
+def cohort_counts(orders: pd.DataFrame, customer_col: str, date_col: str) -> pd.DataFrame:
+    """
+    Distinct customers per (cohort_month, order_month) with the months-since-first-order
+    index; uses the stored ``order_month`` / ``first_order_month`` when ``orders`` has them.
+    """
+    months = orders["order_month"] if "order_month" in orders.columns else derive.month_start(orders[date_col])
+    frame = pd.DataFrame({customer_col: orders[customer_col], "order_month": months})
+    firsts = orders.get("first_order_month")
+    if firsts is None or firsts[frame[customer_col].notna()].isna().any():
+        # customers missing from the cohort index: first month within this frame
+        fallback = months.groupby(frame[customer_col]).transform("min")
+        firsts = fallback if firsts is None else firsts.fillna(fallback)
+    frame["cohort_month"] = firsts
+    cohort = (
+        frame.groupby(["cohort_month", "order_month"])[customer_col]
+             .nunique()
+             .reset_index(name="n_customers")
+    )
+    cohort["cohort_index"] = derive.month_number(cohort["order_month"]) - derive.month_number(cohort["cohort_month"])
+    cohort["cohort_month"] = cohort["cohort_month"].dt.to_period("M")
+    cohort["order_month"] = cohort["order_month"].dt.to_period("M")
+    return cohort
+
+
+def weekday_share(orders: pd.DataFrame, group_col: str, value_col: str, date_col: str) -> pd.DataFrame:
+    """``group_col`` × weekday heat table: % of each group's ``value_col`` that falls on each weekday."""
+    wk_orders = orders[[group_col, value_col]].copy()
+    if "weekday" in orders.columns:  # stored at ingest, 0 = Monday
+        codes = orders["weekday"].fillna(-1).astype("int8").to_numpy()
+        wk_orders["weekday"] = pd.Categorical.from_codes(codes, categories=WEEKDAYS, ordered=True)
+    else:
+        wk_orders["weekday"] = pd.Categorical(orders[date_col].dt.day_name(),
+                                              categories=WEEKDAYS, ordered=True)
+    wd = (
+        wk_orders.groupby([group_col, "weekday"], observed=False)[value_col]
+                 .sum()
+                 .reset_index()
+    )
+    total_per_group = wd.groupby(group_col, observed=True)[value_col].transform("sum")
+    wd["pct"] = wd[value_col] / total_per_group * 100
+    return (
+        wd.pivot(index=group_col, columns="weekday", values="pct")
+          .fillna(0)[WEEKDAYS]  # keep column order
+    )
@@ -0,0 +1,300 @@
+"""
+Canonical schema manifest for the orders / products / features / payments tables.
+
+Every layout the ingesters write (historical, full, compact and the wide
+recent-orders CSV) maps onto one set of snake_case column names through
+``canonical``; ``SCHEMA`` gives each canonical column a compact pandas dtype:
+
+* ids → nullable ``Int64``, small codes → ``Int8``/``Int16``/``Int32``,
+* money and quantities → ``float64`` (sums must stay exact to the kuruş),
+* low-cardinality labels (payment, order type, sales channel, app, status …)
+  → ``category``,
+* timestamps → ``DATE``.
+
+Timestamps are normalised once at ingest (``normalize_timestamps``) to int64
+epoch milliseconds in UTC; Adisyo sends naive wall-clock times in
+``TIMEZONE``. Loaders turn them back into naive local datetimes with a
+vectorised integer conversion, so no date strings are parsed at load time
+(legacy ISO strings still load through a slower fallback).
+
+``read_csv`` applies it while parsing, ``conform`` to frames from Parquet or
+SQLite; the Parquet and warehouse sinks derive their column types from it too.
+Columns not listed keep pandas' inferred type.
+"""
+import re
+import csv
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+import pandas as pd
+
+DATE = "datetime64[ns]"
+ID = "Int64"
+MONEY = "float64"
+LABEL = "category"
+TEXT = "object"
+
+TABLES = ("orders", "products", "features", "payments")
+TIMEZONE = "Europe/Istanbul"
+
+SCHEMA: Dict[str, Dict[str, str]] = {
+    "orders": {
+        "order_id": ID,
+        "order_number": "Int32",
+        "customer_id": ID,
+        "restaurant_key": ID,
+        "external_app_key": ID,
+        "order_address_id": ID,
+        "address_id": ID,
+        "integration_order_id": TEXT,
+        "external_app_id": LABEL,
+        "payment_method_id": "Int32",
+        "sales_channel_id": "Int32",
+        "status_id": "Int16",
+        "order_type_id": "Int8",
+        "order_total": MONEY,
+        "tax_amount": MONEY,
+        "discount_amount": MONEY,
+        "currency": LABEL,
+        "order_type": LABEL,
+        "status": LABEL,
+        "sales_channel_name": LABEL,
+        "sales_channel": LABEL,
+        "payment_method_name": LABEL,
+        "payment_method": LABEL,
+        "external_app_name": LABEL,
+        "delivery_app": LABEL,
+        "delivery_type": LABEL,
+        "restaurant_name": LABEL,
+        "integration_restaurant_name": LABEL,
+        "table_name": LABEL,
+        "waiter_name": LABEL,
+        "delivery_user_name": LABEL,
+        "order_note": TEXT,
+        "order_cancel_reason": TEXT,
+        "customer_customer_id": ID,
+        "customer_address_id": ID,
+        "customer_customer_name": TEXT,
+        "customer_customer_surname": TEXT,
+        "customer_customer_email": TEXT,
+        "customer_customer_phone": TEXT,
+        "customer_customer_phone2": TEXT,
+        "customer_address": TEXT,
+        "customer_address_description": TEXT,
+        "customer_address_header": TEXT,
+        "customer_region": TEXT,
+        "customer_city": LABEL,
+        "customer_company": TEXT,
+        "customer_latitude": "float64",
+        "customer_longitude": "float64",
+        "is_scheduled_order": "boolean",
+        "insert_date": DATE,
+        "update_date": DATE,
+        "closed_date": DATE,
+        "prepared_date": DATE,
+        "delivery_time": DATE,
+        "scheduled_time": DATE,
+        # derived at ingest (utilities/data/derive.py)
+        "hour": "Int8",
+        "weekday": "Int8",
+        "daypart": LABEL,
+        "district": LABEL,
+        "order_month": DATE,
+    },
+    "products": {
+        "order_id": ID,
+        "order_product_id": ID,
+        "product_id": ID,
+        "product_unit_id": ID,
+        "parent_id": ID,
+        "group_id": ID,
+        "product_name": LABEL,
+        "product_code": LABEL,
+        "category": LABEL,
+        "group_name": LABEL,
+        "quantity": "float64",
+        "unit_price": MONEY,
+        "total_amount": MONEY,
+        "discount": MONEY,
+        "is_menu": "boolean",
+        "description": TEXT,
+        "cancel_reason": TEXT,
+    },
+    "features": {
+        "order_id": ID,
+        "order_product_id": ID,
+        "product_id": ID,
+        "feature_id": ID,
+        "feature_name": LABEL,
+        "additional_price": MONEY,
+    },
+    "payments": {
+        "order_id": ID,
+        "payment_type_id": "Int32",
+        "customer_id": ID,
+        "payment_name": LABEL,
+        "currency": LABEL,
+        "amount": MONEY,
+        "exchange_rate": "float64",
+        "customer_name": TEXT,
+        "customer_surname": TEXT,
+        "is_debit": "boolean",
+        "insert_date": DATE,
+    },
+}
+
+# source names whose snake_case form is not the canonical one
+RENAMES: Dict[str, Dict[str, str]] = {
+    "orders": {"id": "order_id"},
+}
+
+
+def to_snake(name: str) -> str:
+    """``customerName`` → ``customer_name``, ``Order Type`` → ``order_type``."""
+    name = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name.strip())
+    return name.replace(" ", "_").lower()
+
+
+@lru_cache(maxsize=4096)
+def canonical(table: str, name: str) -> str:
+    name = to_snake(name)
+    return RENAMES.get(table, {}).get(name, name)
+
+
+def dtype_of(table: str, column: str) -> Optional[str]:
+    """Manifest dtype of a (source or canonical) column, or None if unlisted."""
+    return SCHEMA.get(table, {}).get(canonical(table, column))
+
+
+def date_columns(table: str) -> List[str]:
+    return [c for c, t in SCHEMA[table].items() if t == DATE]
+
+
+# ----------------------------------------------------------------------
+# Timestamps
+# ----------------------------------------------------------------------
+try:
+    _LOCAL = ZoneInfo(TIMEZONE)
+except ZoneInfoNotFoundError:  # no tz database (e.g. bare Windows): Turkey is UTC+3 all year
+    _LOCAL = timezone(timedelta(hours=3))
+
+
+def to_epoch_ms(value: Any) -> Optional[int]:
+    """API timestamp (naive local ISO string, datetime or epoch ms) → UTC epoch milliseconds."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, float):
+        return None if value != value else int(value)
+    if not isinstance(value, datetime):
+        text = str(value)
+        if text.isdigit():
+            return int(text)
+        value = datetime.fromisoformat(text)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_LOCAL)
+    return int(value.timestamp() * 1000)
+
+
+def from_epoch_ms(ms: Optional[int]) -> Optional[datetime]:
+    """UTC epoch milliseconds → naive local datetime (the wall clock Adisyo shows)."""
+    if ms is None:
+        return None
+    return datetime.fromtimestamp(ms / 1000, _LOCAL).replace(tzinfo=None)
+
+
+def local_epoch_ms(values) -> np.ndarray:
+    """Vectorised ``to_epoch_ms`` for naive local ``datetime64`` values (no NaT)."""
+    return pd.DatetimeIndex(values).tz_localize(TIMEZONE).as_unit("ms").asi8
+
+
+def normalize_timestamps(table: str, rows: List[Dict]) -> List[Dict]:
+    """Rewrite every manifest date column of ``rows`` to epoch ms, in place."""
+    for row in rows:
+        for key, value in row.items():
+            if dtype_of(table, key) == DATE:
+                row[key] = to_epoch_ms(value)
+    return rows
+
+
+def _from_epoch(ms: pd.Series) -> pd.Series:
+    # integer view instead of to_datetime(unit="ms"), whose float path (any
+    # NaN column) rounds through numpy and can trip FloatingPointError
+    values = ms.to_numpy(dtype="float64", na_value=np.nan)
+    missing = np.isnan(values)
+    ints = np.where(missing, 0, values).astype(np.int64)
+    ints[missing] = np.iinfo(np.int64).min  # NaT
+    stamps = pd.Series(ints.view("datetime64[ms]"), index=ms.index, name=ms.name).dt.tz_localize("UTC")
+    return stamps.dt.tz_convert(TIMEZONE).dt.tz_localize(None).astype(DATE)
+
+
+def _parse_text(values: pd.Series) -> pd.Series:
+    # legacy files: ISO-8601 strings (variable fractional seconds) parsed vectorised,
+    # anything else falls back to per-element "mixed" parsing
+    try:
+        return pd.to_datetime(values, format="ISO8601")
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, errors="coerce", format="mixed")
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Stored timestamps (epoch ms, tz-aware or legacy strings) → naive local ``datetime64``."""
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.dt.tz_convert(TIMEZONE).dt.tz_localize(None).astype(DATE)
+    if pd.api.types.is_datetime64_dtype(values):
+        return values.astype(DATE)  # Arrow timestamps arrive as [ms]
+    if pd.api.types.is_numeric_dtype(values):
+        return _from_epoch(values)
+    epoch = pd.to_numeric(values, errors="coerce")
+    text = epoch.isna() & values.notna()
+    if not text.any():
+        return _from_epoch(epoch)
+    if not epoch.notna().any():
+        return _parse_text(values)
+    return _from_epoch(epoch).mask(text, _parse_text(values[text]))
+
+
+def conform(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Rename ``df`` to canonical columns and cast every listed column to its manifest dtype."""
+    df = df.rename(columns={c: canonical(table, c) for c in df.columns})
+    for col in df.columns:
+        dtype = SCHEMA[table].get(col)
+        if dtype is None or str(df[col].dtype) == dtype:
+            continue
+        if dtype == DATE:
+            df[col] = parse_dates(df[col])
+        elif dtype.startswith("Int") and df[col].dtype == object:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)  # "12.0" / "" via float
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def csv_rows(f: IO) -> Iterator[Dict[str, str]]:
+    """``csv.DictReader`` rows of ``f``, minus the blank ones the old writerow({}) "flush" left behind."""
+    return (row for row in csv.DictReader(f) if any(row.values()))
+
+
+def read_csv(path: str, table: str, usecols: Optional[Iterable[str]] = None, **kwargs) -> pd.DataFrame:
+    """
+    ``pd.read_csv`` with the manifest dtypes applied while parsing and the
+    columns renamed to canonical names. ``usecols`` takes canonical names.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    names = {c: canonical(table, c) for c in header}
+    if usecols is not None:
+        wanted = set(usecols)
+        header = [c for c in header if names[c] in wanted]
+    # labels and floats are typed by the C parser; nullable ints / booleans go
+    # through its fast int64/float64 inference and are cast afterwards
+    dtypes = {}
+    for c in header:
+        dtype = SCHEMA[table].get(names[c])
+        if dtype in (LABEL, TEXT) or (dtype or "").startswith("float"):
+            dtypes[c] = dtype
+    df = pd.read_csv(path, usecols=list(header), dtype=dtypes, **kwargs)
+    return conform(df, table)
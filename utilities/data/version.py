@@ -0,0 +1,220 @@
+"""
+Data-version manifest: what is on disk, by content.
+
+Every data directory keeps a ``data_version.json``:
+
+    {
+      "version": "<hash of all partitions>",
+      "tables": {"orders": "<hash>", "products": "<hash>", ...},
+      "partitions": {
+        "completed_orders_2025_4.csv": {"table": "orders", "sha256": "...", "rows": 601,
+                                        "max_update_date": "2025-06-05T13:23:29.550000", ...},
+        "parquet/orders/year=2025/month=06/....parquet": {...},
+        "warehouse.db": {"table": "*", "rows": {"orders": 3210, ...}, ...}
+      }
+    }
+
+The sinks refresh it when an ingest run closes (so do the sync and the
+compaction job). ``refresh`` only re-hashes files whose size or mtime changed,
+so pages call ``current`` on every rerun and pass the table versions to
+``st.cache_data`` functions as arguments: a cache entry lives exactly as long
+as the data it was computed from.
+"""
+import os
+import glob
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utilities.data import derive, schema
+from utilities.data.access import HISTORICAL_DIR, LAYOUTS, PARTITION_KEYS
+
+MANIFEST = "data_version.json"
+BLOCK = 1 << 20
+STAT_KEYS = ("bytes", "mtime_ns", "wal_bytes", "wal_mtime_ns")
+
+
+# ----------------------------------------------------------------------
+# Partitions
+# ----------------------------------------------------------------------
+def _csv_table(name: str) -> Optional[str]:
+    """Table a top-level CSV partition belongs to, by the layouts' file stems."""
+    best = None
+    for layout in LAYOUTS.values():
+        for table, stem in layout.stems.items():
+            if name == f"{stem}.csv" or name.startswith(f"{stem}_"):
+                if best is None or len(stem) > best[1]:  # "completed_orders_" over "orders_"
+                    best = (table, len(stem))
+    return best[0] if best else None
+
+
+def _files(data_dir: str) -> List[Tuple[str, str, str]]:
+    """``(relative path, table, format)`` of every partition under ``data_dir``."""
+    found = []
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+        table = _csv_table(os.path.basename(path))
+        if table:
+            found.append((os.path.basename(path), table, "csv"))
+    for table in PARTITION_KEYS:
+        for path in sorted(glob.glob(os.path.join(data_dir, "parquet", table, "**", "*.parquet"), recursive=True)):
+            found.append((os.path.relpath(path, data_dir), table, "parquet"))
+    if os.path.exists(os.path.join(data_dir, "warehouse.db")):
+        found.append(("warehouse.db", "*", "sqlite"))
+    return found
+
+
+def _stat(path: str, fmt: str) -> Dict[str, int]:
+    st = os.stat(path)
+    stat = {"bytes": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if fmt == "sqlite" and os.path.exists(path + "-wal"):
+        # WAL mode: committed pages sit in the -wal file until a checkpoint
+        wal = os.stat(path + "-wal")
+        stat.update(wal_bytes=wal.st_size, wal_mtime_ns=wal.st_mtime_ns)
+    return stat
+
+
+def _sha256(*paths: str) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(BLOCK), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _iso(stamp) -> Optional[str]:
+    return None if stamp is None or stamp != stamp else stamp.isoformat()
+
+
+def _csv_stats(path: str, table: str) -> Dict:
+    key = PARTITION_KEYS[table]
+    if not os.path.getsize(path):  # created by a sink that has written no row yet
+        return {"rows": 0}
+    df = schema.read_csv(path, table, usecols=[key, "update_date"])
+    stats = {"rows": int(df[key].notna().sum()) if key in df.columns else len(df)}
+    if "update_date" in df.columns:
+        stats["max_update_date"] = _iso(df["update_date"].max())
+    return stats
+
+
+def _parquet_stats(path: str) -> Dict:
+    import pyarrow.parquet as pq
+
+    meta = pq.ParquetFile(path).metadata
+    stats = {"rows": meta.num_rows}
+    names = meta.schema.names
+    if "updateDate" in names:
+        col = names.index("updateDate")
+        highs = [meta.row_group(i).column(col).statistics for i in range(meta.num_row_groups)]
+        highs = [s.max for s in highs if s is not None and s.has_min_max]
+        if highs:
+            stats["max_update_date"] = _iso(schema.parse_dates(pd.Series([max(highs)])).iloc[0])
+    return stats
+
+
+def _sqlite_stats(path: str) -> Dict:
+    from utilities.api.warehouse import query
+
+    rows = {}
+    for table in PARTITION_KEYS:
+        rows[table] = int(query(f"SELECT COUNT(*) AS n FROM {table}", path=path)["n"].iloc[0])
+    try:
+        high = query("SELECT MAX(update_date) AS m FROM orders", path=path)["m"].iloc[0]
+    except pd.errors.DatabaseError:  # no update_date column until an ingest adds one
+        high = None
+    return {"rows": rows, "max_update_date": _iso(schema.from_epoch_ms(int(high)) if pd.notna(high) else None)}
+
+
+def describe(data_dir: str, name: str, table: str, fmt: str) -> Dict:
+    """Manifest entry for one partition: content hash, size, mtime, rows, max updateDate."""
+    path = os.path.join(data_dir, name)
+    entry = {"table": table, "format": fmt, **_stat(path, fmt),
+             "sha256": _sha256(path, path + "-wal") if fmt == "sqlite" else _sha256(path)}
+    if fmt == "csv":
+        entry.update(_csv_stats(path, table))
+    elif fmt == "parquet":
+        entry.update(_parquet_stats(path))
+    else:
+        entry.update(_sqlite_stats(path))
+    return entry
+
+
+# ----------------------------------------------------------------------
+# Manifest
+# ----------------------------------------------------------------------
+def _combine(hashes: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for h in hashes:
+        digest.update(h.encode())
+    return digest.hexdigest()[:16]
+
+
+def read(data_dir: str = HISTORICAL_DIR) -> Dict:
+    try:
+        with open(os.path.join(data_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"partitions": {}}
+
+
+def refresh(data_dir: str = HISTORICAL_DIR, write: bool = True) -> Dict:
+    """
+    Bring ``data_dir``'s manifest, and the customer cohort index derived from
+    it, up to date. Partitions whose size and mtime are unchanged keep their
+    entry; only new or modified files are hashed.
+    """
+    old = read(data_dir)
+    partitions = {}
+    for name, table, fmt in _files(data_dir):
+        known = old["partitions"].get(name)
+        stat = _stat(os.path.join(data_dir, name), fmt)
+        if known and all(known.get(k) == stat.get(k) for k in STAT_KEYS):
+            partitions[name] = known
+        else:
+            partitions[name] = describe(data_dir, name, table, fmt)
+
+    tables = {}
+    for table in PARTITION_KEYS:
+        hashes = [f"{n}:{e['sha256']}" for n, e in sorted(partitions.items()) if e["table"] in (table, "*")]
+        tables[table] = _combine(hashes)
+    manifest = {
+        "version": _combine(f"{n}:{e['sha256']}" for n, e in sorted(partitions.items())),
+        "tables": tables,
+        "partitions": partitions,
+    }
+    changed = manifest["version"] != old.get("version") or partitions != old["partitions"]
+    if write and changed and (partitions or old["partitions"]):
+        manifest["generated_at"] = datetime.now().isoformat(timespec="seconds")
+        path = os.path.join(data_dir, MANIFEST)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # pages and ingest may refresh at once
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, path)
+    else:
+        manifest["generated_at"] = old.get("generated_at")
+    if write and (changed or not os.path.exists(os.path.join(data_dir, derive.COHORTS))):
+        derive.update_cohorts(data_dir, manifest)  # only partitions with a new hash are read
+    return manifest
+
+
+def current(data_dir: str = HISTORICAL_DIR, tables: Optional[Iterable[str]] = None) -> str:
+    """Cache key for ``tables`` (default: everything) of ``data_dir`` as it is on disk now."""
+    manifest = refresh(data_dir)
+    if tables is None:
+        return manifest["version"]
+    return _combine(manifest["tables"].get(t, "") for t in tables)
+
+
+def updated(*paths: str) -> None:
+    """Refresh the manifests of the directories holding ``paths`` (called by writers)."""
+    for data_dir in sorted({os.path.dirname(p) or "." for p in paths}):
+        try:
+            refresh(data_dir)
+        except (OSError, ValueError) as e:  # the data itself is already durable
+            print(f"⚠️  Could not refresh {os.path.join(data_dir, MANIFEST)}: {e}")
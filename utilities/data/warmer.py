@@ -0,0 +1,117 @@
+"""
+Background cache warmer for the dashboards.
+
+``start()`` (called once per Streamlit process by main.py, through
+``st.cache_resource``) spawns one daemon thread. Every ``INTERVAL`` seconds it
+reads the data versions (``version.current``: a stat of each partition, files
+are only re-hashed when they changed) and, for every target whose version moved,
+calls the ``utilities.data.cached`` functions the page would call on its
+default view:
+
+* recent   – pages/1_Dashboard.py: recent orders and their filter index,
+* history  – pages/3_HistoricalDashboard.py: date bounds, the full-history
+  projection and its cohort / weekday aggregates,
+* historical – pages/3_HistoricalDashboard.py: the default (whole) date range
+  and its filter index,
+* full     – pages/4_NewDashboard.py: orders/products/… and their filter index,
+  costs, cohort, weekday.
+
+The cache functions are the same ones the pages call with the same arguments,
+so a visitor after an ingest hits entries the warmer already filled: they are
+global-scope caches, which the thread reaches without a ScriptRunContext. A target
+that fails (e.g. its data directory is empty) is reported once per version.
+"""
+import time
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from utilities.data import cached, version
+from utilities.data.access import FULL_DIR, HISTORICAL_DIR
+
+INTERVAL = 30
+
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+_stop = threading.Event()
+
+
+# ----------------------------------------------------------------------
+# Targets
+# ----------------------------------------------------------------------
+def _recent(v: str) -> None:
+    cached.recent_filters(v)
+
+
+def _history(v: str) -> None:
+    cached.historical_bounds(v)
+    cached.history_cohort(v)
+    cached.history_weekday(v)
+
+
+def _historical(v: str) -> None:
+    start, end = cached.historical_bounds(version.current(HISTORICAL_DIR, ["orders"]))
+    cached.historical_filters(start, end, v)
+
+
+def _full(v: str) -> None:
+    cached.full_filters(v)
+    cached.product_costs(v)
+    cached.full_cohort(v)
+    cached.full_weekday(v)
+
+
+# name → (data dir, tables the version covers (None: all), warm function)
+TARGETS: Dict[str, Tuple[str, Optional[Iterable[str]], Callable[[str], None]]] = {
+    "recent": (cached.RECENT_DIR, ["orders"], _recent),
+    "history": (HISTORICAL_DIR, ["orders"], _history),
+    "historical": (HISTORICAL_DIR, None, _historical),
+    "full": (FULL_DIR, None, _full),
+}
+
+
+# ----------------------------------------------------------------------
+# Loop
+# ----------------------------------------------------------------------
+def warm_once(seen: Dict[str, str]) -> Dict[str, float]:
+    """Warm every target whose data version differs from ``seen`` (updated in place); returns timings."""
+    timings = {}
+    for name, (data_dir, tables, warm) in TARGETS.items():
+        try:
+            v = version.current(data_dir, tables)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  warmer: cannot read the data version of {data_dir}: {e}")
+            continue
+        if seen.get(name) == v:
+            continue
+        seen[name] = v
+        t0 = time.perf_counter()
+        try:
+            warm(v)
+        except Exception as e:  # a broken target must not stop the others (nor the app)
+            print(f"⚠️  warmer: {name} ({data_dir}) failed: {type(e).__name__}: {e}")
+            continue
+        timings[name] = time.perf_counter() - t0
+        print(f"🔥 warmer: {name} @ {v} in {timings[name]:.2f}s")
+    return timings
+
+
+def _run(interval: float) -> None:
+    seen: Dict[str, str] = {}
+    while not _stop.is_set():
+        warm_once(seen)
+        _stop.wait(interval)
+
+
+def start(interval: float = INTERVAL) -> threading.Thread:
+    """Start the warmer thread once per process; later calls return the running thread."""
+    global _thread
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _stop.clear()
+            _thread = threading.Thread(target=_run, args=(interval,), name="cache-warmer", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def stop() -> None:
+    _stop.set()
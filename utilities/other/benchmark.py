@@ -0,0 +1,274 @@
+"""
+Headless benchmark of the dashboard data paths on synthetic datasets.
+
+For every size the synthetic generator writes a data/full and a
+data/historical layout once (cached under ``--data-root``). Then each
+stage runs in a fresh interpreter so peak RSS is that stage's own:
+
+    load_full           pages/4 load_data()
+    load_historical     pages/3 load_all() over the whole history
+    load_historical_30d pages/3 load_all() for the last 30 days (date pushdown)
+    history_projection  pages/3 cohort/weekday input (column projection + derived months)
+    load_product_cost   pages/4 load_product_cost_data()
+    cohort_full         pages/4 cohort section (after load)
+    cohort_historical   pages/3 cohort section (after load)
+    weekday_historical  pages/3 weekday heat-map (after load)
+
+Results (wall time, peak RSS, rows/s) are appended to ``--history``. A stage
+is a regression when it is slower than ``--threshold`` × the median of its
+previous runs at the same size; the process then exits with status 1.
+
+    python -m utilities.other.benchmark --sizes 10k 100k
+    python -m utilities.other.benchmark --sizes 1M --stages load_historical --threshold 1.2
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+BENCH_ROOT = "data/synthetic/bench"
+HISTORY_FILE = "data/benchmarks/history.json"
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+ORDERS_PER_PARTITION = 250_000
+
+
+# ----------------------------------------------------------------------
+# Dataset preparation
+# ----------------------------------------------------------------------
+def _concat_csv(parts: List[str], target: str) -> None:
+    """Stream partition CSVs into one file, keeping only the first header."""
+    with open(target, "wb") as out:
+        for i, part in enumerate(parts):
+            with open(part, "rb") as f:
+                if i:
+                    f.readline()
+                shutil.copyfileobj(f, out, 1 << 20)
+
+
+def _write_costs(path: str) -> None:
+    import pandas as pd
+    from utilities.other.generate_orders import MENU
+
+    costs = pd.DataFrame({"Product": [m[0] for m in MENU], "Cost": [round(m[1] * 0.35, 2) for m in MENU]})
+    costs.to_excel(path, sheet_name="Costs", index=False)
+
+
+def prepare(size: str, root: str, seed: int, workers: int) -> Dict[str, str]:
+    """Generate (once) the full and historical layouts for ``size``; return their directories."""
+    from utilities.other.generate_orders import generate
+
+    n = SIZES[size]
+    dirs = {"full": os.path.join(root, size, "full"), "historical": os.path.join(root, size, "historical")}
+    targets = {
+        "full": {t: f"{t}.csv" for t in ("orders", "products", "features", "payments")},
+        "historical": {t: f"{'completed_orders' if t == 'orders' else t}_2025.csv"
+                       for t in ("orders", "products", "features", "payments")},
+    }
+    for schema, out_dir in dirs.items():
+        if os.path.exists(os.path.join(out_dir, "READY")):
+            continue
+        print(f"🧪 Generating {size} orders ({schema} schema) → {out_dir}")
+        parts_dir = os.path.join(out_dir, "parts")
+        partitions = max(1, -(-n // ORDERS_PER_PARTITION))
+        generate(n, "2024-01-01", 540, partitions, workers, seed, schema, parts_dir)
+        for table, name in targets[schema].items():
+            prefix = "completed_orders" if table == "orders" else table
+            parts = sorted(os.path.join(parts_dir, f) for f in os.listdir(parts_dir) if f.startswith(f"{prefix}_part"))
+            _concat_csv(parts, os.path.join(out_dir, name))
+        shutil.rmtree(parts_dir)
+        if schema == "full":
+            _write_costs(os.path.join(out_dir, "costs.xlsx"))
+        open(os.path.join(out_dir, "READY"), "w").close()
+    return dirs
+
+
+# ----------------------------------------------------------------------
+# Stages (run inside the child process)
+# ----------------------------------------------------------------------
+def _stage_load_full(dirs):
+    from utilities.data.loaders import load_full
+    return lambda: len(load_full(dirs["full"])[0])
+
+
+def _stage_load_historical(dirs):
+    from utilities.data.loaders import load_historical
+    return lambda: len(load_historical(dirs["historical"])[0])
+
+
+def _stage_load_historical_30d(dirs):
+    from datetime import timedelta
+    from utilities.data import access
+    from utilities.data.loaders import load_historical
+    end = access.date_bounds(data_dir=dirs["historical"])[1].date()
+    return lambda: len(load_historical(dirs["historical"], end - timedelta(days=29), end)[0])
+
+
+def _stage_history_projection(dirs):
+    from utilities.data.loaders import load_history
+    return lambda: len(load_history(dirs["historical"]))
+
+
+def _stage_load_product_cost(dirs):
+    from utilities.data.loaders import load_product_cost_data
+    return lambda: len(load_product_cost_data(dirs["full"]))
+
+
+def _stage_cohort_full(dirs):
+    from utilities.data.loaders import cohort_counts, load_full
+    orders = load_full(dirs["full"])[0]
+
+    def run():
+        cohort = cohort_counts(orders, "customer_id", "insert_date")
+        cohort.pivot_table(index="cohort_month", columns="cohort_index", values="n_customers")
+        return len(orders)
+    return run
+
+
+def _stage_cohort_historical(dirs):
+    from utilities.data.loaders import cohort_counts, load_historical
+    orders = load_historical(dirs["historical"])[0]
+
+    def run():
+        cohort = cohort_counts(orders, "customer_id", "insert_date")
+        cohort.pivot(index="cohort_month", columns="cohort_index", values="n_customers")
+        return len(orders)
+    return run
+
+
+def _stage_weekday_historical(dirs):
+    from utilities.data.loaders import load_historical, weekday_share
+    orders = load_historical(dirs["historical"])[0]
+    return lambda: (weekday_share(orders, "external_app_name", "order_total", "insert_date"), len(orders))[1]
+
+
+# name → setup(dirs) returning the timed callable (which returns rows processed)
+STAGES: Dict[str, Callable[[Dict[str, str]], Callable[[], int]]] = {
+    "load_full": _stage_load_full,
+    "load_historical": _stage_load_historical,
+    "load_historical_30d": _stage_load_historical_30d,
+    "history_projection": _stage_history_projection,
+    "load_product_cost": _stage_load_product_cost,
+    "cohort_full": _stage_cohort_full,
+    "cohort_historical": _stage_cohort_historical,
+    "weekday_historical": _stage_weekday_historical,
+}
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM is reset by exec; ru_maxrss on Linux carries over the parent's peak
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def run_child(stage: str, dirs: Dict[str, str]) -> None:
+    run = STAGES[stage](dirs)
+    t0 = time.perf_counter()
+    rows = run()
+    seconds = time.perf_counter() - t0
+    print(json.dumps({"seconds": seconds, "rows": rows, "peak_rss_mb": _peak_rss_mb()}))
+
+
+def measure(stage: str, dirs: Dict[str, str]) -> Dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "utilities.other.benchmark", "--child", stage, "--dirs", json.dumps(dirs)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ----------------------------------------------------------------------
+# History & regression check
+# ----------------------------------------------------------------------
+def load_history(path: str) -> List[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def regressions(history: List[Dict], results: List[Dict], threshold: float,
+                min_seconds: float = 0.0) -> List[Tuple[Dict, float]]:
+    """
+    Results slower than ``threshold`` × the median of earlier runs of the same
+    stage and size. Stages faster than ``min_seconds`` are timer noise and skipped.
+    """
+    slow = []
+    for r in results:
+        previous = [h["seconds"] for h in history if h["stage"] == r["stage"] and h["size"] == r["size"]]
+        if previous and r["seconds"] >= min_seconds:
+            baseline = statistics.median(previous)
+            if r["seconds"] > baseline * threshold:
+                slow.append((r, baseline))
+    return slow
+
+
+def main(args) -> int:
+    history = load_history(args.history)
+    started = datetime.now().isoformat(timespec="seconds")
+    commit = _git_commit()
+    results = []
+    for size in args.sizes:
+        dirs = prepare(size, args.data_root, args.seed, args.workers)
+        for stage in args.stages:
+            m = measure(stage, dirs)
+            r = {
+                "run": started, "commit": commit, "size": size, "stage": stage,
+                "seconds": round(m["seconds"], 4),
+                "peak_rss_mb": round(m["peak_rss_mb"], 1),
+                "rows_per_s": round(m["rows"] / m["seconds"]) if m["seconds"] else None,
+            }
+            results.append(r)
+            print(f"⏱️  {size:>4}  {stage:<20} {r['seconds']:>9.3f}s  {r['peak_rss_mb']:>8.1f} MB  "
+                  f"{r['rows_per_s'] or 0:>12,} rows/s")
+
+    slow = regressions(history, results, args.threshold, args.min_seconds)
+    if not args.no_record:
+        os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+        with open(args.history, "w") as f:
+            json.dump(history + results, f, indent=1)
+    for r, baseline in slow:
+        print(f"❌ {r['stage']} @ {r['size']} regressed: {r['seconds']:.3f}s vs median {baseline:.3f}s")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark dashboard data paths on synthetic data")
+    ap.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["10k", "100k"])
+    ap.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    ap.add_argument("--data-root", default=BENCH_ROOT)
+    ap.add_argument("--history", default=HISTORY_FILE)
+    ap.add_argument("--threshold", type=float, default=1.25, help="fail when slower than this × median")
+    ap.add_argument("--min-seconds", type=float, default=0.05, help="ignore stages faster than this")
+    ap.add_argument("--no-record", action="store_true", help="compare only, don't append to the history")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--dirs", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        run_child(args.child, json.loads(args.dirs))
+    else:
+        sys.exit(main(args))
@@ -1,6 +1,7 @@
 import json
 import random
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
 # Sample product catalog and features
 product_catalog = [
@@ -17,31 +18,32 @@ waiters = ["Azad Gok", "Ece Kaya", "Yusuf Demir", "Ayşe Yıldız"]
 tables = [f"Masa {i}" for i in range(1, 31)]
 sales_channels = ["Ana Kanal", "Yemeksepeti", "Getir Yemek", "Trendyol"]
 
-orders = []
-for i in range(100):
-    order_id = random.randint(100000000, 999999999)
-    insert_date = datetime(2023, 8, random.randint(1, 30), random.randint(10, 21), random.randint(0, 59))
-    update_date = insert_date + timedelta(minutes=random.randint(10, 45))
-    num_products = random.randint(1, 4)
+
+def make_order(i: int, insert_date: datetime, rng: random.Random = random,
+               order_id: Optional[int] = None) -> Dict:
+    """One CompletedOrders-shaped order with 1–4 products from ``product_catalog``."""
+    order_id = order_id or rng.randint(100000000, 999999999)
+    update_date = insert_date + timedelta(minutes=rng.randint(10, 45))
+    num_products = rng.randint(1, 4)
 
     products = []
     total_amount = 0
     for _ in range(num_products):
-        prod = random.choice(product_catalog)
-        quantity = random.randint(1, 3)
+        prod = rng.choice(product_catalog)
+        quantity = rng.randint(1, 3)
         price = prod["unitPrice"]
         product_total = price * quantity
         total_amount += product_total
-        product_id = random.randint(1000000, 9999999)
+        product_id = 1000000 + product_catalog.index(prod)  # stable, matches the Products mock
         prod_entry = {
-            "id": random.randint(100000000, 999999999),
+            "id": rng.randint(100000000, 999999999),
             "orderId": order_id,
             "quantity": float(quantity),
             "unitPrice": price,
             "productName": prod["productName"],
             "productNote": None,
             "productCode": None,
-            "productUnitId": random.randint(1000000, 9999999),
+            "productUnitId": rng.randint(1000000, 9999999),
             "isMenu": False,
             "parentId": None,
             "cost": 0.0,
@@ -58,8 +60,8 @@ for i in range(100):
                 {
                     "featureName": prod["feature"],
                     "additionalPrice": 0.00,
-                    "featureId": random.randint(100000, 999999),
-                    "orderDetailId": random.randint(100000000, 999999999)
+                    "featureId": rng.randint(100000, 999999),
+                    "orderDetailId": rng.randint(100000000, 999999999)
                 }
             ] if prod["feature"] else []
         }
@@ -68,7 +70,7 @@ for i in range(100):
     tax_amount = round(total_amount * 0.10, 2)
     order_entry = {
         "id": order_id,
-        "waiterName": random.choice(waiters),
+        "waiterName": rng.choice(waiters),
         "deliveryUserName": None,
         "externalAppName": None,
         "restaurantName": None,
@@ -79,14 +81,14 @@ for i in range(100):
         "discountAmount": 0.00,
         "currency": "TRY",
         "orderNote": None,
-        "salesChannelId": random.randint(10000, 99999),
-        "salesChannelName": random.choice(sales_channels),
+        "salesChannelId": rng.randint(10000, 99999),
+        "salesChannelName": rng.choice(sales_channels),
         "externalAppId": None,
         "statusId": 7,
         "status": "Kapandı",
         "integrationRestaurantName": None,
         "orderCancelReason": None,
-        "tableName": random.choice(tables),
+        "tableName": rng.choice(tables),
         "orderNumber": i + 1,
         "taxAmount": tax_amount,
         "insertDate": insert_date.isoformat(),
@@ -116,18 +118,31 @@ for i in range(100):
             }
         ]
     }
-    orders.append(order_entry)
+    return order_entry
+
+
+def mock_orders(n: int = 100, seed: Optional[int] = None) -> List[Dict]:
+    """``n`` orders spread over August 2023, oldest first."""
+    rng = random.Random(seed)
+    orders = [
+        make_order(i, datetime(2023, 8, rng.randint(1, 30), rng.randint(10, 21), rng.randint(0, 59)), rng)
+        for i in range(n)
+    ]
+    return sorted(orders, key=lambda o: o["insertDate"])
 
-mock_data = {
-    "orders": orders,
-    "closedOrdersReceived": 99,
-    "canceledOrdersReceived": 1,
-    "totalCount": 100,
-    "pageCount": 1,
-    "status": 100,
-    "message": "İşlem Başarılı!"
-}
 
-# Save to JSON
-with open("data/mock_adisyo_orders.json", "w", encoding="utf-8") as f:
-    json.dump(mock_data, f, ensure_ascii=False, indent=2)
+if __name__ == "__main__":
+    orders = mock_orders(100)
+    mock_data = {
+        "orders": orders,
+        "closedOrdersReceived": 99,
+        "canceledOrdersReceived": 1,
+        "totalCount": 100,
+        "pageCount": 1,
+        "status": 100,
+        "message": "İşlem Başarılı!"
+    }
+
+    # Save to JSON
+    with open("data/mock_adisyo_orders.json", "w", encoding="utf-8") as f:
+        json.dump(mock_data, f, ensure_ascii=False, indent=2)
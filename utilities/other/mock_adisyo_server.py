@@ -0,0 +1,257 @@
+"""
+Local stand-in for the Adisyo External v2 API, for offline load and throttle tests.
+
+Serves CompletedOrders, RecentOrders, Products, Features, Couriers and
+PaymentTypes from orders built by ``generate_json.make_order`` and can add
+per-request latency, answer 601 like the real quota (too-fast calls and/or
+a random share of calls), and mutate data mid-run (re-touch existing orders
+and append new ones) so incremental sync sees changes. ``GET /stats`` returns
+request and 601 counters.
+
+    python -m utilities.other.mock_adisyo_server --orders 5000 --page-size 100 \\
+        --min-interval 2 --throttle-rate 0.05 --latency 0.2 --mutate-every 20
+
+Point the ingestion scripts at it with ``adisyo_base_url=http://127.0.0.1:8765``
+(any non-empty ``adisyo_web_siparis`` / ``adisyo_api`` values are accepted); the
+client then drops the live 40 s order quotas, and ``adisyo_quotas`` sets its own.
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from utilities.other.generate_json import make_order, product_catalog
+
+ORDERS_ENDPOINTS = ("CompletedOrders", "RecentOrders")
+RECENT_WINDOW = timedelta(hours=24)
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace(" ", "T"))
+
+
+class MockAdisyo:
+    """In-memory order store plus the request policy (latency, throttling, mutation)."""
+
+    def __init__(
+        self,
+        n_orders: int = 1000,
+        page_size: int = 100,
+        days: int = 30,
+        latency: float = 0.0,
+        min_interval: Optional[Dict[str, float]] = None,
+        throttle_rate: float = 0.0,
+        mutate_every: int = 0,
+        seed: int = 0,
+    ):
+        self.rng = random.Random(seed)
+        self.page_size = page_size
+        self.latency = latency
+        self.min_interval = min_interval or {}
+        self.throttle_rate = throttle_rate
+        self.mutate_every = mutate_every
+        self.lock = threading.Lock()
+        self.last_call: Dict[str, float] = {}
+        self.stats = {"requests": 0, "throttled": 0, "mutations": 0}
+
+        self.now = datetime.now().replace(microsecond=0)
+        self.next_id = 300000000
+        self.orders: List[Dict] = []
+        start = self.now - timedelta(days=days)
+        step = timedelta(days=days) / max(n_orders, 1)
+        for i in range(n_orders):
+            self._add_order(start + step * i)
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+    def _add_order(self, insert_date: datetime) -> Dict:
+        self.next_id += 1
+        order = make_order(len(self.orders), insert_date, self.rng, order_id=self.next_id)
+        # make_order closes orders 10–45 min after insert: never later than the mock's clock
+        clock = datetime.now().replace(microsecond=0).isoformat()
+        for item in (order, *order.get("payments", [])):
+            for key in ("updateDate", "insertDate"):
+                if item.get(key) and item[key] > clock:
+                    item[key] = clock
+        self.orders.append(order)
+        return order
+
+    def mutate(self) -> None:
+        """Re-touch a few existing orders and append new ones, like a live restaurant."""
+        stamp = datetime.now().replace(microsecond=0)
+        for order in self.rng.sample(self.orders, min(3, len(self.orders))):
+            order["updateDate"] = stamp.isoformat()
+            order["orderNote"] = f"updated {stamp:%H:%M:%S}"
+        for _ in range(self.rng.randint(1, 5)):
+            self._add_order(stamp).update(updateDate=stamp.isoformat())
+        self.stats["mutations"] += 1
+
+    def _page(self, items: List[Dict], page: int) -> Tuple[List[Dict], int]:
+        page_count = max(1, -(-len(items) // self.page_size))
+        return items[(page - 1) * self.page_size: page * self.page_size], page_count
+
+    def completed_orders(self, params: Dict[str, str]) -> Dict:
+        start = _parse_date(params["startDate"]) if params.get("startDate") else datetime.min
+        end = _parse_date(params["endDate"]) if params.get("endDate") else datetime.max
+        items = [o for o in self.orders if start <= _parse_date(o["insertDate"]) < end]
+        page_items, page_count = self._page(items, int(params.get("page", 1)))
+        return {
+            "orders": page_items,
+            "closedOrdersReceived": len(items),
+            "canceledOrdersReceived": 0,
+            "totalCount": len(items),
+            "pageCount": page_count,
+            "status": 100,
+            "message": "İşlem Başarılı!",
+        }
+
+    def recent_orders(self, params: Dict[str, str]) -> Dict:
+        since = _parse_date(params["minimumUpdateDate"]) if params.get("minimumUpdateDate") else datetime.min
+        since = max(since, datetime.now() - RECENT_WINDOW)
+        items = sorted((o for o in self.orders if _parse_date(o["updateDate"]) >= since),
+                       key=lambda o: o["updateDate"])
+        page_items, page_count = self._page(items, int(params.get("page", 1)))
+        return {"data": page_items, "totalCount": len(items), "pageCount": page_count, "status": 100}
+
+    def products(self, params: Dict[str, str]) -> Dict:
+        return {"data": [{
+            "categoryName": "Menü",
+            "products": [{
+                "productName": p["productName"],
+                "productId": 1000000 + i,
+                "taxRate": 10,
+                "isStockFollow": False,
+                "productUnits": [{
+                    "unitName": "Porsiyon",
+                    "productUnitId": 2000000 + i,
+                    "isDefault": True,
+                    "prices": [{"price": p["unitPrice"], "orderType": t} for t in (1, 2)],
+                }],
+            } for i, p in enumerate(product_catalog)],
+        }]}
+
+    def features(self, params: Dict[str, str]) -> Dict:
+        return {"data": {"featureGroups": [{
+            "featureGroupId": 1,
+            "featuresGroupName": "Seçimler",
+            "necessaryCount": 0,
+            "featureHeaderType": 1,
+            "features": [{
+                "featureName": p["feature"],
+                "featureId": 500000 + i,
+                "relatedProducts": [{
+                    "productId": 1000000 + i, "additionalPrice": 0.0, "featureHeaderName": "Seçim",
+                }],
+            } for i, p in enumerate(product_catalog) if p["feature"]],
+        }]}}
+
+    def couriers(self, params: Dict[str, str]) -> Dict:
+        return {"Couriers": [{"Id": 1, "Name": "Kurye 1", "PhoneNumber": "5550000001"}]}
+
+    def payment_types(self, params: Dict[str, str]) -> Dict:
+        return {"PaymentTypes": [{"Id": 1, "Name": "Nakit", "IsOnline": False},
+                                 {"Id": 2, "Name": "Kredi Kartı", "IsOnline": False}]}
+
+    # ------------------------------------------------------------------
+    # Request policy
+    # ------------------------------------------------------------------
+    def throttle(self, endpoint: str) -> bool:
+        """True if this call should get a 601."""
+        now = time.monotonic()
+        too_fast = now - self.last_call.get(endpoint, -1e9) < self.min_interval.get(endpoint, 0.0)
+        self.last_call[endpoint] = now
+        if too_fast or (self.throttle_rate and self.rng.random() < self.throttle_rate):
+            self.stats["throttled"] += 1
+            return True
+        return False
+
+    def handle(self, endpoint: str, params: Dict[str, str]) -> Tuple[int, Dict]:
+        routes = {
+            "CompletedOrders": self.completed_orders,
+            "RecentOrders": self.recent_orders,
+            "Products": self.products,
+            "Features": self.features,
+            "Couriers": self.couriers,
+            "PaymentTypes": self.payment_types,
+        }
+        with self.lock:
+            if endpoint == "stats":
+                return 200, dict(self.stats, orders=len(self.orders))
+            if endpoint not in routes:
+                return 404, {"message": f"unknown endpoint {endpoint}"}
+            self.stats["requests"] += 1
+            if self.throttle(endpoint):
+                return 601, {"message": "Too many requests"}
+            if self.mutate_every and self.stats["requests"] % self.mutate_every == 0:
+                self.mutate()
+            return 200, routes[endpoint](params)
+
+
+def make_handler(api: MockAdisyo):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+            if endpoint != "stats" and not (self.headers.get("x-api-key") and self.headers.get("x-api-secret")):
+                status, body = 401, {"message": "missing credentials"}
+            else:
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                if api.latency:
+                    time.sleep(api.latency * (0.5 + api.rng.random()))
+                status, body = api.handle(endpoint, params)
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(api: MockAdisyo, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the mock in a daemon thread; ``server.server_port`` is the bound port."""
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local mock of the Adisyo External v2 API")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--orders", type=int, default=1000)
+    ap.add_argument("--page-size", type=int, default=100)
+    ap.add_argument("--days", type=int, default=30, help="spread orders over the last N days")
+    ap.add_argument("--latency", type=float, default=0.0, help="mean seconds added to every response")
+    ap.add_argument("--min-interval", type=float, default=0.0,
+                    help="answer 601 to order endpoints called faster than this (seconds)")
+    ap.add_argument("--throttle-rate", type=float, default=0.0, help="share of calls answered 601 at random")
+    ap.add_argument("--mutate-every", type=int, default=0, help="mutate data every N requests (0 = never)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    api = MockAdisyo(
+        n_orders=args.orders,
+        page_size=args.page_size,
+        days=args.days,
+        latency=args.latency,
+        min_interval=dict.fromkeys(ORDERS_ENDPOINTS, args.min_interval),
+        throttle_rate=args.throttle_rate,
+        mutate_every=args.mutate_every,
+        seed=args.seed,
+    )
+    server = serve(api, port=args.port)
+    print(f"🧪 Mock Adisyo on http://127.0.0.1:{server.server_port} ({args.orders} orders)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
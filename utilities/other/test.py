@@ -1,84 +1,31 @@
-import requests
-import os
-from datetime import datetime, timedelta, timezone
-from dotenv import load_dotenv
-import csv
+"""
+Product-level CompletedOrders export for the last ``days`` days.
+
+Pages are flattened and appended as they arrive (bounded memory), and the
+window plus the last committed page are checkpointed next to the CSV, so an
+interrupted export resumes where it stopped instead of starting over.
 
-import time
+    python -m utilities.other.test
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict
 
-# Load env
-load_dotenv()
-API_KEY = os.getenv("adisyo_web_siparis")
-API_SECRET = os.getenv("adisyo_api")
-CONSUMER = os.getenv("adisyo_id")
+from utilities.api.adisyo_client import AdisyoClient, AdisyoError
+from utilities.api.adisyo_flatten import Rows
+from utilities.api.ingest_pipeline import CsvSink, read_json, run_pipeline
 
 # Constants
-URL = "https://ext.adisyo.com/api/External/v2/CompletedOrders"
 days = 195
-start_time_utc = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
-page = 1
-all_orders = []
-
-# Headers
-headers = {
-    "x-api-key": API_KEY,
-    "x-api-secret": API_SECRET,
-    "x-api-consumer": CONSUMER,
-    "Content-Type": "application/json"
-}
-
-
-retry_count = 0
-max_retries = 5
-
-while True:
-    params = {
-        "startDate": start_time_utc,
-        "includeCancelled": "true",
-        "orderType": "",
-        "page": page
-    }
-
-    response = requests.get(URL, headers=headers, params=params)
-    print(f"🔄 Page {page} - Status Code: {response.status_code}")
-
-    if response.status_code == 601:
-        retry_count += 1
-        if retry_count > max_retries:
-            print("❌ Too many retries. Exiting.")
-            break
-        wait_time = 45  # wait slightly longer than 40 sec
-        print(f"⏳ Rate limit. Waiting {wait_time} sec...")
-        time.sleep(wait_time)
-        continue
-
-    if response.status_code != 200:
-        print("❌ Error:", response.text)
-        break
-
-    retry_count = 0  # reset on success
-
-    data = response.json()
-    orders = data.get("orders", [])
-    if not orders:
-        break
-
-    all_orders.extend(orders)
-
-    if page >= data.get("pageCount", 1):
-        break
-
-    page += 1
-    print(f"✅ Page {page - 1} complete. Waiting 45 seconds before next...")
-    time.sleep(45)  # 👈 necessary delay for CompletedOrders
+DATE_FMT = "%Y-%m-%d %H:%M:%S"
+output_file = f"data/adisyo_completed_orders_full_{days}d.csv"
+progress_file = f"data/adisyo_completed_orders_full_{days}d.progress.json"
 
-print(f"✅ Total orders collected: {len(all_orders)}")
 
-# Flatten orders to product-level rows
-rows = []
-for order in all_orders:
+def flatten_lines(order: Dict) -> Rows:
+    """One row per ordered product, with the order fields repeated."""
+    lines = []
     for product in order.get("products", []):
-        rows.append({
+        lines.append({
             "Order ID": order["id"],
             "Table": order.get("tableName"),
             "Waiter": order.get("waiterName"),
@@ -95,14 +42,48 @@ for order in all_orders:
             "Product Description": product.get("description") or "",
             "Features": ", ".join([f["featureName"] for f in product.get("features", [])])
         })
+    # "orders" only feeds the order count; the sink writes "lines"
+    return {"orders": [order], "lines": lines}
 
-# Save to CSV
-output_file = f"data/adisyo_completed_orders_full_{days}d.csv"
-if rows:
-    with open(output_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-        writer.writeheader()
-        writer.writerows(rows)
-    print(f"📁 Saved {len(rows)} rows to '{output_file}'")
+
+# An unfinished export keeps its original window so page numbers stay valid;
+# a finished one (or none) starts a fresh window.
+previous = read_json(progress_file)
+resume = bool(previous.get("offsets")) and not previous.get("done")
+sink = CsvSink({"lines": output_file}, mode="a" if resume else "w", checkpoint=progress_file)
+
+if resume:
+    window = sink.state["window"]
+    start_page = sink.state["page"]
+    total = sink.state["total_order_count"]
+    print(f"↩️  Resuming {window[0]} → {window[1]} at page {start_page}")
 else:
-    print("⚠️ No data to write.")
+    now = datetime.now(timezone.utc)
+    window = [(now - timedelta(days=days)).strftime(DATE_FMT), now.strftime(DATE_FMT)]
+    start_page, total = 1, 0
+    sink.state = {}
+
+client = AdisyoClient()
+params = {
+    "startDate": window[0],
+    "endDate": window[1],
+    "includeCancelled": "true",
+    "orderType": "",
+}
+
+
+def progress(page: int, n_orders: int) -> Dict:
+    global total
+    total += n_orders
+    print(f"✅ Page {page} complete.")
+    return {"window": window, "page": page + 1, "total_order_count": total, "done": False}
+
+
+try:
+    run_pipeline(client.iter_pages("CompletedOrders", params, start_page=start_page),
+                 flatten_lines, sink, checkpoint=progress)
+    sink.commit({"done": True})
+    print(f"📁 Saved {total} orders to '{output_file}'")
+except AdisyoError as e:
+    print("❌ Error:", e)
+    print(f"⏸️  {total} orders committed so far; run again to resume.")